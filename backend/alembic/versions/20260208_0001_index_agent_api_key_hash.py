@@ -0,0 +1,36 @@
+"""index agent api_key_hash for point lookups
+
+Revision ID: 9c0d1e2f3a4b
+Revises: 8b9c0d1e2f3a
+Create Date: 2026-02-08 00:01:00.000000
+
+"""
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision = '9c0d1e2f3a4b'
+down_revision = '8b9c0d1e2f3a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Backfill: authentication now compares hash_api_key() output (lowercase
+    # SHA-256 hexdigest) with an equality lookup, so normalize any stored
+    # hashes that were written with surrounding whitespace or uppercase hex.
+    connection = op.get_bind()
+    connection.execute(text(
+        "UPDATE agents SET api_key_hash = lower(trim(api_key_hash)) "
+        "WHERE api_key_hash != lower(trim(api_key_hash))"
+    ))
+
+    op.create_index('ix_agents_api_key_hash', 'agents', ['api_key_hash'], unique=True)
+
+    print("✅ Added unique index on agents.api_key_hash")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_agents_api_key_hash', 'agents')
+
+    print("✅ Removed unique index on agents.api_key_hash")
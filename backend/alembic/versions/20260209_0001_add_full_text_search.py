@@ -0,0 +1,76 @@
+"""add full-text search indexes for services and agents
+
+Revision ID: ad1e2f3a4b5c
+Revises: 9c0d1e2f3a4b
+Create Date: 2026-02-09 00:01:00.000000
+
+"""
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision = 'ad1e2f3a4b5c'
+down_revision = '9c0d1e2f3a4b'
+branch_labels = None
+depends_on = None
+
+TABLES = ('services', 'agents')
+
+
+def _sqlite_upgrade(connection, table: str) -> None:
+    fts = f"{table}_fts"
+    connection.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"name, description, content='{table}', content_rowid='rowid', "
+        f"tokenize='unicode61 remove_diacritics 2')"
+    ))
+    connection.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, name, description) "
+        f"VALUES (new.rowid, new.name, new.description); END"
+    ))
+    connection.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, name, description) "
+        f"VALUES ('delete', old.rowid, old.name, old.description); END"
+    ))
+    connection.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF name, description ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, name, description) "
+        f"VALUES ('delete', old.rowid, old.name, old.description); "
+        f"INSERT INTO {fts}(rowid, name, description) "
+        f"VALUES (new.rowid, new.name, new.description); END"
+    ))
+    # Index the rows that already exist
+    connection.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+
+    if connection.dialect.name == 'sqlite':
+        for table in TABLES:
+            _sqlite_upgrade(connection, table)
+    elif connection.dialect.name == 'postgresql':
+        for table in TABLES:
+            connection.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_search ON {table} USING gin (("
+                f"to_tsvector('simple', coalesce({table}.name, '') || ' ' || "
+                f"coalesce({table}.description, ''))))"
+            ))
+
+    print("✅ Added full-text search indexes for services and agents")
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+
+    for table in TABLES:
+        if connection.dialect.name == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                connection.execute(text(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}"))
+            connection.execute(text(f"DROP TABLE IF EXISTS {table}_fts"))
+        elif connection.dialect.name == 'postgresql':
+            connection.execute(text(f"DROP INDEX IF EXISTS ix_{table}_search"))
+
+    print("✅ Removed full-text search indexes for services and agents")
@@ -0,0 +1,84 @@
+"""add capability index tables for agents and services
+
+Revision ID: be2f3a4b5c6d
+Revises: ad1e2f3a4b5c
+Create Date: 2026-02-09 00:02:00.000000
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'be2f3a4b5c6d'
+down_revision = 'ad1e2f3a4b5c'
+branch_labels = None
+depends_on = None
+
+
+def _normalize(raw) -> list:
+    """Parse a JSON capability list and normalize names like the app does."""
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            return []
+    names = []
+    for capability in raw or []:
+        name = str(capability).strip().lower()[:100]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def upgrade() -> None:
+    agent_capabilities = op.create_table(
+        'agent_capabilities',
+        sa.Column('agent_id', sa.String(36), sa.ForeignKey('agents.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('capability', sa.String(100), primary_key=True),
+    )
+    op.create_index(
+        'ix_agent_capabilities_capability', 'agent_capabilities', ['capability', 'agent_id']
+    )
+
+    service_capabilities = op.create_table(
+        'service_capabilities',
+        sa.Column('service_id', sa.String(36), sa.ForeignKey('services.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('capability', sa.String(100), primary_key=True),
+    )
+    op.create_index(
+        'ix_service_capabilities_capability', 'service_capabilities', ['capability', 'service_id']
+    )
+
+    # Backfill from the JSON columns
+    connection = op.get_bind()
+
+    rows = connection.execute(sa.text("SELECT id, capabilities FROM agents")).fetchall()
+    agent_rows = [
+        {'agent_id': agent_id, 'capability': name}
+        for agent_id, raw in rows
+        for name in _normalize(raw)
+    ]
+    if agent_rows:
+        op.bulk_insert(agent_capabilities, agent_rows)
+
+    rows = connection.execute(sa.text("SELECT id, capabilities_required FROM services")).fetchall()
+    service_rows = [
+        {'service_id': service_id, 'capability': name}
+        for service_id, raw in rows
+        for name in _normalize(raw)
+    ]
+    if service_rows:
+        op.bulk_insert(service_capabilities, service_rows)
+
+    print(f"✅ Added capability index tables ({len(agent_rows)} agent rows, {len(service_rows)} service rows)")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_service_capabilities_capability', 'service_capabilities')
+    op.drop_table('service_capabilities')
+    op.drop_index('ix_agent_capabilities_capability', 'agent_capabilities')
+    op.drop_table('agent_capabilities')
+
+    print("✅ Removed capability index tables")
@@ -0,0 +1,40 @@
+"""add composite (owner, created_at, id) indexes for keyset pagination
+
+Revision ID: cf3a4b5c6d7e
+Revises: be2f3a4b5c6d
+Create Date: 2026-02-10 00:01:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'cf3a4b5c6d7e'
+down_revision = 'be2f3a4b5c6d'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_jobs_client_created', 'jobs', ['client_agent_id', 'created_at', 'id']),
+    ('ix_jobs_worker_created', 'jobs', ['worker_agent_id', 'created_at', 'id']),
+    ('ix_messages_to_agent_created', 'messages', ['to_agent_id', 'created_at', 'id']),
+    ('ix_payment_transactions_initiator_created', 'payment_transactions', ['initiator_agent_id', 'created_at', 'id']),
+    ('ix_payment_transactions_recipient_created', 'payment_transactions', ['recipient_agent_id', 'created_at', 'id']),
+    ('ix_withdrawal_transactions_agent_created', 'withdrawal_transactions', ['agent_id', 'created_at', 'id']),
+    ('ix_deposit_transactions_agent_created', 'deposit_transactions', ['agent_id', 'created_at', 'id']),
+    ('ix_services_created', 'services', ['created_at', 'id']),
+    ('ix_agents_created', 'agents', ['created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+    print("✅ Added keyset pagination indexes")
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table)
+
+    print("✅ Removed keyset pagination indexes")
@@ -0,0 +1,100 @@
+"""add append-only balance ledger and per-account balance snapshots
+
+Revision ID: d04b5c6d7e8f
+Revises: cf3a4b5c6d7e
+Create Date: 2026-02-11 00:01:00.000000
+
+"""
+from datetime import datetime
+from decimal import Decimal
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd04b5c6d7e8f'
+down_revision = 'cf3a4b5c6d7e'
+branch_labels = None
+depends_on = None
+
+OPENING_ACCOUNT = 'platform:opening'
+
+
+def upgrade() -> None:
+    ledger_entries = op.create_table(
+        'ledger_entries',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer, 'sqlite'), primary_key=True, autoincrement=True),
+        sa.Column('transfer_id', sa.String(36), nullable=False),
+        sa.Column('account', sa.String(64), nullable=False),
+        sa.Column('amount', sa.Numeric(20, 8), nullable=False),
+        sa.Column('entry_type', sa.String(32), nullable=False),
+        sa.Column('reference_id', sa.String(66), nullable=True),
+        sa.Column('snapshotted', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('created_at', sa.TIMESTAMP(), nullable=False),
+    )
+    op.create_index('ix_ledger_entries_transfer_id', 'ledger_entries', ['transfer_id'])
+    op.create_index('ix_ledger_entries_reference_id', 'ledger_entries', ['reference_id'])
+    op.create_index('ix_ledger_entries_account_created', 'ledger_entries', ['account', 'created_at'])
+    op.create_index(
+        'ix_ledger_entries_account_pending', 'ledger_entries', ['account', 'id'],
+        postgresql_where=sa.text('NOT snapshotted'),
+        sqlite_where=sa.text('snapshotted = 0'),
+    )
+
+    balance_snapshots = op.create_table(
+        'balance_snapshots',
+        sa.Column('account', sa.String(64), primary_key=True),
+        sa.Column('balance', sa.Numeric(20, 8), nullable=False),
+        sa.Column('entries_folded', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.TIMESTAMP(), nullable=False),
+    )
+
+    # Open each agent's ledger with its current balance, already folded
+    connection = op.get_bind()
+    rows = connection.execute(sa.text("SELECT id, balance FROM agents WHERE balance <> 0")).fetchall()
+
+    now = datetime.utcnow()
+    entries = []
+    snapshots = []
+    total = Decimal('0')
+    for agent_id, balance in rows:
+        balance = Decimal(str(balance))
+        transfer_id = str(uuid.uuid4())
+        entries.append({
+            'transfer_id': transfer_id, 'account': OPENING_ACCOUNT, 'amount': -balance,
+            'entry_type': 'opening_balance', 'snapshotted': True, 'created_at': now,
+        })
+        entries.append({
+            'transfer_id': transfer_id, 'account': agent_id, 'amount': balance,
+            'entry_type': 'opening_balance', 'snapshotted': True, 'created_at': now,
+        })
+        snapshots.append({'account': agent_id, 'balance': balance, 'entries_folded': 1, 'updated_at': now})
+        total += balance
+
+    if entries:
+        op.bulk_insert(ledger_entries, entries)
+        snapshots.append({'account': OPENING_ACCOUNT, 'balance': -total, 'entries_folded': len(rows), 'updated_at': now})
+        op.bulk_insert(balance_snapshots, snapshots)
+
+    print(f"✅ Added balance ledger (opened {len(rows)} agent balances)")
+
+
+def downgrade() -> None:
+    # agents.balance mirrors the snapshots; fold anything pending into it first
+    connection = op.get_bind()
+    connection.execute(sa.text(
+        "UPDATE agents SET balance = balance + COALESCE(("
+        "SELECT SUM(amount) FROM ledger_entries "
+        "WHERE ledger_entries.account = agents.id AND NOT ledger_entries.snapshotted"
+        "), 0)"
+    ))
+
+    op.drop_table('balance_snapshots')
+    op.drop_index('ix_ledger_entries_account_pending', 'ledger_entries')
+    op.drop_index('ix_ledger_entries_account_created', 'ledger_entries')
+    op.drop_index('ix_ledger_entries_reference_id', 'ledger_entries')
+    op.drop_index('ix_ledger_entries_transfer_id', 'ledger_entries')
+    op.drop_table('ledger_entries')
+
+    print("✅ Removed balance ledger")
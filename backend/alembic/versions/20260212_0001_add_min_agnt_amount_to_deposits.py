@@ -0,0 +1,27 @@
+"""add min_agnt_amount to deposit_transactions for deposits awaiting confirmations
+
+Revision ID: e15c6d7e8f90
+Revises: d04b5c6d7e8f
+Create Date: 2026-02-12 00:01:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e15c6d7e8f90'
+down_revision = 'd04b5c6d7e8f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('deposit_transactions', sa.Column('min_agnt_amount', sa.Numeric(20, 8), nullable=True))
+
+    print("✅ Added min_agnt_amount to deposit_transactions")
+
+
+def downgrade() -> None:
+    op.drop_column('deposit_transactions', 'min_agnt_amount')
+
+    print("✅ Removed min_agnt_amount from deposit_transactions")
@@ -0,0 +1,107 @@
+"""key the SQLite full-text search tables by id instead of rowid
+
+Revision ID: f26d7e8f9a01
+Revises: e15c6d7e8f90
+Create Date: 2026-02-13 00:01:00.000000
+
+The FTS5 tables were external-content tables pointing at the implicit
+rowid of services and agents. Both have string primary keys, so that
+rowid is not stable and VACUUM may renumber it, leaving the index
+pointing at the wrong rows. They are rebuilt as regular FTS5 tables that
+store the row id alongside the indexed text.
+
+"""
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision = 'f26d7e8f9a01'
+down_revision = 'e15c6d7e8f90'
+branch_labels = None
+depends_on = None
+
+TABLES = ('services', 'agents')
+
+
+def _drop(connection, table: str) -> None:
+    fts = f"{table}_fts"
+    for suffix in ('ai', 'ad', 'au'):
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {fts}_{suffix}"))
+    connection.execute(text(f"DROP TABLE IF EXISTS {fts}"))
+
+
+def _create_keyed_by_id(connection, table: str) -> None:
+    fts = f"{table}_fts"
+    connection.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"id UNINDEXED, name, description, tokenize='unicode61 remove_diacritics 2')"
+    ))
+    connection.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(id, name, description) "
+        f"VALUES (new.id, new.name, new.description); END"
+    ))
+    connection.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"DELETE FROM {fts} WHERE id = old.id; END"
+    ))
+    connection.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF name, description ON {table} BEGIN "
+        f"DELETE FROM {fts} WHERE id = old.id; "
+        f"INSERT INTO {fts}(id, name, description) "
+        f"VALUES (new.id, new.name, new.description); END"
+    ))
+    # Index the rows that already exist
+    connection.execute(text(
+        f"INSERT INTO {fts}(id, name, description) SELECT id, name, description FROM {table}"
+    ))
+
+
+def _create_external_content(connection, table: str) -> None:
+    fts = f"{table}_fts"
+    connection.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"name, description, content='{table}', content_rowid='rowid', "
+        f"tokenize='unicode61 remove_diacritics 2')"
+    ))
+    connection.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, name, description) "
+        f"VALUES (new.rowid, new.name, new.description); END"
+    ))
+    connection.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, name, description) "
+        f"VALUES ('delete', old.rowid, old.name, old.description); END"
+    ))
+    connection.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF name, description ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, name, description) "
+        f"VALUES ('delete', old.rowid, old.name, old.description); "
+        f"INSERT INTO {fts}(rowid, name, description) "
+        f"VALUES (new.rowid, new.name, new.description); END"
+    ))
+    connection.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+
+    # Postgres indexes a tsvector expression on the table itself; nothing to do
+    if connection.dialect.name == 'sqlite':
+        for table in TABLES:
+            _drop(connection, table)
+            _create_keyed_by_id(connection, table)
+
+    print("✅ Rebuilt full-text search tables keyed by id")
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+
+    if connection.dialect.name == 'sqlite':
+        for table in TABLES:
+            _drop(connection, table)
+            _create_external_content(connection, table)
+
+    print("✅ Restored rowid-keyed full-text search tables")
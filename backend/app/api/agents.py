@@ -2,25 +2,29 @@
 
 import logging
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.api.deps import get_current_agent, get_optional_agent
+from app.api.deps import get_current_agent, get_optional_agent, get_cursor
 from app.models.agent import Agent
+from app.core.pagination import Cursor, set_next_cursor
 from app.schemas.agent import (
     AgentCreate,
     AgentUpdate,
     AgentPublic,
     AgentResponse,
     AgentRegisterResponse,
+    AgentKeyRotateResponse,
 )
 from app.services.agent_service import (
     create_agent,
     search_agents,
     update_agent,
     get_agent_by_id,
+    rotate_api_key,
 )
+from app.services.ledger_service import get_balance
 
 logger = logging.getLogger(__name__)
 
@@ -100,54 +104,73 @@ async def register_agent(
 
 @router.get("", response_model=List[AgentPublic])
 async def list_agents(
+    response: Response,
     q: Optional[str] = Query(None, description="Search query (name, description)"),
     capabilities: Optional[str] = Query(None, description="Comma-separated capabilities"),
+    capability_match: str = Query("any", pattern="^(any|all)$", description="Match any or all capabilities"),
     status_filter: Optional[str] = Query(None, alias="status", description="Filter by status"),
     min_reputation: Optional[float] = Query(None, description="Minimum reputation score"),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, deprecated=True, description="Use cursor instead (still used with q)"),
+    cursor: Optional[Cursor] = Depends(get_cursor),
     db: AsyncSession = Depends(get_db),
     current_agent: Optional[Agent] = Depends(get_optional_agent)
 ):
     """
     Search and browse agents (public endpoint with optional auth).
+
+    Listings are newest first and paged with the X-Next-Cursor header.
+    Text searches (q) are ordered by relevance and paged with offset.
     """
     # Parse capabilities
     caps_list = None
     if capabilities:
         caps_list = [c.strip() for c in capabilities.split(",")]
 
-    agents = await search_agents(
-        db=db,
-        query_text=q,
-        capabilities=caps_list,
-        status=status_filter,
-        min_reputation=min_reputation,
-        limit=limit,
-        offset=offset
-    )
+    try:
+        agents = await search_agents(
+            db=db,
+            query_text=q,
+            capabilities=caps_list,
+            capability_match=capability_match,
+            status=status_filter,
+            min_reputation=min_reputation,
+            limit=limit,
+            offset=offset,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code": "INVALID_CURSOR",
+                "message": str(e)
+            }
+        )
 
+    if not q:
+        set_next_cursor(response, agents, limit)
     return agents
 
 
-@router.get("/me", response_model=AgentResponse)
-async def get_current_agent_profile(
-    current_agent: Agent = Depends(get_current_agent),
-    db: AsyncSession = Depends(get_db)
-):
+async def _agent_response(db: AsyncSession, agent: Agent) -> AgentResponse:
     """
-    Get the current authenticated agent's profile with AGNT and USD balances.
+    Build an agent's own profile with the live ledger balance and USD equivalents.
+
+    agents.balance is only refreshed when the snapshotter folds, so it is
+    never serialized as the balance directly.
     """
     from app.config import settings
 
-    # Convert to response model
-    agent_response = AgentResponse.model_validate(current_agent)
+    # Convert to response model with the live ledger balance
+    agent_response = AgentResponse.model_validate(agent)
+    agent_response.balance = await get_balance(db, str(agent.id))
 
     # Calculate USD equivalents
     conversion_rate = settings.USDC_TO_AGNT_RATE
-    agent_response.balance_usd = current_agent.balance / conversion_rate
-    agent_response.total_earned_usd = current_agent.total_earned / conversion_rate
-    agent_response.total_spent_usd = current_agent.total_spent / conversion_rate
+    agent_response.balance_usd = agent_response.balance / conversion_rate
+    agent_response.total_earned_usd = agent.total_earned / conversion_rate
+    agent_response.total_spent_usd = agent.total_spent / conversion_rate
 
     # Set currency
     agent_response.balance_currency = "AGNT"
@@ -155,6 +178,17 @@ async def get_current_agent_profile(
     return agent_response
 
 
+@router.get("/me", response_model=AgentResponse)
+async def get_current_agent_profile(
+    current_agent: Agent = Depends(get_current_agent),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the current authenticated agent's profile with AGNT and USD balances.
+    """
+    return await _agent_response(db, current_agent)
+
+
 @router.get("/{agent_id}", response_model=AgentPublic)
 async def get_agent_profile(
     agent_id: str,
@@ -188,7 +222,6 @@ async def update_current_agent(
     """
     try:
         updated_agent = await update_agent(db, str(current_agent.id), updates)
-        return updated_agent
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -198,6 +231,8 @@ async def update_current_agent(
             }
         )
 
+    return await _agent_response(db, updated_agent)
+
 
 @router.put("/me/status", response_model=AgentResponse)
 async def update_agent_status(
@@ -219,7 +254,31 @@ async def update_agent_status(
 
     try:
         updated_agent = await update_agent(db, str(current_agent.id), status_update)
-        return updated_agent
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "code": "AGENT_NOT_FOUND",
+                "message": str(e)
+            }
+        )
+
+    return await _agent_response(db, updated_agent)
+
+
+@router.post("/me/api-key", response_model=AgentKeyRotateResponse)
+async def rotate_current_agent_api_key(
+    current_agent: Agent = Depends(get_current_agent),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Rotate the current agent's API key.
+
+    Returns the new API key ONLY ONCE - the old key is revoked immediately.
+    """
+    try:
+        agent, api_key = await rotate_api_key(db, str(current_agent.id))
+        return AgentKeyRotateResponse(agent_id=agent.id, api_key=api_key)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -2,12 +2,26 @@
 
 from typing import Optional
 from datetime import datetime
-from fastapi import Depends, HTTPException, status, Header
+from fastapi import Depends, HTTPException, status, Header, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.database import get_db
-from app.core.security import verify_api_key
+from app.core.auth_cache import AgentPrincipal, principal_cache
+from app.core.pagination import Cursor, decode_cursor
+from app.core.security import hash_api_key
+from app.services.presence_service import last_seen_writer
+
+
+def _invalid_api_key() -> HTTPException:
+    """Build the 401 raised for unknown API keys."""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail={
+            "code": "INVALID_API_KEY",
+            "message": "Invalid API key provided"
+        }
+    )
 
 
 async def get_current_agent(
@@ -17,6 +31,10 @@ async def get_current_agent(
     """
     Dependency that validates the X-Agent-Key header and returns the authenticated agent.
 
+    Use this when the endpoint needs the full Agent row (balance, profile).
+    Endpoints that only need the caller's identity should depend on
+    get_current_principal instead.
+
     Args:
         x_agent_key: API key from X-Agent-Key header
         db: Database session
@@ -28,26 +46,63 @@ async def get_current_agent(
         HTTPException: 401 if API key is invalid
     """
     # Import here to avoid circular imports
-    from app.models.agent import Agent
+    from app.services.agent_service import get_agent_by_api_key
 
-    # Query all agents to find matching API key hash
-    result = await db.execute(select(Agent))
-    agents = result.scalars().all()
+    # Indexed point lookup on the API key hash
+    generation = principal_cache.generation
+    agent = await get_agent_by_api_key(db, x_agent_key)
 
-    for agent in agents:
-        if verify_api_key(x_agent_key, agent.api_key_hash):
-            # Update last_seen_at
-            agent.last_seen_at = datetime.utcnow()
-            await db.commit()
-            return agent
+    if agent:
+        # Buffer last_seen_at for the batched writer; reflect it on the
+        # loaded row without marking it dirty
+        now = datetime.utcnow()
+        last_seen_writer.record(agent.id, now)
+        set_committed_value(agent, "last_seen_at", now)
 
-    raise HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail={
-            "code": "INVALID_API_KEY",
-            "message": "Invalid API key provided"
-        }
-    )
+        principal_cache.put(hash_api_key(x_agent_key), AgentPrincipal.from_agent(agent), generation)
+        return agent
+
+    raise _invalid_api_key()
+
+
+async def get_current_principal(
+    x_agent_key: str = Header(..., description="API key for authentication"),
+    db: AsyncSession = Depends(get_db)
+) -> AgentPrincipal:
+    """
+    Dependency that validates the X-Agent-Key header and returns a lightweight principal.
+
+    Served from the in-process principal cache when possible; only a cache
+    miss reads the agents table, and last_seen_at is written in batches.
+
+    Args:
+        x_agent_key: API key from X-Agent-Key header
+        db: Database session
+
+    Returns:
+        AgentPrincipal: Identity of the authenticated agent
+
+    Raises:
+        HTTPException: 401 if API key is invalid
+    """
+    from app.services.agent_service import get_agent_by_api_key
+
+    key_hash = hash_api_key(x_agent_key)
+    principal = principal_cache.get(key_hash)
+
+    if principal is None:
+        # Read first, so a rotation committed during the lookup is not undone
+        generation = principal_cache.generation
+        agent = await get_agent_by_api_key(db, x_agent_key)
+        if not agent:
+            raise _invalid_api_key()
+
+        principal = AgentPrincipal.from_agent(agent)
+        principal_cache.put(key_hash, principal, generation)
+
+    last_seen_writer.record(principal.id)
+
+    return principal
 
 
 async def get_optional_agent(
@@ -73,3 +128,33 @@ async def get_optional_agent(
         return await get_current_agent(x_agent_key, db)
     except HTTPException:
         return None
+
+
+def get_cursor(
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header")
+) -> Optional[Cursor]:
+    """
+    Dependency that decodes the keyset pagination cursor.
+
+    Args:
+        cursor: Cursor token from a previous page
+
+    Returns:
+        Optional[Cursor]: Decoded cursor, or None for the first page
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    if not cursor:
+        return None
+
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code": "INVALID_CURSOR",
+                "message": str(e)
+            }
+        )
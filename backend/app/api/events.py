@@ -1,44 +1,66 @@
 """Events API router for SSE and platform statistics."""
 
-import json
-from typing import Dict, Any, List
-from fastapi import APIRouter, Depends, Request
+from typing import Dict, Any, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from datetime import datetime, timedelta
 from sse_starlette.sse import EventSourceResponse
 
 from app.database import get_db
-from app.core.events import event_bus
-from app.models.agent import Agent
-from app.models.service import Service
-from app.models.job import Job
+from app.core.events import EventFilter, event_bus
+from app.services.graph_service import collaboration_graph
+from app.services.stats_service import platform_stats
 
 router = APIRouter()
 
 
 @router.get("/events")
-async def event_stream(request: Request):
+async def event_stream(
+    request: Request,
+    types: Optional[str] = Query(None, description="Comma-separated event types"),
+    agent_id: Optional[str] = Query(None, description="Only events involving this agent"),
+    job_id: Optional[str] = Query(None, description="Only events for this job"),
+    service_id: Optional[str] = Query(None, description="Only events for this service"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
     """
     Server-Sent Events (SSE) stream for real-time updates.
 
+    Filters are applied on the server; all given filters must match. An
+    agent filter matches events where the agent is the subject, client or
+    worker.
+
+    Every event carries an id made of the serving process's boot epoch and
+    an increasing sequence. Browsers resend the last one in the
+    Last-Event-ID header when they reconnect, and the events missed in
+    between are replayed before the live stream resumes. If the gap is too
+    old to replay, or the id comes from another worker or an earlier boot,
+    a stream_reset event tells the client to refetch.
+
     Usage:
-        const eventSource = new EventSource('/api/events');
+        const eventSource = new EventSource('/api/events?agent_id=...&types=job_created,job_completed');
         eventSource.addEventListener('job_created', (e) => {
             console.log(JSON.parse(e.data));
         });
     """
+    event_types = frozenset(t.strip() for t in types.split(",") if t.strip()) if types else None
+    event_filter = EventFilter(
+        types=event_types or None,
+        agent_id=agent_id,
+        job_id=job_id,
+        service_id=service_id,
+    )
+
+    # An unrecognised id forces a reset rather than silently skipping events
+    resume_after = last_event_id.strip() if last_event_id else None
+
     async def generate():
-        async for event in event_bus.subscribe():
+        async for event in event_bus.subscribe(event_filter, last_event_id=resume_after):
             # Check if client disconnected
             if await request.is_disconnected():
                 break
 
-            # Send event to client
-            yield {
-                "event": event["type"],
-                "data": json.dumps(event["data"])
-            }
+            # Send the frame rendered once at dispatch, shared by all clients
+            yield event["frame"]
 
     return EventSourceResponse(generate())
 
@@ -47,121 +69,124 @@ async def event_stream(request: Request):
 async def get_platform_stats(db: AsyncSession = Depends(get_db)) -> Dict[str, Any]:
     """
     Get platform-wide statistics.
-    """
-    # Total agents
-    total_agents_query = select(func.count()).select_from(Agent)
-    total_agents_result = await db.execute(total_agents_query)
-    total_agents = total_agents_result.scalar()
-
-    # Active agents (available status)
-    active_agents_query = select(func.count()).where(Agent.status == 'available')
-    active_agents_result = await db.execute(active_agents_query)
-    active_agents = active_agents_result.scalar()
-
-    # Total active services
-    total_services_query = select(func.count()).where(Service.is_active == True)
-    total_services_result = await db.execute(total_services_query)
-    total_services = total_services_result.scalar()
-
-    # Active jobs (pending, in_progress, delivered)
-    active_jobs_query = select(func.count()).where(
-        Job.status.in_(['pending', 'in_progress', 'delivered'])
-    )
-    active_jobs_result = await db.execute(active_jobs_query)
-    active_jobs = active_jobs_result.scalar()
-
-    # Completed jobs in last 24h
-    yesterday = datetime.utcnow() - timedelta(days=1)
-    completed_24h_query = select(func.count()).where(
-        and_(
-            Job.status == 'completed',
-            Job.completed_at >= yesterday
-        )
-    )
-    completed_24h_result = await db.execute(completed_24h_query)
-    completed_jobs_24h = completed_24h_result.scalar()
-
-    # Total volume (all completed jobs)
-    total_volume_query = select(func.sum(Job.price_usd)).where(Job.status == 'completed')
-    total_volume_result = await db.execute(total_volume_query)
-    total_volume_usd = total_volume_result.scalar() or 0
-
-    # Volume last 24h
-    volume_24h_query = select(func.sum(Job.price_usd)).where(
-        and_(
-            Job.status == 'completed',
-            Job.completed_at >= yesterday
-        )
-    )
-    volume_24h_result = await db.execute(volume_24h_query)
-    volume_24h_usd = volume_24h_result.scalar() or 0
 
-    return {
-        "total_agents": total_agents,
-        "active_agents": active_agents,
-        "total_services": total_services,
-        "active_jobs": active_jobs,
-        "completed_jobs_24h": completed_jobs_24h,
-        "total_volume_usd": float(total_volume_usd),
-        "volume_24h_usd": float(volume_24h_usd),
-    }
+    Served from counters maintained by lifecycle events and reconciled
+    with the database periodically; as_of and reconciled_at report how
+    fresh they are.
+    """
+    return await platform_stats.get(db)
 
 
 @router.get("/graph")
 async def get_collaboration_graph(
+    response: Response,
+    since_version: Optional[str] = Query(None, description="Only return changes after this graph version token"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
     db: AsyncSession = Depends(get_db)
-) -> Dict[str, List[Dict[str, Any]]]:
+):
     """
     Get collaboration graph data (nodes and edges).
 
     Nodes: Agents
     Edges: Job relationships (client -> worker)
+
+    Served from an in-memory graph updated by lifecycle events. The
+    response carries a version token and a matching ETag, both prefixed
+    with the serving process's epoch; a request whose If-None-Match equals
+    the current ETag gets 304 Not Modified. With since_version, only nodes
+    and edges changed after that version are returned, plus the ids of
+    removed ones. A token from another worker or an earlier boot gets the
+    full graph with reset set to true.
     """
-    # Get all agents as nodes
-    agents_query = select(Agent)
-    agents_result = await db.execute(agents_query)
-    agents = agents_result.scalars().all()
-
-    nodes = [
-        {
-            "id": str(agent.id),
-            "name": agent.name,
-            "type": "agent",
-            "reputation": float(agent.reputation_score),
-            "jobs": agent.jobs_completed + agent.jobs_hired,
+    await collaboration_graph.ensure_loaded(db)
+
+    etag = collaboration_graph.etag
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+
+    if since_version is not None:
+        return collaboration_graph.delta(since_version)
+    return collaboration_graph.snapshot()
+
+
+def _graph_agent_not_found(agent_id: str) -> HTTPException:
+    """Build the 404 raised for agents missing from the graph."""
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail={
+            "code": "AGENT_NOT_FOUND",
+            "message": f"Agent with ID {agent_id} not found"
         }
-        for agent in agents
-    ]
-
-    # Get job relationships as edges
-    # Group by client-worker pairs and count jobs + total value
-    from sqlalchemy import distinct, literal
-    edges_query = select(
-        Job.client_agent_id,
-        Job.worker_agent_id,
-        func.count(Job.id).label('jobs_count'),
-        func.sum(Job.price_usd).label('total_value')
-    ).where(
-        Job.status == 'completed'
-    ).group_by(
-        Job.client_agent_id,
-        Job.worker_agent_id
     )
 
-    edges_result = await db.execute(edges_query)
-    edges_data = edges_result.all()
 
-    edges = [
-        {
-            "source": str(row.client_agent_id),
-            "target": str(row.worker_agent_id),
-            "jobs_count": row.jobs_count,
-            "total_value": float(row.total_value or 0),
-        }
-        for row in edges_data
-    ]
+@router.get("/graph/agents/{agent_id}/subgraph")
+async def get_agent_subgraph(
+    agent_id: str,
+    hops: int = Query(1, ge=1, le=3, description="Maximum distance from the agent"),
+    max_nodes: int = Query(500, ge=1, le=5000, description="Cap on returned nodes"),
+    db: AsyncSession = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Get an agent's k-hop neighbourhood in the collaboration graph.
+
+    Job relationships are followed in both directions. Each node carries
+    its hop distance; truncated is true when max_nodes cut the search short.
+    """
+    await collaboration_graph.ensure_loaded(db)
+    if not collaboration_graph.has_node(agent_id):
+        raise _graph_agent_not_found(agent_id)
+
+    return collaboration_graph.neighbourhood(agent_id, hops=hops, max_nodes=max_nodes)
+
+
+@router.get("/graph/agents/{agent_id}/partners")
+async def get_agent_partners(
+    agent_id: str,
+    k: int = Query(10, ge=1, le=100, description="Number of partners"),
+    db: AsyncSession = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Get an agent's top-k trading partners by completed-job volume.
+
+    Volume as client and as worker is combined per partner.
+    """
+    await collaboration_graph.ensure_loaded(db)
+    if not collaboration_graph.has_node(agent_id):
+        raise _graph_agent_not_found(agent_id)
 
     return {
-        "nodes": nodes,
-        "edges": edges,
+        "version": collaboration_graph.version_token,
+        "agent_id": agent_id,
+        "partners": collaboration_graph.top_partners(agent_id, k),
     }
+
+
+@router.get("/graph/centrality")
+async def get_graph_centrality(
+    metric: str = Query("pagerank", description="pagerank or degree"),
+    limit: int = Query(20, ge=1, le=500),
+    db: AsyncSession = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Rank agents by centrality in the collaboration graph.
+
+    pagerank weights client -> worker edges by completed jobs, so it ranks
+    workers hired by well-connected clients; degree counts distinct
+    trading partners. Scores are recomputed in the background when the
+    graph changes; version is the graph version they reflect.
+    """
+    await collaboration_graph.ensure_loaded(db)
+
+    try:
+        return await collaboration_graph.centrality(metric, limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code": "INVALID_METRIC",
+                "message": str(e)
+            }
+        )
@@ -2,12 +2,13 @@
 
 from typing import Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.api.deps import get_current_agent
-from app.models.agent import Agent
+from app.api.deps import get_current_principal, get_cursor
+from app.core.auth_cache import AgentPrincipal
+from app.core.pagination import Cursor, set_next_cursor
 from app.schemas.message import MessageList, MessageResponse, MarkReadResponse
 from app.services.message_service import get_inbox, mark_as_read
 
@@ -16,16 +17,21 @@ router = APIRouter()
 
 @router.get("", response_model=MessageList)
 async def get_agent_inbox(
+    response: Response,
     unread_only: bool = Query(False),
     job_id: Optional[str] = Query(None),
     since: Optional[datetime] = Query(None),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
-    current_agent: Agent = Depends(get_current_agent),
+    offset: int = Query(0, ge=0, deprecated=True, description="Use cursor instead"),
+    cursor: Optional[Cursor] = Depends(get_cursor),
+    current_agent: AgentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Get messages for the current agent.
+    Get messages for the current agent, newest first.
+
+    The next page cursor is returned as next_cursor and in the
+    X-Next-Cursor header.
     """
     messages, total, unread_count = await get_inbox(
         db=db,
@@ -34,20 +40,22 @@ async def get_agent_inbox(
         job_id=job_id,
         since=since,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor
     )
 
     return MessageList(
         messages=[MessageResponse.model_validate(m) for m in messages],
         total=total,
-        unread_count=unread_count
+        unread_count=unread_count,
+        next_cursor=set_next_cursor(response, messages, limit)
     )
 
 
 @router.post("/{message_id}/read", response_model=MarkReadResponse)
 async def mark_message_read(
     message_id: str,
-    current_agent: Agent = Depends(get_current_agent),
+    current_agent: AgentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -3,13 +3,15 @@
 import logging
 from typing import List, Optional
 from decimal import Decimal
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_
 
 from app.database import get_db
-from app.api.deps import get_current_agent
+from app.api.deps import get_current_agent, get_current_principal, get_cursor
 from app.models.agent import Agent
+from app.core.auth_cache import AgentPrincipal
+from app.core.pagination import Cursor, apply_keyset, set_next_cursor
 from app.models.job import Job
 from app.models.service import Service
 from app.schemas.job import (
@@ -20,6 +22,14 @@ from app.schemas.job import (
     JobComplete,
     JobStatusResponse,
     JobResponse,
+    JobBatchCreate,
+    JobBatchStart,
+    JobBatchDeliver,
+    JobBatchComplete,
+    JobBatchError,
+    JobBatchItemResult,
+    JobBatchResponse,
+    JobTreeResponse,
 )
 from app.services.job_service import (
     create_job,
@@ -29,9 +39,16 @@ from app.services.job_service import (
     complete_job,
     cancel_job,
     get_job_by_id,
+    get_job_tree,
+    hire_batch,
+    start_batch,
+    deliver_batch,
+    complete_batch,
 )
 from app.middleware.x402 import create_x402_response, verify_x402_payment
-from app.services.agent_service import update_balance
+from app.services.ledger_service import get_balance
+from app.services.job_queue_service import worker_job_queue
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -191,23 +208,21 @@ async def hire_service(
             logger.info(f"Job payment using AGNT balance: client={current_agent.id}, amount={job_price}")
 
             # Check sufficient balance
-            if current_agent.balance < job_price:
+            available = await get_balance(db, str(current_agent.id))
+            if available < job_price:
                 usdc_required = job_price / settings.USDC_TO_AGNT_RATE
                 raise HTTPException(
                     status_code=status.HTTP_402_PAYMENT_REQUIRED,
                     detail={
                         "error": "insufficient_balance",
-                        "message": f"Insufficient balance. Required: {job_price} AGNT (~${usdc_required:.2f}), Available: {current_agent.balance} AGNT",
+                        "message": f"Insufficient balance. Required: {job_price} AGNT (~${usdc_required:.2f}), Available: {available} AGNT",
                         "required_agnt": str(job_price),
                         "required_usd": str(usdc_required),
-                        "available_agnt": str(current_agent.balance)
+                        "available_agnt": str(available)
                     }
                 )
 
-            # Deduct from client
-            await update_balance(db, str(current_agent.id), -job_price)
-
-            # Create job with pricing metadata
+            # Debit into escrow and create the job (plus quote state) in one commit
             job = await create_job(
                 db,
                 str(current_agent.id),
@@ -215,7 +230,9 @@ async def hire_service(
                 price_agnt=job_price,
                 quote_id=job_data.quote_id,
                 negotiation_id=job_data.negotiation_id,
-                negotiated_by=negotiated_by
+                negotiated_by=negotiated_by,
+                service=service,
+                pay_from_balance=True
             )
 
             logger.info(f"Job created with AGNT balance payment: job_id={job.id}, price={job_price} AGNT")
@@ -269,7 +286,7 @@ async def hire_service(
                     detail="Invalid payment proof. Please verify the transaction hash and amount."
                 )
 
-            # Payment verified - create job
+            # Payment verified - create job with the payment proof in its metadata
             job = await create_job(
                 db,
                 str(current_agent.id),
@@ -277,18 +294,16 @@ async def hire_service(
                 price_agnt=job_price,
                 quote_id=job_data.quote_id,
                 negotiation_id=job_data.negotiation_id,
-                negotiated_by=negotiated_by
+                negotiated_by=negotiated_by,
+                service=service,
+                payment_metadata={
+                    "x402_payment_proof": x402_payment_proof,
+                    "x402_recipient": worker_agent.wallet_address,
+                    "x402_usdc_amount": str(usdc_price),
+                    "x402_agnt_equivalent": str(job_price),
+                }
             )
 
-            # Store payment proof in job metadata
-            if job.input_data is None:
-                job.input_data = {}
-            job.input_data["x402_payment_proof"] = x402_payment_proof
-            job.input_data["x402_recipient"] = worker_agent.wallet_address
-            job.input_data["x402_usdc_amount"] = str(usdc_price)
-            job.input_data["x402_agnt_equivalent"] = str(job_price)
-            await db.commit()
-
             logger.info(f"Job created with x402 payment: job_id={job.id}, tx_hash={x402_payment_proof}")
 
             # Enrich response with USD equivalent
@@ -299,6 +314,15 @@ async def hire_service(
 
     except ValueError as e:
         error_msg = str(e).lower()
+        if "insufficient balance" in error_msg:
+            # Balance was spent by a concurrent request after the check above
+            raise HTTPException(
+                status_code=status.HTTP_402_PAYMENT_REQUIRED,
+                detail={
+                    "error": "insufficient_balance",
+                    "message": str(e)
+                }
+            )
         if "not found" in error_msg:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -320,15 +344,20 @@ async def hire_service(
 
 @router.get("", response_model=List[JobResponse])
 async def list_jobs(
+    response: Response,
     status_filter: str = Query(None, alias="status"),
     as_role: str = Query(None, description="Filter by role: client or worker"),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
-    current_agent: Agent = Depends(get_current_agent),
+    offset: int = Query(0, ge=0, deprecated=True, description="Use cursor instead"),
+    cursor: Optional[Cursor] = Depends(get_cursor),
+    current_agent: AgentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    List jobs for the current agent.
+    List jobs for the current agent, newest first.
+
+    Pass the X-Next-Cursor response header back as `cursor` to get the
+    next page.
     """
     from sqlalchemy.orm import selectinload
 
@@ -347,18 +376,150 @@ async def list_jobs(
     if status_filter:
         query = query.where(Job.status == status_filter)
 
-    query = query.order_by(Job.created_at.desc()).offset(offset).limit(limit)
+    query = apply_keyset(query, Job, cursor)
+    if cursor is None and offset:
+        query = query.offset(offset)
+    query = query.limit(limit)
 
     result = await db.execute(query)
     jobs = list(result.scalars().all())
 
+    set_next_cursor(response, jobs, limit)
     return jobs
 
 
+def _batch_error_code(message: str) -> str:
+    """Map a job service error message to the code the single-item endpoints use."""
+    error_msg = message.lower()
+    if "service not found" in error_msg:
+        return "SERVICE_NOT_FOUND"
+    if "not found" in error_msg:
+        return "JOB_NOT_FOUND"
+    if "not the worker" in error_msg:
+        return "NOT_JOB_WORKER"
+    if "not the client" in error_msg:
+        return "NOT_JOB_CLIENT"
+    if "not available" in error_msg:
+        return "SERVICE_NOT_AVAILABLE"
+    if "rating must be" in error_msg:
+        return "INVALID_RATING"
+    if "cannot " in error_msg:
+        return "JOB_INVALID_STATE"
+    return "INVALID_REQUEST"
+
+
+def _batch_response(results, total_price_agnt: Optional[Decimal] = None) -> JobBatchResponse:
+    """Build a JobBatchResponse from per-item (job, error message) results."""
+    items = []
+    for index, (job, error) in enumerate(results):
+        if error is None:
+            items.append(JobBatchItemResult(index=index, success=True, job=JobResponse.model_validate(job)))
+        else:
+            items.append(JobBatchItemResult(
+                index=index,
+                success=False,
+                error=JobBatchError(code=_batch_error_code(error), message=error),
+            ))
+    succeeded = sum(1 for item in items if item.success)
+    return JobBatchResponse(
+        results=items,
+        succeeded=succeeded,
+        failed=len(items) - succeeded,
+        total_price_agnt=total_price_agnt,
+    )
+
+
+@router.post("/batch", response_model=JobBatchResponse)
+async def hire_services_batch(
+    batch: JobBatchCreate,
+    current_agent: AgentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Hire several services in one request, paid from AGNT balance.
+
+    Each item uses the service midpoint price. The balance is checked once
+    for the whole batch and all jobs are created in one transaction; items
+    with a missing or inactive service, or with quote_id/negotiation_id,
+    fail individually. Returns 402 if the balance cannot cover the batch.
+    """
+    try:
+        results, total = await hire_batch(db, str(current_agent.id), batch.items)
+    except ValueError as e:
+        if "insufficient balance" in str(e).lower():
+            raise HTTPException(
+                status_code=status.HTTP_402_PAYMENT_REQUIRED,
+                detail={
+                    "error": "insufficient_balance",
+                    "message": str(e)
+                }
+            )
+        raise
+    return _batch_response(results, total)
+
+
+@router.post("/batch/start", response_model=JobBatchResponse)
+async def start_jobs_batch(
+    batch: JobBatchStart,
+    current_agent: AgentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Start several jobs in one transaction (worker only).
+    """
+    results = await start_batch(db, batch.job_ids, str(current_agent.id))
+    return _batch_response(results)
+
+
+@router.post("/batch/deliver", response_model=JobBatchResponse)
+async def deliver_jobs_batch(
+    batch: JobBatchDeliver,
+    current_agent: AgentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Deliver work for several jobs in one transaction (worker only).
+    """
+    results = await deliver_batch(db, batch.items, str(current_agent.id))
+    return _batch_response(results)
+
+
+@router.post("/batch/complete", response_model=JobBatchResponse)
+async def complete_jobs_batch(
+    batch: JobBatchComplete,
+    current_agent: AgentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Complete and rate several jobs in one transaction (client only).
+    """
+    results = await complete_batch(db, batch.items, str(current_agent.id))
+    return _batch_response(results)
+
+
+@router.get("/next", response_model=JobResponse, responses={204: {"description": "No job assigned before wait expired"}})
+async def claim_next_job_work(
+    wait: float = Query(30, ge=0, le=settings.JOB_QUEUE_MAX_WAIT_SECONDS, description="Seconds to wait for a job"),
+    current_agent: AgentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Claim your oldest pending job as a worker, long-polling until one arrives.
+
+    The job is moved to in_progress atomically, exactly as POST
+    /api/jobs/{id}/start would, so concurrent pollers never get the same
+    job. Returns 204 if nothing was assigned within wait seconds.
+    """
+    job = await worker_job_queue.claim(db, str(current_agent.id), wait)
+    if job is None:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    return job
+
+
 @router.get("/{job_id}", response_model=JobResponse)
 async def get_job_details(
     job_id: str,
-    current_agent: Agent = Depends(get_current_agent),
+    current_agent: AgentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -389,11 +550,58 @@ async def get_job_details(
     return job
 
 
+@router.get("/{job_id}/tree", response_model=JobTreeResponse)
+async def get_job_tree_details(
+    job_id: str,
+    depth: int = Query(3, ge=0, le=settings.JOB_TREE_MAX_DEPTH, description="Levels of sub-jobs to include"),
+    max_nodes: int = Query(settings.JOB_TREE_MAX_NODES, ge=1, le=settings.JOB_TREE_MAX_NODES),
+    current_agent: AgentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get a job with its sub-jobs down to depth levels (client or worker of the root).
+
+    Each node includes status counts and total AGNT cost of its subtree.
+    If more than max_nodes jobs are in range, the shallowest are returned,
+    truncated is set, and summary still covers the whole tree.
+    """
+    try:
+        tree = await get_job_tree(db, job_id, depth=depth, max_nodes=max_nodes)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "code": "JOB_NOT_FOUND",
+                "message": str(e)
+            }
+        )
+
+    # Verify access
+    job = tree["job"]
+    if str(job.client_agent_id) != str(current_agent.id) and \
+       str(job.worker_agent_id) != str(current_agent.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={
+                "code": "NOT_AUTHORIZED",
+                "message": "You are not authorized to view this job"
+            }
+        )
+
+    return JobTreeResponse(
+        root=tree["tree"],
+        parent=tree["parent"],
+        summary=tree["summary"],
+        depth=tree["depth"],
+        truncated=tree["truncated"],
+    )
+
+
 @router.post("/{job_id}/start", response_model=JobStatusResponse)
 async def start_job_work(
     job_id: str,
     start_data: JobStart,
-    current_agent: Agent = Depends(get_current_agent),
+    current_agent: AgentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -439,7 +647,7 @@ async def start_job_work(
 async def deliver_job_work(
     job_id: str,
     deliverable: JobDeliver,
-    current_agent: Agent = Depends(get_current_agent),
+    current_agent: AgentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -485,7 +693,7 @@ async def deliver_job_work(
 async def request_job_revision(
     job_id: str,
     revision_request: JobRequestRevision,
-    current_agent: Agent = Depends(get_current_agent),
+    current_agent: AgentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -533,7 +741,7 @@ async def request_job_revision(
 async def complete_job_with_rating(
     job_id: str,
     completion: JobComplete,
-    current_agent: Agent = Depends(get_current_agent),
+    current_agent: AgentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -584,7 +792,7 @@ async def complete_job_with_rating(
 @router.post("/{job_id}/cancel", response_model=JobStatusResponse)
 async def cancel_pending_job(
     job_id: str,
-    current_agent: Agent = Depends(get_current_agent),
+    current_agent: AgentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
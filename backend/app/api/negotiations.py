@@ -7,8 +7,8 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_agent
-from app.models.agent import Agent
+from app.api.deps import get_db, get_current_principal
+from app.core.auth_cache import AgentPrincipal
 from app.services.p2p_negotiation_service import p2p_negotiation_service
 from app.schemas.negotiation import (
     NegotiationStartRequest,
@@ -24,7 +24,7 @@ router = APIRouter(prefix="/negotiations", tags=["negotiations"])
 async def start_negotiation(
     request: NegotiationStartRequest,
     db: AsyncSession = Depends(get_db),
-    current_agent: Agent = Depends(get_current_agent)
+    current_agent: AgentPrincipal = Depends(get_current_principal)
 ):
     """
     Start a price negotiation with a service provider.
@@ -68,7 +68,7 @@ async def respond_to_negotiation(
     negotiation_id: str,
     request: NegotiationRespondRequest,
     db: AsyncSession = Depends(get_db),
-    current_agent: Agent = Depends(get_current_agent)
+    current_agent: AgentPrincipal = Depends(get_current_principal)
 ):
     """
     Respond to a negotiation offer.
@@ -125,7 +125,7 @@ async def respond_to_negotiation(
 async def get_negotiation(
     negotiation_id: str,
     db: AsyncSession = Depends(get_db),
-    current_agent: Agent = Depends(get_current_agent)
+    current_agent: AgentPrincipal = Depends(get_current_principal)
 ):
     """
     Get details of a specific negotiation.
@@ -152,7 +152,7 @@ async def get_negotiation(
 async def list_my_negotiations(
     status_filter: Optional[str] = Query(None, description="Filter by status: active, agreed, rejected, expired"),
     db: AsyncSession = Depends(get_db),
-    current_agent: Agent = Depends(get_current_agent)
+    current_agent: AgentPrincipal = Depends(get_current_principal)
 ):
     """
     List all negotiations where you're involved (as client or worker).
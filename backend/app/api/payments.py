@@ -5,13 +5,15 @@ from decimal import Decimal
 from typing import Optional, List
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field, field_validator
 
+from app.config import settings
 from app.database import get_db
-from app.api.deps import get_current_agent
-from app.models.agent import Agent
+from app.api.deps import get_current_principal, get_cursor
+from app.core.auth_cache import AgentPrincipal
+from app.core.pagination import Cursor, set_next_cursor
 from app.models.payment_transaction import (
     PaymentTransaction,
     TransactionStatus,
@@ -90,12 +92,13 @@ class PaymentVerificationResponse(BaseModel):
     """Response model for payment verification."""
 
     success: bool = Field(..., description="Whether the payment was successfully verified and credited")
+    status: TransactionStatus = Field(..., description="credited, or pending while waiting for confirmations")
     transaction_id: str = Field(..., description="Internal transaction ID for tracking")
     tx_hash: str = Field(..., description="Blockchain transaction hash")
     amount: Decimal = Field(..., description="Amount credited")
     currency: str = Field(..., description="Currency code")
-    new_balance: Decimal = Field(..., description="Updated balance of the credited agent")
-    credited_agent_id: str = Field(..., description="ID of the agent who received the credit")
+    new_balance: Optional[Decimal] = Field(None, description="Updated balance of the credited agent")
+    credited_agent_id: Optional[str] = Field(None, description="ID of the agent who received the credit")
     message: str = Field(..., description="Human-readable status message")
     verified_at: Optional[datetime] = Field(None, description="Timestamp when transaction was verified")
     credited_at: Optional[datetime] = Field(None, description="Timestamp when balance was credited")
@@ -104,6 +107,46 @@ class PaymentVerificationResponse(BaseModel):
         from_attributes = True
 
 
+class PaymentBatchVerificationRequest(BaseModel):
+    """Request model for batch payment verification."""
+
+    items: List[PaymentVerificationRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.PAYMENT_BATCH_MAX_ITEMS,
+        description="Payments to verify, each as accepted by /verify"
+    )
+
+
+class PaymentBatchError(BaseModel):
+    """Why one payment in a batch was not credited."""
+
+    code: str
+    message: str
+
+
+class PaymentBatchItemResult(BaseModel):
+    """Outcome of one payment in a batch, in request order."""
+
+    index: int = Field(..., description="Position of the payment in the request")
+    tx_hash: str = Field(..., description="Blockchain transaction hash")
+    success: bool = Field(..., description="Whether the payment was verified and credited")
+    transaction_id: Optional[str] = Field(None, description="Internal transaction ID, if a record was written")
+    amount: Optional[Decimal] = Field(None, description="Amount credited")
+    currency: Optional[str] = Field(None, description="Currency code")
+    credited_agent_id: Optional[str] = Field(None, description="ID of the agent who received the credit")
+    new_balance: Optional[Decimal] = Field(None, description="Balance of the credited agent after the whole batch")
+    error: Optional[PaymentBatchError] = None
+
+
+class PaymentBatchVerificationResponse(BaseModel):
+    """Response model for batch payment verification."""
+
+    results: List[PaymentBatchItemResult]
+    succeeded: int
+    failed: int
+
+
 class TransactionHistoryItem(BaseModel):
     """Transaction history item."""
 
@@ -133,13 +176,20 @@ class TransactionHistoryResponse(BaseModel):
     total: int
     offset: int
     limit: int
+    next_cursor: Optional[str] = None
 
 
 # API Endpoints
-@router.post("/verify", response_model=PaymentVerificationResponse, status_code=status.HTTP_200_OK)
+@router.post(
+    "/verify",
+    response_model=PaymentVerificationResponse,
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_202_ACCEPTED: {"model": PaymentVerificationResponse}}
+)
 async def verify_payment(
     payment_data: PaymentVerificationRequest,
-    current_agent: Agent = Depends(get_current_agent),
+    response: Response,
+    current_agent: AgentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -165,6 +215,13 @@ async def verify_payment(
     - On-chain verification of amount and recipient
     - Transaction audit trail
     - Idempotent retries for failed transactions
+
+    **Confirmations:**
+    If the transaction is not mined yet or is fewer than MIN_CONFIRMATIONS
+    blocks deep, the payment is recorded as pending and 202 is returned.
+    There is no need to poll: it is credited in the background once deep
+    enough, and payment_credited or payment_failed is published to the
+    agent's event stream. Re-submitting a pending hash returns 202 again.
     """
     logger.info(
         f"Payment verification request from agent {current_agent.id}: "
@@ -192,6 +249,21 @@ async def verify_payment(
             token_address=payment_data.token_address
         )
 
+        if credited_agent is None:
+            response.status_code = status.HTTP_202_ACCEPTED
+            return PaymentVerificationResponse(
+                success=False,
+                status=payment_tx.status,
+                transaction_id=payment_tx.id,
+                tx_hash=payment_tx.tx_hash,
+                amount=payment_tx.amount,
+                currency=payment_tx.currency,
+                message=(
+                    f"Waiting for {settings.MIN_CONFIRMATIONS} confirmation(s); "
+                    f"the payment will be credited automatically"
+                )
+            )
+
         logger.info(
             f"Payment verified and credited successfully: tx_id={payment_tx.id}, "
             f"credited_agent={credited_agent.id}, new_balance={credited_agent.balance}"
@@ -199,6 +271,7 @@ async def verify_payment(
 
         return PaymentVerificationResponse(
             success=True,
+            status=payment_tx.status,
             transaction_id=payment_tx.id,
             tx_hash=payment_tx.tx_hash,
             amount=payment_tx.amount,
@@ -220,13 +293,97 @@ async def verify_payment(
         )
 
 
+def _batch_error_code(message: str) -> str:
+    """Map a batch verification error message to a stable error code."""
+    error_msg = message.lower()
+    if "more than once" in error_msg:
+        return "DUPLICATE_TX_HASH"
+    if "already been processed" in error_msg:
+        return "ALREADY_CREDITED"
+    if "already being verified" in error_msg:
+        return "VERIFICATION_IN_PROGRESS"
+    if "waiting for" in error_msg:
+        return "CONFIRMATION_PENDING"
+    if "verification failed" in error_msg:
+        return "VERIFICATION_FAILED"
+    if "recipient" in error_msg:
+        return "INVALID_RECIPIENT"
+    if "balance update failed" in error_msg:
+        return "CREDIT_FAILED"
+    return "INVALID_REQUEST"
+
+
+@router.post("/verify-batch", response_model=PaymentBatchVerificationResponse)
+async def verify_payment_batch(
+    batch: PaymentBatchVerificationRequest,
+    current_agent: AgentPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Verify several on-chain payments and credit every valid one.
+
+    Takes up to PAYMENT_BATCH_MAX_ITEMS payments, each as accepted by /verify.
+    All receipts are fetched in one JSON-RPC batch request and checked
+    concurrently; the valid payments are credited in a single database
+    transaction. Each payment succeeds or fails on its own with the same
+    replay protection as /verify, and results are returned in request order.
+    """
+    logger.info(
+        f"Batch payment verification request from agent {current_agent.id}: "
+        f"{len(batch.items)} transactions"
+    )
+
+    results, balances = await payment_verification_service.verify_and_credit_batch(
+        db=db,
+        items=batch.items,
+        initiator_agent_id=str(current_agent.id)
+    )
+
+    items = []
+    for index, (item, (payment_tx, error)) in enumerate(zip(batch.items, results)):
+        if error is not None:
+            items.append(PaymentBatchItemResult(
+                index=index,
+                tx_hash=item.tx_hash,
+                success=False,
+                transaction_id=payment_tx.id if payment_tx is not None else None,
+                error=PaymentBatchError(code=_batch_error_code(error), message=error),
+            ))
+            continue
+
+        credited_agent_id = (
+            payment_tx.recipient_agent_id
+            if payment_tx.transaction_type == TransactionType.P2P
+            else payment_tx.initiator_agent_id
+        )
+        items.append(PaymentBatchItemResult(
+            index=index,
+            tx_hash=payment_tx.tx_hash,
+            success=True,
+            transaction_id=payment_tx.id,
+            amount=payment_tx.amount,
+            currency=payment_tx.currency,
+            credited_agent_id=str(credited_agent_id),
+            new_balance=balances.get(str(credited_agent_id)),
+        ))
+
+    succeeded = sum(1 for item in items if item.success)
+    return PaymentBatchVerificationResponse(
+        results=items,
+        succeeded=succeeded,
+        failed=len(items) - succeeded,
+    )
+
+
 @router.get("/history", response_model=TransactionHistoryResponse)
 async def get_payment_history(
-    current_agent: Agent = Depends(get_current_agent),
+    response: Response,
+    current_agent: AgentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
     status_filter: Optional[TransactionStatus] = Query(None, description="Filter by transaction status"),
     limit: int = Query(50, ge=1, le=100, description="Maximum number of results"),
-    offset: int = Query(0, ge=0, description="Pagination offset")
+    offset: int = Query(0, ge=0, deprecated=True, description="Pagination offset (use cursor instead)"),
+    cursor: Optional[Cursor] = Depends(get_cursor)
 ):
     """
     Get payment transaction history for the current agent.
@@ -234,7 +391,8 @@ async def get_payment_history(
     Returns all transactions where the current agent is either the initiator
     or the recipient, ordered by creation time (newest first).
 
-    Supports filtering by transaction status and pagination.
+    Supports filtering by transaction status and keyset pagination: pass
+    next_cursor (also sent as X-Next-Cursor) back as `cursor`.
     """
     logger.info(
         f"Transaction history request from agent {current_agent.id}: "
@@ -246,21 +404,23 @@ async def get_payment_history(
         agent_id=str(current_agent.id),
         status_filter=status_filter,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor
     )
 
     return TransactionHistoryResponse(
         transactions=[TransactionHistoryItem.model_validate(tx) for tx in transactions],
         total=len(transactions),
         offset=offset,
-        limit=limit
+        limit=limit,
+        next_cursor=set_next_cursor(response, transactions, limit)
     )
 
 
 @router.get("/transactions/{transaction_id}", response_model=TransactionHistoryItem)
 async def get_transaction_details(
     transaction_id: str,
-    current_agent: Agent = Depends(get_current_agent),
+    current_agent: AgentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -2,12 +2,13 @@
 
 from typing import List, Optional
 from decimal import Decimal
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.api.deps import get_current_agent
-from app.models.agent import Agent
+from app.api.deps import get_current_principal, get_cursor
+from app.core.auth_cache import AgentPrincipal
+from app.core.pagination import Cursor, set_next_cursor
 from app.schemas.service import ServiceCreate, ServiceUpdate, ServicePublic, ServiceResponse
 from app.services.marketplace_service import (
     create_service,
@@ -23,7 +24,7 @@ router = APIRouter()
 @router.post("", response_model=ServiceResponse, status_code=status.HTTP_201_CREATED)
 async def create_new_service(
     service_data: ServiceCreate,
-    current_agent: Agent = Depends(get_current_agent),
+    current_agent: AgentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -35,7 +36,9 @@ async def create_new_service(
 
 @router.get("", response_model=List[ServicePublic])
 async def browse_services(
+    response: Response,
     capabilities: Optional[str] = Query(None, description="Comma-separated capabilities"),
+    capability_match: str = Query("any", pattern="^(any|all)$", description="Match any or all capabilities"),
     min_price_agnt: Optional[Decimal] = Query(None, ge=0, description="Minimum price in AGNT"),
     max_price_agnt: Optional[Decimal] = Query(None, ge=0, description="Maximum price in AGNT"),
     # Legacy USD filters (deprecated but supported for backward compatibility)
@@ -45,13 +48,16 @@ async def browse_services(
     agent_id: Optional[str] = Query(None),
     search: Optional[str] = Query(None, description="Search in name/description"),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, deprecated=True, description="Use cursor instead (still used with search)"),
+    cursor: Optional[Cursor] = Depends(get_cursor),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Browse marketplace services (public endpoint).
 
     Supports filtering by AGNT price ranges. Legacy USD filters are deprecated.
+    Listings are newest first and paged with the X-Next-Cursor header;
+    text searches are ordered by relevance and paged with offset.
     """
     from app.config import settings
 
@@ -66,17 +72,31 @@ async def browse_services(
     if max_price and not max_price_agnt:
         max_price_agnt = max_price * settings.USDC_TO_AGNT_RATE
 
-    services = await search_services(
-        db=db,
-        capabilities=caps_list,
-        min_price=min_price_agnt,
-        max_price=max_price_agnt,
-        output_type=output_type,
-        agent_id=agent_id,
-        search_text=search,
-        limit=limit,
-        offset=offset
-    )
+    try:
+        services = await search_services(
+            db=db,
+            capabilities=caps_list,
+            capability_match=capability_match,
+            min_price=min_price_agnt,
+            max_price=max_price_agnt,
+            output_type=output_type,
+            agent_id=agent_id,
+            search_text=search,
+            limit=limit,
+            offset=offset,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code": "INVALID_CURSOR",
+                "message": str(e)
+            }
+        )
+
+    if not search:
+        set_next_cursor(response, services, limit)
 
     # Enrich with agent name and USD equivalents
     result = []
@@ -126,7 +146,7 @@ async def get_service_details(
 async def update_existing_service(
     service_id: str,
     updates: ServiceUpdate,
-    current_agent: Agent = Depends(get_current_agent),
+    current_agent: AgentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -160,7 +180,7 @@ async def update_existing_service(
 @router.delete("/{service_id}", response_model=ServiceResponse)
 async def deactivate_existing_service(
     service_id: str,
-    current_agent: Agent = Depends(get_current_agent),
+    current_agent: AgentPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
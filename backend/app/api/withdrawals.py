@@ -1,17 +1,21 @@
 """Withdrawal API endpoints."""
 
 import logging
+from typing import Optional
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.api.deps import get_db, get_current_agent
+from app.api.deps import get_db, get_current_agent, get_current_principal, get_cursor
 from app.models.agent import Agent
+from app.core.auth_cache import AgentPrincipal
+from app.core.pagination import Cursor, apply_keyset, set_next_cursor
 from app.models.withdrawal_transaction import WithdrawalTransaction
 from app.schemas.withdrawal import WithdrawalRequest, WithdrawalResponse, WithdrawalRequestResponse
 from app.services.withdrawal_service import withdrawal_service
+from app.services.ledger_service import get_balance
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -96,9 +100,6 @@ async def request_withdrawal(
                 detail=str(e)
             )
 
-        # Refresh agent to get updated balance
-        await db.refresh(current_agent)
-
         # Execute withdrawal synchronously so the response includes the tx hash
         success = await withdrawal_service.execute_withdrawal(withdrawal, db)
         await db.refresh(withdrawal)
@@ -117,7 +118,7 @@ async def request_withdrawal(
             success=success,
             message=message,
             withdrawal=WithdrawalResponse.model_validate(withdrawal),
-            agent_new_balance=current_agent.balance,
+            agent_new_balance=await get_balance(db, str(current_agent.id)),
             estimated_usdc=withdrawal.usdc_amount_out,
             fee_agnt=withdrawal.fee_agnt
         )
@@ -135,31 +136,38 @@ async def request_withdrawal(
 
 @router.get("/history", response_model=list[WithdrawalResponse])
 async def get_withdrawal_history(
+    response: Response,
     db: AsyncSession = Depends(get_db),
-    current_agent: Agent = Depends(get_current_agent),
+    current_agent: AgentPrincipal = Depends(get_current_principal),
     limit: int = 50,
-    offset: int = 0
+    offset: int = Query(0, ge=0, deprecated=True),
+    cursor: Optional[Cursor] = Depends(get_cursor)
 ):
     """
-    Get withdrawal transaction history for the current agent.
+    Get withdrawal transaction history for the current agent, newest first.
 
     Args:
+        response: Outgoing response (carries X-Next-Cursor)
         db: Database session
         current_agent: Authenticated agent
         limit: Maximum number of withdrawals to return
-        offset: Number of withdrawals to skip
+        offset: Number of withdrawals to skip (deprecated; use cursor)
+        cursor: Keyset position from a previous page's X-Next-Cursor
 
     Returns:
         List of withdrawal transactions
     """
-    result = await db.execute(
-        select(WithdrawalTransaction)
-        .where(WithdrawalTransaction.agent_id == current_agent.id)
-        .order_by(WithdrawalTransaction.created_at.desc())
-        .limit(limit)
-        .offset(offset)
+    query = apply_keyset(
+        select(WithdrawalTransaction).where(WithdrawalTransaction.agent_id == current_agent.id),
+        WithdrawalTransaction,
+        cursor
     )
+    if cursor is None and offset:
+        query = query.offset(offset)
+
+    result = await db.execute(query.limit(limit))
     withdrawals = result.scalars().all()
+    set_next_cursor(response, withdrawals, limit)
 
     return [WithdrawalResponse.model_validate(w) for w in withdrawals]
 
@@ -168,7 +176,7 @@ async def get_withdrawal_history(
 async def get_withdrawal(
     withdrawal_id: str,
     db: AsyncSession = Depends(get_db),
-    current_agent: Agent = Depends(get_current_agent)
+    current_agent: AgentPrincipal = Depends(get_current_principal)
 ):
     """
     Get details of a specific withdrawal transaction.
@@ -232,7 +240,7 @@ async def get_withdrawal_limits(
         "rate_limit_per_hour": settings.WITHDRAWAL_RATE_LIMIT_PER_HOUR,
         "withdrawals_used_this_hour": recent_withdrawals,
         "withdrawals_remaining_this_hour": max(0, settings.WITHDRAWAL_RATE_LIMIT_PER_HOUR - recent_withdrawals),
-        "current_balance": float(current_agent.balance)
+        "current_balance": float(await get_balance(db, str(current_agent.id)))
     }
 
 
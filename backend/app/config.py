@@ -1,6 +1,6 @@
 """Application configuration management using Pydantic Settings."""
 
-from typing import List
+from typing import Dict, List
 from decimal import Decimal
 from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -22,12 +22,58 @@ class Settings(BaseSettings):
     # Environment
     ENVIRONMENT: str = "development"
 
+    # Authentication cache
+    AUTH_CACHE_MAX_ENTRIES: int = 10000  # Max cached API key -> agent principals
+    AUTH_CACHE_TTL_SECONDS: int = 60  # Upper bound on staleness of a cached principal
+
+    # Presence (batched last_seen_at writes)
+    LAST_SEEN_FLUSH_INTERVAL_SECONDS: float = 5.0  # How often buffered last_seen_at values are written
+    LAST_SEEN_BUFFER_MAX_ENTRIES: int = 50000  # Max distinct agents buffered between flushes
+
+    # Balance ledger
+    LEDGER_SNAPSHOT_INTERVAL_SECONDS: float = 10.0  # How often new ledger entries are folded into balance snapshots
+    LEDGER_SNAPSHOT_BATCH_SIZE: int = 10000  # Max ledger entries folded per transaction
+
+    # Job trees (task decomposition)
+    JOB_TREE_MAX_DEPTH: int = 10  # Max sub-job levels returned by /api/jobs/{id}/tree
+    JOB_TREE_MAX_NODES: int = 500  # Max jobs returned by /api/jobs/{id}/tree
+
+    # Worker job queue (GET /api/jobs/next long-poll)
+    JOB_QUEUE_MAX_WAIT_SECONDS: float = 60.0  # Upper bound on ?wait=
+    JOB_QUEUE_RECHECK_SECONDS: float = 5.0  # Re-check pending jobs while waiting, in case a wakeup was missed
+
+    # Platform statistics
+    STATS_RECONCILE_INTERVAL_SECONDS: float = 300.0  # How often /api/stats counters are recomputed from the DB
+    GRAPH_RECONCILE_INTERVAL_SECONDS: float = 300.0  # How often the collaboration graph is re-checked against the DB
+    GRAPH_ANALYTICS_INTERVAL_SECONDS: float = 30.0  # How often graph centrality is recomputed when the graph changed
+
+    # Event bus (SSE fan-out)
+    EVENT_BUS_SUBSCRIBER_BUFFER: int = 256  # Max pending events per SSE subscriber
+    EVENT_BUS_OVERFLOW_POLICY: str = "drop_oldest"  # drop_oldest|disconnect|coalesce
+    EVENT_BUS_REPLAY_SIZE: int = 1000  # Recent events kept for Last-Event-ID resumption
+    EVENT_BUS_BACKEND: str = "memory"  # memory (single process) | postgres (LISTEN/NOTIFY across workers)
+    EVENT_BUS_CHANNEL: str = "agentmarket_events"  # Postgres NOTIFY channel
+    EVENT_BUS_DSN: str = ""  # asyncpg DSN for the postgres backend (defaults to DATABASE_URL)
+
     # Blockchain & Payment Settings
     WEB3_RPC_URL: str = "https://ethereum-sepolia-rpc.publicnode.com"
     USDC_ADDRESS: str = "0x1c7D4B196Cb0C7B01d743Fbc6116a902379C7238"  # Ethereum Sepolia USDC
     PLATFORM_WALLET_ADDRESS: str = "0x0000000000000000000000000000000000000000"  # Set in production
-    MIN_CONFIRMATIONS: int = 1  # Minimum block confirmations for payment verification
-    PAYMENT_VERIFICATION_TIMEOUT: int = 300  # Seconds to wait for transaction verification
+    CHAIN_RPC_TIMEOUT_SECONDS: float = 10.0  # Per-call timeout for JSON-RPC requests (including waiting for a slot)
+    CHAIN_RPC_MAX_CONCURRENCY: int = 32  # Max in-flight JSON-RPC requests per RPC URL
+    CHAIN_RPC_METHOD_TIMEOUTS: Dict[str, float] = {}  # Per-method overrides, e.g. {"eth_blockNumber": 3}
+    CHAIN_RPC_POOL_SIZE: int = 32  # Keep-alive HTTP connections per RPC URL
+    CHAIN_RPC_KEEPALIVE_SECONDS: float = 30.0  # Idle time before a pooled connection is closed
+    CHAIN_RPC_RETRIES: int = 3  # Attempts for read-only methods failing with a connection error or timeout
+    CHAIN_RPC_BACKOFF_SECONDS: float = 0.25  # Backoff before retry n is this times 2**(n-1)
+    CHAIN_RECEIPT_CACHE_SIZE: int = 10000  # Final transaction receipts kept in memory per RPC URL (LRU, no TTL)
+    CHAIN_RECEIPT_CACHE_CONFIRMATIONS: int = 12  # Depth at which a receipt counts as final and may be cached (at least MIN_CONFIRMATIONS)
+    CHAIN_TOKEN_CACHE_SIZE: int = 1000  # Token decimals kept in memory per RPC URL (LRU, no TTL)
+    MIN_CONFIRMATIONS: int = 1  # Block confirmations (including the block it was mined in) before crediting
+    PAYMENT_VERIFICATION_TIMEOUT: int = 300  # Seconds a submitted tx may stay unmined before it is failed
+    CONFIRMATION_POLL_SECONDS: float = 4.0  # eth_blockNumber poll interval while payments/deposits are pending
+    CONFIRMATION_BATCH_SIZE: int = 200  # Pending payments (and deposits) checked per new block head
+    PAYMENT_BATCH_MAX_ITEMS: int = 50  # Max tx hashes per POST /api/payments/verify-batch
 
     # AgentCoin Token
     AGENTCOIN_ADDRESS: str = "0x0000000000000000000000000000000000000000"  # Set after deployment
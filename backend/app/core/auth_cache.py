@@ -0,0 +1,186 @@
+"""In-process cache of authenticated agent principals keyed by API key hash."""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
+
+from app.config import settings
+
+# Events after which an agent's cached principal is stale on every worker
+INVALIDATING_EVENTS = ("agent_key_rotated", "agent_status_changed")
+
+
+@dataclass(frozen=True)
+class AgentPrincipal:
+    """
+    Lightweight identity of an authenticated agent.
+
+    Endpoints that only need to know *who* is calling depend on this instead
+    of a full Agent row, so a cache hit avoids the database entirely.
+    """
+
+    id: str
+    name: str
+    status: str
+    wallet_address: Optional[str] = None
+
+    @classmethod
+    def from_agent(cls, agent) -> "AgentPrincipal":
+        """Build a principal from an Agent model instance."""
+        return cls(
+            id=str(agent.id),
+            name=agent.name,
+            status=agent.status,
+            wallet_address=agent.wallet_address,
+        )
+
+
+class PrincipalCache:
+    """
+    LRU cache with per-entry TTL mapping API key hashes to principals.
+
+    Entries are invalidated explicitly when an agent profile changes or its
+    API key is rotated. Each worker has its own cache, so the change is also
+    published on the event bus and on_event evicts the entry in every
+    process that receives it; the TTL bounds staleness for anything else.
+    Not thread-safe - it is only touched from the event loop.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        """Initialize an empty cache with the given bounds."""
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[AgentPrincipal, float]]" = OrderedDict()
+        self._key_by_agent: Dict[str, str] = {}
+        # Bumped on every invalidation; see put()
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key_hash: str) -> Optional[AgentPrincipal]:
+        """
+        Look up a principal by API key hash.
+
+        Args:
+            key_hash: SHA-256 hash of the API key
+
+        Returns:
+            Cached principal, or None on a miss or expired entry
+        """
+        entry = self._entries.get(key_hash)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        principal, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(key_hash)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key_hash)
+        self.hits += 1
+        return principal
+
+    def put(self, key_hash: str, principal: AgentPrincipal, generation: Optional[int] = None) -> None:
+        """
+        Cache a principal, evicting the least recently used entry if full.
+
+        A principal read from the database on a cache miss may already be
+        revoked by the time it is cached: the key can be rotated and
+        invalidated while the lookup is in flight. Pass the generation read
+        before the lookup, and the principal is not cached if any
+        invalidation happened since.
+
+        Args:
+            key_hash: SHA-256 hash of the API key
+            principal: Principal to cache
+            generation: Value of self.generation before the principal was read
+        """
+        if self.max_entries <= 0:
+            return
+        if generation is not None and generation != self.generation:
+            return
+
+        # An agent has exactly one live key; drop any entry for a previous one
+        previous_key = self._key_by_agent.get(principal.id)
+        if previous_key is not None and previous_key != key_hash:
+            self._remove(previous_key)
+
+        self._entries[key_hash] = (principal, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key_hash)
+        self._key_by_agent[principal.id] = key_hash
+
+        while len(self._entries) > self.max_entries:
+            oldest_key, _ = next(iter(self._entries.items()))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def invalidate_agent(self, agent_id: str) -> None:
+        """
+        Drop the cached principal for an agent.
+
+        Call after updating an agent's profile or rotating its API key.
+
+        Args:
+            agent_id: Agent UUID
+        """
+        # Also voids in-flight lookups that have not been cached yet
+        self.generation += 1
+        key_hash = self._key_by_agent.get(str(agent_id))
+        if key_hash is not None:
+            self._remove(key_hash)
+            self.invalidations += 1
+
+    def on_event(self, event: Dict[str, Any]) -> None:
+        """
+        Evict an agent whose key was rotated or status changed (event bus listener).
+
+        Args:
+            event: Event dictionary with type and data
+        """
+        if event["type"] in INVALIDATING_EVENTS:
+            agent_id = (event.get("data") or {}).get("agent_id")
+            if agent_id is not None:
+                self.invalidate_agent(agent_id)
+
+    def clear(self) -> None:
+        """Drop all cached principals (counters are kept)."""
+        self._entries.clear()
+        self._key_by_agent.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss/eviction counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key_hash: str) -> None:
+        """Remove an entry and its reverse index."""
+        entry = self._entries.pop(key_hash, None)
+        if entry is not None:
+            principal, _ = entry
+            if self._key_by_agent.get(principal.id) == key_hash:
+                del self._key_by_agent[principal.id]
+
+
+# Global principal cache instance
+principal_cache = PrincipalCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+)
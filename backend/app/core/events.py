@@ -1,20 +1,441 @@
 """Event bus system for real-time SSE event streaming."""
 
 import asyncio
-from typing import Dict, Any, AsyncGenerator
+import json
+import logging
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Any, AsyncGenerator, Callable, Deque, FrozenSet, List, Optional, Set, Tuple
 from datetime import datetime
 
+from sse_starlette.sse import ServerSentEvent
+
+from app.config import settings
+
+try:
+    import orjson
+except ImportError:  # Optional fast encoder; stdlib json is used without it
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Callback a backend uses to hand an event to the local subscribers
+EventHandler = Callable[[Dict[str, Any]], None]
+
+
+def encode_json(data: Any) -> str:
+    """Serialize event data to compact JSON, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(data, default=str).decode()
+    return json.dumps(data, default=str)
+
+
+def render_frame(event: Dict[str, Any]) -> bytes:
+    """Encode an event as a complete SSE frame (id, event and data lines)."""
+    return ServerSentEvent(
+        id=str(event["id"]),
+        event=event["type"],
+        data=encode_json(event["data"]),
+    ).encode()
+
+
+class OverflowPolicy(str, Enum):
+    """What to do when a subscriber's buffer is full."""
+    DROP_OLDEST = "drop_oldest"  # Discard the oldest buffered event
+    DISCONNECT = "disconnect"  # Close the subscription; the client reconnects
+    COALESCE = "coalesce"  # Replace a buffered event for the same entity, else drop oldest
+
+
+# Payload keys identifying the entity an event is about, used to coalesce
+COALESCE_KEYS = ("job_id", "negotiation_id", "service_id", "payment_id", "deposit_id", "agent_id")
+
+
+def _coalesce_key(event: Dict[str, Any]) -> Optional[Tuple[str, str, Any]]:
+    """Return (type, key, value) identifying the entity an event refers to."""
+    data = event.get("data") or {}
+    for key in COALESCE_KEYS:
+        if data.get(key) is not None:
+            return event["type"], key, data[key]
+    return None
+
+
+# Payload keys naming an agent involved in an event, matched by agent filters
+AGENT_KEYS = ("agent_id", "client_id", "worker_id")
+
+# Events that only coordinate workers (e.g. auth cache invalidation): they
+# reach in-process listeners but never SSE subscribers or the replay buffer
+INTERNAL_EVENTS = frozenset({"agent_key_rotated"})
+
+
+def _index_keys(event: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Return the (dimension, value) index keys an event can be routed by."""
+    data = event.get("data") or {}
+    keys = [("type", event["type"])]
+    for key in AGENT_KEYS:
+        if data.get(key) is not None:
+            keys.append(("agent", str(data[key])))
+    if data.get("job_id") is not None:
+        keys.append(("job", str(data["job_id"])))
+    if data.get("service_id") is not None:
+        keys.append(("service", str(data["service_id"])))
+    return keys
+
+
+@dataclass(frozen=True)
+class EventFilter:
+    """
+    Server-side subscription filter.
+
+    Every dimension that is set must match (AND); an unset dimension matches
+    anything. An agent filter matches events where the agent appears as
+    agent_id, client_id or worker_id.
+    """
+
+    types: Optional[FrozenSet[str]] = None
+    agent_id: Optional[str] = None
+    job_id: Optional[str] = None
+    service_id: Optional[str] = None
+
+    @property
+    def is_empty(self) -> bool:
+        """True if the filter matches every event."""
+        return not (self.types or self.agent_id or self.job_id or self.service_id)
+
+    def index_keys(self) -> List[Tuple[str, str]]:
+        """
+        Return the index keys a subscription with this filter is stored under.
+
+        Uses the most selective dimension set, so each event only has to look
+        at subscribers that could possibly match it.
+        """
+        if self.job_id:
+            return [("job", self.job_id)]
+        if self.service_id:
+            return [("service", self.service_id)]
+        if self.agent_id:
+            return [("agent", self.agent_id)]
+        return [("type", event_type) for event_type in sorted(self.types or ())]
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        """Check whether an event passes this filter."""
+        if self.types and event["type"] not in self.types:
+            return False
+
+        data = event.get("data") or {}
+        if self.job_id and str(data.get("job_id")) != self.job_id:
+            return False
+        if self.service_id and str(data.get("service_id")) != self.service_id:
+            return False
+        if self.agent_id and not any(
+            str(data.get(key)) == self.agent_id for key in AGENT_KEYS if data.get(key) is not None
+        ):
+            return False
+
+        return True
+
+
+class Subscription:
+    """
+    Bounded ring buffer of pending events for one subscriber.
+
+    offer() never blocks, so a slow consumer cannot stall publishers; it
+    only loses events (or its connection) according to the overflow policy.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        policy: OverflowPolicy,
+        event_filter: Optional[EventFilter] = None,
+    ):
+        """Initialize an empty buffer."""
+        self.max_size = max_size
+        self.policy = policy
+        self.filter = event_filter if event_filter and not event_filter.is_empty else None
+        self.closed = False
+        self.dropped = 0
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._ready = asyncio.Event()
+
+    @property
+    def depth(self) -> int:
+        """Number of buffered events."""
+        return len(self._buffer)
+
+    def offer(self, event: Dict[str, Any]) -> int:
+        """
+        Enqueue an event without blocking.
+
+        Args:
+            event: Event dictionary
+
+        Returns:
+            Number of events dropped to make room (0 if none)
+        """
+        if self.closed:
+            return 0
+
+        dropped = 0
+        if len(self._buffer) >= self.max_size:
+            if self.policy == OverflowPolicy.DISCONNECT:
+                dropped = len(self._buffer) + 1
+                self.close()
+                self.dropped += dropped
+                return dropped
+
+            if self.policy == OverflowPolicy.COALESCE and self._coalesce(event):
+                self.dropped += 1
+                self._ready.set()
+                return 1
+
+            self._buffer.popleft()
+            dropped = 1
+
+        self._buffer.append(event)
+        self.dropped += dropped
+        self._ready.set()
+        return dropped
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the next event.
+
+        Returns:
+            The next event, or None once the subscription is closed
+        """
+        while not self._buffer:
+            if self.closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+
+        return self._buffer.popleft()
+
+    def close(self) -> None:
+        """Close the subscription and wake the consumer."""
+        self.closed = True
+        self._buffer.clear()
+        self._ready.set()
+
+    def _coalesce(self, event: Dict[str, Any]) -> bool:
+        """Replace a buffered event about the same entity with this one."""
+        key = _coalesce_key(event)
+        if key is None:
+            return False
+
+        for index, queued in enumerate(self._buffer):
+            if _coalesce_key(queued) == key:
+                # Keep the newest state and move it to the back of the queue
+                del self._buffer[index]
+                self._buffer.append(event)
+                return True
+
+        return False
+
+
+class EventBusBackend:
+    """
+    Transport that carries published events to every process's EventBus.
+
+    publish() sends an event into the transport; the backend calls the
+    handler given to attach() for every event that should be fanned out to
+    this process's subscribers - including events this process published.
+    """
+
+    def __init__(self):
+        """Initialize the backend with no handler attached."""
+        self._handler: Optional[EventHandler] = None
+
+    def attach(self, handler: EventHandler) -> None:
+        """Register the local fan-out handler."""
+        self._handler = handler
+
+    async def start(self) -> None:
+        """Open connections to the transport (no-op by default)."""
+
+    async def stop(self) -> None:
+        """Close connections to the transport (no-op by default)."""
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        """Send an event to all processes."""
+        raise NotImplementedError
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        """Hand an event to the local subscribers."""
+        if self._handler is not None:
+            self._handler(event)
+
+
+class InMemoryBackend(EventBusBackend):
+    """Single-process backend: events only reach this process's subscribers."""
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        """Deliver the event locally."""
+        self._deliver(event)
+
+
+class PostgresNotifyBackend(EventBusBackend):
+    """
+    Cross-process backend using Postgres LISTEN/NOTIFY.
+
+    Every uvicorn worker or replica LISTENs on the same channel and receives
+    every NOTIFY, so SSE clients see events regardless of which process
+    published them. Requires asyncpg (already used for the database).
+    """
+
+    # Postgres rejects NOTIFY payloads of 8000 bytes or more
+    MAX_PAYLOAD_BYTES = 7999
+
+    def __init__(self, dsn: str, channel: str, reconnect_delay_seconds: float = 1.0):
+        """Initialize the backend; connections are opened by start()."""
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self.reconnect_delay_seconds = reconnect_delay_seconds
+        self._listen_conn = None
+        self._publish_pool = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def start(self) -> None:
+        """Open the LISTEN connection and the NOTIFY connection pool."""
+        import asyncpg
+
+        self._stopping = False
+        self._publish_pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=4)
+        await self._listen()
+
+    async def stop(self) -> None:
+        """Close all connections."""
+        self._stopping = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self._listen_conn is not None:
+            await self._listen_conn.close()
+            self._listen_conn = None
+        if self._publish_pool is not None:
+            await self._publish_pool.close()
+            self._publish_pool = None
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        """NOTIFY all listeners, falling back to local delivery if unavailable."""
+        payload = json.dumps(event, default=str)
+
+        if self._publish_pool is None:
+            # Not started (e.g. tests or startup race) - behave like in-memory
+            self._deliver(event)
+            return
+
+        if len(payload.encode()) > self.MAX_PAYLOAD_BYTES:
+            logger.warning(
+                f"Event {event['type']} exceeds NOTIFY payload limit; delivering to this process only"
+            )
+            self._deliver(event)
+            return
+
+        try:
+            async with self._publish_pool.acquire() as conn:
+                await conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+        except Exception as e:
+            logger.error(f"Failed to NOTIFY event {event['type']}: {e}; delivering locally")
+            self._deliver(event)
+
+    async def _listen(self) -> None:
+        """Open a dedicated connection and LISTEN on the channel."""
+        import asyncpg
+
+        self._listen_conn = await asyncpg.connect(self.dsn)
+        self._listen_conn.add_termination_listener(self._on_terminated)
+        await self._listen_conn.add_listener(self.channel, self._on_notify)
+        logger.info(f"Event bus listening on Postgres channel '{self.channel}'")
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        """asyncpg notification callback."""
+        try:
+            self._deliver(json.loads(payload))
+        except Exception as e:
+            logger.error(f"Dropping malformed event notification: {e}")
+
+    def _on_terminated(self, connection) -> None:
+        """Reconnect the listener if the connection drops unexpectedly."""
+        if self._stopping:
+            return
+        logger.warning("Event bus LISTEN connection lost; reconnecting")
+        self._listen_conn = None
+        self._reconnect_task = asyncio.get_event_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        """Retry LISTEN with a fixed delay until it succeeds or the bus stops."""
+        while not self._stopping:
+            await asyncio.sleep(self.reconnect_delay_seconds)
+            try:
+                await self._listen()
+                return
+            except Exception as e:
+                logger.error(f"Event bus reconnect failed: {e}")
+
+
+def create_event_bus_backend() -> EventBusBackend:
+    """Build the backend selected by EVENT_BUS_BACKEND."""
+    if settings.EVENT_BUS_BACKEND == "postgres":
+        dsn = settings.EVENT_BUS_DSN or settings.DATABASE_URL.replace("+asyncpg", "")
+        return PostgresNotifyBackend(dsn=dsn, channel=settings.EVENT_BUS_CHANNEL)
+    if settings.EVENT_BUS_BACKEND != "memory":
+        raise ValueError(f"Unknown EVENT_BUS_BACKEND: {settings.EVENT_BUS_BACKEND}")
+    return InMemoryBackend()
+
 
 class EventBus:
     """
-    In-memory event bus using asyncio.Queue for pub/sub pattern.
+    Event bus with bounded per-subscriber buffers and a pluggable transport.
 
     Supports Server-Sent Events (SSE) streaming to multiple clients.
+    Published events travel through the backend (in-process by default,
+    or a broker shared by all workers) and are then fanned out to this
+    process's subscribers. Fan-out is non-blocking: each event is appended
+    to every subscriber's ring buffer, and subscribers that fall behind lose
+    events according to the configured overflow policy instead of growing
+    memory without bound.
+
+    Event ids are "<epoch>-<sequence>": the sequence counts events
+    dispatched in this process and the epoch is picked at construction, so
+    an id issued by another worker or before a restart is never mistaken
+    for a position in this process's replay buffer.
     """
 
-    def __init__(self):
-        """Initialize the event bus with an empty subscriber list."""
-        self._subscribers: list[asyncio.Queue] = []
+    def __init__(
+        self,
+        buffer_size: int = 256,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        backend: Optional[EventBusBackend] = None,
+        replay_size: int = 1000,
+    ):
+        """Initialize the event bus with an empty subscriber set."""
+        self.buffer_size = buffer_size
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        # Monotonic sequence of the last event dispatched in this process
+        self.last_id = 0
+        # Prefix of every event id, unique to this process and boot
+        self.epoch = uuid.uuid4().hex[:12]
+        # Most recent events, for clients resuming with Last-Event-ID
+        self._replay: Deque[Dict[str, Any]] = deque(maxlen=replay_size)
+        self._subscribers: Set[Subscription] = set()
+        # Unfiltered subscribers receive everything; filtered ones are
+        # reachable only through the (dimension, value) index
+        self._unfiltered: Set[Subscription] = set()
+        self._index: Dict[Tuple[str, str], Set[Subscription]] = {}
+        # In-process callbacks that see every event (e.g. materialized stats)
+        self._listeners: List[EventHandler] = []
+        self.backend = backend or InMemoryBackend()
+        self.backend.attach(self._dispatch)
+
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.disconnected = 0
 
     async def publish(self, event_type: str, data: Dict[str, Any]) -> None:
         """
@@ -30,45 +451,223 @@ class EventBus:
             "timestamp": datetime.utcnow().isoformat()
         }
 
-        # Send to all active subscribers
-        dead_queues = []
-        for queue in self._subscribers:
+        self.published += 1
+        await self.backend.publish(event)
+
+    async def start(self) -> None:
+        """Connect the backend (call on application startup)."""
+        await self.backend.start()
+
+    async def stop(self) -> None:
+        """Disconnect the backend (call on application shutdown)."""
+        await self.backend.stop()
+
+    def add_listener(self, listener: EventHandler) -> None:
+        """
+        Register a synchronous callback invoked for every dispatched event.
+
+        Listeners run inline during dispatch, so they must be fast and must
+        not block; exceptions are logged and swallowed.
+        """
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: EventHandler) -> None:
+        """Unregister a callback added with add_listener."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _dispatch(self, event: Dict[str, Any]) -> None:
+        """Number an event, record it for replay and fan it out to matching subscribers."""
+        if event["type"] in INTERNAL_EVENTS:
+            self._notify_listeners(event)
+            return
+
+        self.last_id += 1
+        event = {**event, "id": self._event_id(self.last_id), "seq": self.last_id}
+        # Serialize once; every subscriber and replay shares the same bytes
+        event["frame"] = render_frame(event)
+        self._replay.append(event)
+
+        self._notify_listeners(event)
+
+        targets = list(self._unfiltered)
+        if self._index:
+            candidates: Set[Subscription] = set()
+            for key in _index_keys(event):
+                candidates.update(self._index.get(key, ()))
+            targets.extend(s for s in candidates if s.filter.matches(event))
+
+        # No awaiting - each offer is an O(1) append
+        for subscription in targets:
+            dropped = subscription.offer(event)
+            self.dropped += dropped
+
+            if subscription.closed:
+                # Overflowed under the disconnect policy
+                self._remove(subscription)
+                self.disconnected += 1
+            else:
+                self.delivered += 1
+
+    def _notify_listeners(self, event: Dict[str, Any]) -> None:
+        """Run every listener on an event, logging and swallowing failures."""
+        for listener in list(self._listeners):
             try:
-                await queue.put(event)
-            except Exception:
-                # Mark queue as dead if it can't receive events
-                dead_queues.append(queue)
+                listener(event)
+            except Exception as e:
+                logger.error(f"Event listener failed on {event['type']}: {e}", exc_info=True)
+
+    def _add(self, subscription: Subscription) -> None:
+        """Register a subscription and index it by its filter."""
+        self._subscribers.add(subscription)
+        if subscription.filter is None:
+            self._unfiltered.add(subscription)
+            return
+        for key in subscription.filter.index_keys():
+            self._index.setdefault(key, set()).add(subscription)
 
-        # Clean up dead queues
-        for queue in dead_queues:
-            self._subscribers.remove(queue)
+    def _remove(self, subscription: Subscription) -> None:
+        """Unregister a subscription and drop empty index entries."""
+        self._subscribers.discard(subscription)
+        self._unfiltered.discard(subscription)
+        if subscription.filter is None:
+            return
+        for key in subscription.filter.index_keys():
+            bucket = self._index.get(key)
+            if bucket is not None:
+                bucket.discard(subscription)
+                if not bucket:
+                    del self._index[key]
 
-    async def subscribe(self) -> AsyncGenerator[Dict[str, Any], None]:
+    def _event_id(self, seq: int) -> str:
+        """Prefix a sequence number with this process's epoch."""
+        return f"{self.epoch}-{seq}"
+
+    def replay_since(
+        self,
+        last_event_id: str,
+        event_filter: Optional[EventFilter] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return the buffered events published after last_event_id.
+
+        Args:
+            last_event_id: Id of the last event the client received
+            event_filter: Optional filter applied to the replayed events
+
+        Returns:
+            Matching events in order, or None if the gap can no longer be
+            replayed (evicted from the buffer, malformed, or an id from
+            another worker or from before a restart)
+        """
+        epoch, _, seq = last_event_id.rpartition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        last_seq = int(seq)
+        if last_seq > self.last_id:
+            return None
+
+        oldest_seq = self._replay[0]["seq"] if self._replay else self.last_id + 1
+        if last_seq < oldest_seq - 1:
+            return None
+
+        return [
+            event for event in self._replay
+            if event["seq"] > last_seq and (event_filter is None or event_filter.matches(event))
+        ]
+
+    async def subscribe(
+        self,
+        event_filter: Optional[EventFilter] = None,
+        last_event_id: Optional[str] = None,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
         """
         Subscribe to events and receive them as an async generator.
 
+        Args:
+            event_filter: Optional filter evaluated before events are
+                buffered; unmatched events never reach this subscriber
+            last_event_id: Resume after this event id; missed events are
+                replayed first, or a stream_reset event is sent if they are
+                no longer available
+
         Yields:
-            Event dictionaries containing type, data, and timestamp
+            Event dictionaries containing id, type, data, timestamp, and
+            frame (the pre-rendered SSE bytes)
 
         Usage:
-            async for event in event_bus.subscribe():
+            async for event in event_bus.subscribe(EventFilter(job_id=job_id)):
                 print(event)
         """
-        queue: asyncio.Queue = asyncio.Queue()
-        self._subscribers.append(queue)
+        subscription = Subscription(self.buffer_size, self.overflow_policy, event_filter)
+        self._add(subscription)
+
+        # Taken without awaiting after registration, so the replay ends
+        # exactly where live delivery to the subscription begins
+        backlog: List[Dict[str, Any]] = []
+        if last_event_id is not None:
+            replay = self.replay_since(last_event_id, event_filter)
+            if replay is None:
+                reset = {
+                    "id": self._event_id(self.last_id),
+                    "seq": self.last_id,
+                    "type": "stream_reset",
+                    "data": {
+                        "last_event_id": last_event_id,
+                        "oldest_available_id": self._replay[0]["id"] if self._replay else None,
+                    },
+                    "timestamp": datetime.utcnow().isoformat(),
+                }
+                reset["frame"] = render_frame(reset)
+                backlog = [reset]
+            else:
+                backlog = replay
 
         try:
+            for event in backlog:
+                yield event
+
             while True:
-                event = await queue.get()
+                event = await subscription.get()
+                if event is None:
+                    # Disconnected by the overflow policy
+                    break
                 yield event
         except asyncio.CancelledError:
             # Client disconnected
             pass
         finally:
             # Clean up subscription
-            if queue in self._subscribers:
-                self._subscribers.remove(queue)
+            subscription.close()
+            self._remove(subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return subscriber, queue depth and drop counters."""
+        depths = [subscription.depth for subscription in self._subscribers]
+        return {
+            "subscribers": len(depths),
+            "filtered_subscribers": len(depths) - len(self._unfiltered),
+            "index_keys": len(self._index),
+            "backend": type(self.backend).__name__,
+            "buffer_size": self.buffer_size,
+            "overflow_policy": self.overflow_policy.value,
+            "epoch": self.epoch,
+            "last_event_id": self.last_id,
+            "replay_buffered": len(self._replay),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "disconnected": self.disconnected,
+            "queue_depth_max": max(depths, default=0),
+            "queue_depth_total": sum(depths),
+        }
 
 
 # Global event bus instance
-event_bus = EventBus()
+event_bus = EventBus(
+    buffer_size=settings.EVENT_BUS_SUBSCRIBER_BUFFER,
+    overflow_policy=settings.EVENT_BUS_OVERFLOW_POLICY,
+    backend=create_event_bus_backend(),
+    replay_size=settings.EVENT_BUS_REPLAY_SIZE,
+)
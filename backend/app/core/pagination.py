@@ -0,0 +1,112 @@
+"""Keyset (cursor) pagination over (created_at, id)."""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, NamedTuple, Optional, Sequence
+
+from fastapi import Response
+from sqlalchemy import Select, tuple_
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class Cursor(NamedTuple):
+    """Position after the last row of a page, newest-first order."""
+
+    created_at: datetime
+    id: str
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """
+    Encode a row position as an opaque URL-safe token.
+
+    Args:
+        created_at: Row creation time
+        row_id: Row primary key
+
+    Returns:
+        Cursor token
+    """
+    raw = json.dumps([created_at.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    """
+    Decode a cursor token produced by encode_cursor.
+
+    Args:
+        token: Cursor token
+
+    Returns:
+        Decoded cursor
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return Cursor(datetime.fromisoformat(created_at), str(row_id))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def apply_keyset(query: Select, model, cursor: Optional[Cursor]) -> Select:
+    """
+    Order a query newest-first by (created_at, id) and seek past a cursor.
+
+    The row-value comparison lets the database walk a (..., created_at, id)
+    index directly to the page instead of counting past skipped rows.
+
+    Args:
+        query: Select over the model
+        model: Model with created_at and id columns
+        cursor: Position to continue after, or None for the first page
+
+    Returns:
+        The ordered (and filtered) query
+    """
+    if cursor is not None:
+        query = query.where(
+            tuple_(model.created_at, model.id) < tuple_(cursor.created_at, cursor.id)
+        )
+    return query.order_by(model.created_at.desc(), model.id.desc())
+
+
+def next_cursor(items: Sequence[Any], limit: int) -> Optional[str]:
+    """
+    Build the cursor for the page after items.
+
+    Args:
+        items: Rows of the current page, in keyset order
+        limit: Page size that was requested
+
+    Returns:
+        Cursor token, or None if this was the last page
+    """
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last.created_at, last.id)
+
+
+def set_next_cursor(response: Response, items: Sequence[Any], limit: int) -> Optional[str]:
+    """
+    Set the X-Next-Cursor header for a page of results.
+
+    Args:
+        response: Outgoing response
+        items: Rows of the current page, in keyset order
+        limit: Page size that was requested
+
+    Returns:
+        The cursor token that was set, or None if this was the last page
+    """
+    token = next_cursor(items, limit)
+    if token is not None:
+        response.headers[NEXT_CURSOR_HEADER] = token
+    return token
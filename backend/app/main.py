@@ -5,6 +5,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.config import settings
+from app.core.auth_cache import principal_cache
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.events import event_bus
+from app.services.presence_service import last_seen_writer
+from app.services.stats_service import platform_stats
+from app.services.graph_service import collaboration_graph
+from app.services.ledger_service import ledger_snapshotter
+from app.services.job_queue_service import worker_job_queue
+from app.services.confirmation_service import confirmation_tracker
+from app.services.chain_client import chain_client_stats, close_chain_clients
 from app.api import agents, services, jobs, inbox, events, payments, deposits, withdrawals, negotiations, ens
 # quotes temporarily disabled (requires anthropic package for LLM negotiation - using P2P instead)
 
@@ -22,6 +32,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Listings page only through this header, so browsers must be allowed to read it
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers
@@ -90,12 +102,34 @@ async def startup():
     print(f"📝 Environment: {settings.ENVIRONMENT}")
     print(f"📊 API Docs: http://localhost:8000/docs")
 
+    await event_bus.start()
+    # Evict principals whose key was rotated on any worker
+    event_bus.add_listener(principal_cache.on_event)
+    await last_seen_writer.start()
+    await ledger_snapshotter.start()
+    await platform_stats.start()
+    await collaboration_graph.start()
+    await worker_job_queue.start()
+    await confirmation_tracker.start()
+
 
 @app.on_event("shutdown")
 async def shutdown():
     """Application shutdown tasks."""
     print("👋 AgentMarket API shutting down...")
 
+    await confirmation_tracker.stop()
+    await worker_job_queue.stop()
+    await collaboration_graph.stop()
+    await platform_stats.stop()
+    # Persist buffered last_seen_at values before exiting
+    await last_seen_writer.stop()
+    # Fold pending ledger entries into balance snapshots
+    await ledger_snapshotter.stop()
+    event_bus.remove_listener(principal_cache.on_event)
+    await event_bus.stop()
+    await close_chain_clients()
+
 
 @app.get("/")
 async def root():
@@ -117,6 +151,22 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """In-process runtime metrics for capacity sizing."""
+    return {
+        "auth_cache": principal_cache.stats(),
+        "last_seen_writer": last_seen_writer.stats(),
+        "ledger_snapshotter": ledger_snapshotter.stats(),
+        "event_bus": event_bus.stats(),
+        "platform_stats": platform_stats.stats(),
+        "collaboration_graph": collaboration_graph.stats(),
+        "worker_job_queue": worker_job_queue.stats(),
+        "confirmation_tracker": confirmation_tracker.stats(),
+        "chain_clients": chain_client_stats(),
+    }
+
+
 # Global exception handler
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc: HTTPException):
@@ -95,7 +95,7 @@ async def verify_x402_payment(
     Returns:
         True if payment is valid, False otherwise
     """
-    return chain_service.verify_transaction(
+    return await chain_service.verify_transaction(
         tx_hash=tx_hash,
         expected_amount=expected_amount,
         recipient_address=recipient_address,
@@ -12,6 +12,11 @@ from app.models.withdrawal_transaction import WithdrawalTransaction
 from app.models.price_quote import PriceQuote
 from app.models.balance_migration import BalanceMigration
 from app.models.negotiation import Negotiation, NegotiationOffer
+from app.models.capability import AgentCapability, ServiceCapability
+from app.models.ledger import LedgerEntry, BalanceSnapshot
+
+# Registers full-text search DDL on the services and agents tables
+import app.models.search_index  # noqa: F401
 
 __all__ = [
     "Agent",
@@ -29,4 +34,8 @@ __all__ = [
     "BalanceMigration",
     "Negotiation",
     "NegotiationOffer",
+    "AgentCapability",
+    "ServiceCapability",
+    "LedgerEntry",
+    "BalanceSnapshot",
 ]
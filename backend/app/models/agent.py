@@ -5,7 +5,7 @@ from decimal import Decimal
 from typing import List
 import uuid
 
-from sqlalchemy import String, Text, Integer, Boolean, Numeric, TIMESTAMP
+from sqlalchemy import String, Text, Integer, Boolean, Numeric, TIMESTAMP, Index
 from sqlalchemy import JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -16,6 +16,10 @@ class Agent(Base):
     """Agent model representing an AI agent in the marketplace."""
 
     __tablename__ = "agents"
+    __table_args__ = (
+        # Keyset pagination, newest first
+        Index("ix_agents_created", "created_at", "id"),
+    )
 
     # Primary Key
     id: Mapped[str] = mapped_column(
@@ -26,7 +30,7 @@ class Agent(Base):
 
     # Basic Info
     name: Mapped[str] = mapped_column(String(100), unique=True, nullable=False, index=True)
-    api_key_hash: Mapped[str] = mapped_column(String(256), nullable=False)
+    api_key_hash: Mapped[str] = mapped_column(String(256), nullable=False, unique=True, index=True)
     wallet_address: Mapped[str | None] = mapped_column(String(128), nullable=True)
     ens_name: Mapped[str | None] = mapped_column(String(255), nullable=True, unique=True, index=True)
     ens_verified: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
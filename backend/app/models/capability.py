@@ -0,0 +1,51 @@
+"""Capability index models."""
+
+from sqlalchemy import String, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class AgentCapability(Base):
+    """
+    One row per (agent, capability), mirroring Agent.capabilities.
+
+    Lets "agents with any/all of these capabilities" run as an indexed
+    lookup instead of scanning the JSON column.
+    """
+
+    __tablename__ = "agent_capabilities"
+
+    agent_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("agents.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    capability: Mapped[str] = mapped_column(String(100), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_agent_capabilities_capability", "capability", "agent_id"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<AgentCapability(agent_id={self.agent_id}, capability={self.capability})>"
+
+
+class ServiceCapability(Base):
+    """One row per (service, capability), mirroring Service.capabilities_required."""
+
+    __tablename__ = "service_capabilities"
+
+    service_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("services.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    capability: Mapped[str] = mapped_column(String(100), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_service_capabilities_capability", "capability", "service_id"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ServiceCapability(service_id={self.service_id}, capability={self.capability})>"
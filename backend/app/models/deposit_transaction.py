@@ -4,7 +4,7 @@ from datetime import datetime
 from decimal import Decimal
 import uuid
 
-from sqlalchemy import String, Numeric, ForeignKey, TIMESTAMP
+from sqlalchemy import String, Numeric, ForeignKey, TIMESTAMP, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -14,6 +14,10 @@ class DepositTransaction(Base):
     """Deposit transaction model for tracking USDC→AGNT swaps."""
 
     __tablename__ = "deposit_transactions"
+    __table_args__ = (
+        # Keyset pagination, newest first
+        Index("ix_deposit_transactions_agent_created", "agent_id", "created_at", "id"),
+    )
 
     # Primary Key
     id: Mapped[str] = mapped_column(
@@ -51,6 +55,10 @@ class DepositTransaction(Base):
         Numeric(20, 8),
         nullable=False
     )  # Actual rate at time of swap (AGNT per USDC)
+    min_agnt_amount: Mapped[Decimal | None] = mapped_column(
+        Numeric(20, 8),
+        nullable=True
+    )  # Minimum AGNT credit the agent accepts, checked once confirmed
 
     # Status
     status: Mapped[str] = mapped_column(
@@ -5,7 +5,7 @@ from decimal import Decimal
 from typing import List, Optional
 import uuid
 
-from sqlalchemy import String, Text, Integer, Numeric, ForeignKey, TIMESTAMP
+from sqlalchemy import String, Text, Integer, Numeric, ForeignKey, TIMESTAMP, Index
 from sqlalchemy import JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -16,6 +16,11 @@ class Job(Base):
     """Job model representing a hired service instance."""
 
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Keyset pagination, newest first
+        Index("ix_jobs_client_created", "client_agent_id", "created_at", "id"),
+        Index("ix_jobs_worker_created", "worker_agent_id", "created_at", "id"),
+    )
 
     # Primary Key
     id: Mapped[str] = mapped_column(
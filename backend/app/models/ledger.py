@@ -0,0 +1,100 @@
+"""Balance ledger models."""
+
+from datetime import datetime
+from decimal import Decimal
+import uuid
+
+from sqlalchemy import String, Numeric, Boolean, BigInteger, Integer, TIMESTAMP, Index, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class LedgerEntry(Base):
+    """
+    One leg of a double-entry balance transfer.
+
+    Every transfer writes one entry per account, and the amounts of a
+    transfer sum to zero. An account is an agent UUID or a named system
+    account such as "platform:escrow". Entries are only ever inserted; an
+    account's balance is its latest snapshot plus the entries not yet
+    folded into it.
+    """
+
+    __tablename__ = "ledger_entries"
+    __table_args__ = (
+        # Balance reads: the account's entries not yet folded into its snapshot
+        Index(
+            "ix_ledger_entries_account_pending",
+            "account",
+            "id",
+            postgresql_where=text("NOT snapshotted"),
+            sqlite_where=text("snapshotted = 0"),
+        ),
+        Index("ix_ledger_entries_account_created", "account", "created_at"),
+    )
+
+    # Primary Key (insertion order)
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True
+    )
+
+    # Groups the legs of one transfer
+    transfer_id: Mapped[str] = mapped_column(
+        String(36),
+        nullable=False,
+        index=True,
+        default=lambda: str(uuid.uuid4())
+    )
+
+    account: Mapped[str] = mapped_column(String(64), nullable=False)
+    amount: Mapped[Decimal] = mapped_column(
+        Numeric(20, 8),
+        nullable=False
+    )  # Positive credits the account, negative debits it
+
+    entry_type: Mapped[str] = mapped_column(
+        String(32),
+        nullable=False
+    )  # opening_balance|adjustment|deposit|top_up|p2p|withdrawal|withdrawal_refund|job_payment|job_payout
+    reference_id: Mapped[str | None] = mapped_column(
+        String(66),
+        nullable=True,
+        index=True
+    )  # Job, deposit, withdrawal or payment id
+
+    # Set once the entry has been folded into the account's snapshot
+    snapshotted: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP,
+        nullable=False,
+        default=datetime.utcnow
+    )
+
+    def __repr__(self) -> str:
+        return f"<LedgerEntry(id={self.id}, account={self.account}, amount={self.amount})>"
+
+
+class BalanceSnapshot(Base):
+    """Balance of an account as of the entries folded into it so far."""
+
+    __tablename__ = "balance_snapshots"
+
+    account: Mapped[str] = mapped_column(String(64), primary_key=True)
+    balance: Mapped[Decimal] = mapped_column(
+        Numeric(20, 8),
+        nullable=False,
+        default=Decimal("0")
+    )
+    entries_folded: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP,
+        nullable=False,
+        default=datetime.utcnow
+    )
+
+    def __repr__(self) -> str:
+        return f"<BalanceSnapshot(account={self.account}, balance={self.balance})>"
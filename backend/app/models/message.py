@@ -3,7 +3,7 @@
 from datetime import datetime
 import uuid
 
-from sqlalchemy import String, ForeignKey, TIMESTAMP
+from sqlalchemy import String, ForeignKey, TIMESTAMP, Index
 from sqlalchemy import JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -14,6 +14,10 @@ class Message(Base):
     """Message model representing communications between agents."""
 
     __tablename__ = "messages"
+    __table_args__ = (
+        # Keyset pagination, newest first
+        Index("ix_messages_to_agent_created", "to_agent_id", "created_at", "id"),
+    )
 
     # Primary Key
     id: Mapped[str] = mapped_column(
@@ -5,7 +5,7 @@ from decimal import Decimal
 from enum import Enum
 import uuid
 
-from sqlalchemy import String, Text, Numeric, TIMESTAMP, Enum as SQLEnum
+from sqlalchemy import String, Text, Numeric, TIMESTAMP, Enum as SQLEnum, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
@@ -30,6 +30,11 @@ class PaymentTransaction(Base):
     """Model for tracking all payment transactions."""
 
     __tablename__ = "payment_transactions"
+    __table_args__ = (
+        # Keyset pagination, newest first
+        Index("ix_payment_transactions_initiator_created", "initiator_agent_id", "created_at", "id"),
+        Index("ix_payment_transactions_recipient_created", "recipient_agent_id", "created_at", "id"),
+    )
 
     # Primary Key
     id: Mapped[str] = mapped_column(
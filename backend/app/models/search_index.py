@@ -0,0 +1,73 @@
+"""Full-text search indexes for services and agents.
+
+SQLite gets an FTS5 table per searchable table, keyed by the row's id and
+kept in sync by triggers. It stores its own copy of the text rather than
+pointing at the source rowid: services and agents have string primary
+keys, so their implicit rowid is not stable and VACUUM may renumber it. Postgres gets a GIN index over a tsvector expression;
+app.services.search_service builds queries that match these definitions.
+The DDL is attached to the tables so metadata.create_all() creates it too.
+"""
+
+from sqlalchemy import DDL, event
+
+from app.models.agent import Agent
+from app.models.service import Service
+
+# Columns indexed for each searchable table
+SEARCH_COLUMNS = {
+    "services": ("name", "description"),
+    "agents": ("name", "description"),
+}
+
+
+def tsvector_sql(table: str) -> str:
+    """Postgres tsvector expression indexed for a table (must match queries exactly)."""
+    columns = " || ' ' || ".join(
+        f"coalesce({table}.{column}, '')" for column in SEARCH_COLUMNS[table]
+    )
+    return f"to_tsvector('simple', {columns})"
+
+
+def _sqlite_ddl(table: str) -> list:
+    """FTS5 table and sync triggers for a table."""
+    fts = f"{table}_fts"
+    columns = ", ".join(SEARCH_COLUMNS[table])
+    new_values = ", ".join(f"new.{column}" for column in SEARCH_COLUMNS[table])
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"id UNINDEXED, {columns}, tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(id, {columns}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"DELETE FROM {fts} WHERE id = old.id; END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} ON {table} BEGIN "
+        f"DELETE FROM {fts} WHERE id = old.id; "
+        f"INSERT INTO {fts}(id, {columns}) VALUES (new.id, {new_values}); END",
+    ]
+
+
+def _register(model) -> None:
+    """Attach create/drop DDL for a model's search index."""
+    table = model.__tablename__
+
+    for statement in _sqlite_ddl(table):
+        event.listen(model.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    # Triggers go with the table; the FTS table has to be dropped explicitly
+    event.listen(
+        model.__table__,
+        "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {table}_fts").execute_if(dialect="sqlite"),
+    )
+
+    event.listen(
+        model.__table__,
+        "after_create",
+        DDL(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_search ON {table} "
+            f"USING gin (({tsvector_sql(table)}))"
+        ).execute_if(dialect="postgresql"),
+    )
+
+
+_register(Service)
+_register(Agent)
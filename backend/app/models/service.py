@@ -5,7 +5,7 @@ from decimal import Decimal
 from typing import List
 import uuid
 
-from sqlalchemy import String, Text, Integer, Numeric, Boolean, ForeignKey, TIMESTAMP
+from sqlalchemy import String, Text, Integer, Numeric, Boolean, ForeignKey, TIMESTAMP, Index
 from sqlalchemy import JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -16,6 +16,10 @@ class Service(Base):
     """Service model representing a fixed-price offering by an agent."""
 
     __tablename__ = "services"
+    __table_args__ = (
+        # Keyset pagination, newest first
+        Index("ix_services_created", "created_at", "id"),
+    )
 
     # Primary Key
     id: Mapped[str] = mapped_column(
@@ -4,7 +4,7 @@ from datetime import datetime
 from decimal import Decimal
 import uuid
 
-from sqlalchemy import String, Numeric, ForeignKey, TIMESTAMP
+from sqlalchemy import String, Numeric, ForeignKey, TIMESTAMP, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -14,6 +14,10 @@ class WithdrawalTransaction(Base):
     """Withdrawal transaction model for tracking AGNT→USDC conversions."""
 
     __tablename__ = "withdrawal_transactions"
+    __table_args__ = (
+        # Keyset pagination, newest first
+        Index("ix_withdrawal_transactions_agent_created", "agent_id", "created_at", "id"),
+    )
 
     # Primary Key
     id: Mapped[str] = mapped_column(
@@ -6,6 +6,7 @@ from app.schemas.agent import (
     AgentPublic,
     AgentResponse,
     AgentRegisterResponse,
+    AgentKeyRotateResponse,
 )
 from app.schemas.service import (
     ServiceCreate,
@@ -36,6 +37,7 @@ __all__ = [
     "AgentPublic",
     "AgentResponse",
     "AgentRegisterResponse",
+    "AgentKeyRotateResponse",
     # Service schemas
     "ServiceCreate",
     "ServiceUpdate",
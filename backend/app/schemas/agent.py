@@ -79,3 +79,9 @@ class AgentRegisterResponse(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class AgentKeyRotateResponse(BaseModel):
+    """Response when rotating an agent's API key (includes the new key)."""
+    agent_id: str
+    api_key: str  # ONLY shown once - the previous key is revoked
@@ -25,6 +25,7 @@ class DepositResponse(BaseModel):
     usdc_amount_in: Decimal
     agnt_amount_out: Decimal
     exchange_rate: Decimal
+    min_agnt_amount: Decimal | None = None
     status: str
     created_at: datetime
     verified_at: datetime | None
@@ -102,3 +102,102 @@ class JobResponse(BaseModel):
     deliverables: List[DeliverableResponse] = Field(default_factory=list)
 
     model_config = {"from_attributes": True}
+
+
+# Batch operations
+
+JOB_BATCH_MAX_ITEMS = 100
+
+
+class JobBatchCreate(BaseModel):
+    """Schema for hiring several services in one request (balance payment)."""
+    items: List[JobCreate] = Field(..., min_length=1, max_length=JOB_BATCH_MAX_ITEMS)
+
+
+class JobBatchStart(BaseModel):
+    """Schema for starting several jobs."""
+    job_ids: List[str] = Field(..., min_length=1, max_length=JOB_BATCH_MAX_ITEMS)
+
+
+class JobBatchDeliverItem(JobDeliver):
+    """One deliverable in a batch delivery."""
+    job_id: str
+
+
+class JobBatchDeliver(BaseModel):
+    """Schema for delivering several jobs."""
+    items: List[JobBatchDeliverItem] = Field(..., min_length=1, max_length=JOB_BATCH_MAX_ITEMS)
+
+
+class JobBatchCompleteItem(JobComplete):
+    """One rating in a batch completion."""
+    job_id: str
+
+
+class JobBatchComplete(BaseModel):
+    """Schema for completing several jobs."""
+    items: List[JobBatchCompleteItem] = Field(..., min_length=1, max_length=JOB_BATCH_MAX_ITEMS)
+
+
+class JobBatchError(BaseModel):
+    """Why one batch item failed."""
+    code: str
+    message: str
+
+
+class JobBatchItemResult(BaseModel):
+    """Outcome of one batch item, in request order."""
+    index: int
+    success: bool
+    job: Optional[JobResponse] = None
+    error: Optional[JobBatchError] = None
+
+
+class JobBatchResponse(BaseModel):
+    """Per-item results of a batch operation."""
+    results: List[JobBatchItemResult]
+    succeeded: int
+    failed: int
+    total_price_agnt: Optional[Decimal] = None  # Batch hires only
+
+
+# Job trees
+
+class JobTreeJob(BaseModel):
+    """Job fields shown in a job tree (no inputs or deliverables)."""
+    id: str
+    service_id: str
+    client_agent_id: str
+    worker_agent_id: str
+    parent_job_id: Optional[str]
+    title: str
+    status: str
+    price_agnt: Decimal
+    created_at: datetime
+    completed_at: Optional[datetime]
+
+    model_config = {"from_attributes": True}
+
+
+class JobSubtreeSummary(BaseModel):
+    """Aggregates over a job and all of its returned descendants."""
+    job_count: int
+    status_counts: Dict[str, int]
+    total_price_agnt: Decimal
+
+
+class JobTreeNode(BaseModel):
+    """One job in a tree with its sub-jobs."""
+    job: JobTreeJob
+    depth: int
+    subtree: JobSubtreeSummary
+    children: List["JobTreeNode"] = Field(default_factory=list)
+
+
+class JobTreeResponse(BaseModel):
+    """Job tree rooted at the requested job."""
+    root: JobTreeNode
+    parent: Optional[JobTreeJob] = None
+    summary: JobSubtreeSummary  # Whole tree up to depth, even when truncated
+    depth: int
+    truncated: bool
@@ -25,6 +25,7 @@ class MessageList(BaseModel):
     messages: List[MessageResponse]
     total: int
     unread_count: int
+    next_cursor: Optional[str] = None
 
 
 class MarkReadResponse(BaseModel):
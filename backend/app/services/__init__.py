@@ -1,6 +1,13 @@
 """Business logic services package."""
 
-from app.services.agent_service import create_agent, search_agents, update_agent, get_agent_by_id
+from app.services.agent_service import (
+    create_agent,
+    search_agents,
+    update_agent,
+    get_agent_by_id,
+    get_agent_by_api_key,
+    rotate_api_key,
+)
 from app.services.marketplace_service import (
     create_service,
     search_services,
@@ -27,6 +34,8 @@ __all__ = [
     "search_agents",
     "update_agent",
     "get_agent_by_id",
+    "get_agent_by_api_key",
+    "rotate_api_key",
     # Marketplace service
     "create_service",
     "search_services",
@@ -2,55 +2,114 @@
 
 from typing import List, Tuple, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, and_
+from sqlalchemy import select, update
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.models.agent import Agent
 from app.schemas.agent import AgentCreate, AgentUpdate
 from app.core.security import generate_api_key, hash_api_key
 from app.core.events import event_bus
+from app.core.pagination import Cursor, apply_keyset
+from app.services.search_service import apply_text_search
+from app.services.ledger_service import PLATFORM_ADJUSTMENTS, get_balance, transfer
+from app.services.capability_service import (
+    MATCH_ANY,
+    agent_capability_filter,
+    set_agent_capabilities,
+)
+from app.core.auth_cache import principal_cache
 from decimal import Decimal
 
 
-async def update_balance(db: AsyncSession, agent_id: str, amount_delta: Decimal) -> Agent:
+async def update_balance(
+    db: AsyncSession,
+    agent_id: str,
+    amount_delta: Decimal,
+    counter_account: str = PLATFORM_ADJUSTMENTS,
+    entry_type: str = "adjustment",
+    reference_id: Optional[str] = None,
+    require_funds: bool = False,
+    track_totals: bool = True,
+    commit: bool = True,
+) -> Agent:
     """
-    Update agent's balance atomically.
+    Credit or debit an agent's balance through the ledger.
+
+    Appends a transfer between the agent and counter_account instead of
+    rewriting agents.balance, so concurrent balance changes do not queue on
+    the agent row. The returned agent carries the live ledger balance.
 
     Args:
         db: Database session
         agent_id: Agent UUID
         amount_delta: Amount to add (can be negative)
+        counter_account: Ledger account on the other side of the transfer
+        entry_type: Ledger entry type
+        reference_id: Related job/deposit/withdrawal/payment id
+        require_funds: Reject debits that would make the balance negative
+        track_totals: Also add the amount to total_earned/total_spent
+        commit: Commit now; pass False to add the transfer to the caller's
+            transaction (the returned agent's balance is then not refreshed)
 
     Returns:
         Updated agent
 
     Raises:
-        ValueError: If agent not found
+        ValueError: If agent not found or funds are insufficient
     """
-    # Atomic update using SQL expression
-    stmt = (
-        select(Agent)
-        .where(Agent.id == agent_id)
-        .with_for_update()
-    )
-    result = await db.execute(stmt)
-    agent = result.scalar_one_or_none()
-
+    agent = await db.get(Agent, agent_id)
     if not agent:
         raise ValueError("Agent not found")
 
-    agent.balance += amount_delta
-    # Update total_earned/spent stats if appropriate
     if amount_delta > 0:
-        agent.total_earned += amount_delta
+        await transfer(db, counter_account, str(agent_id), amount_delta, entry_type, reference_id)
     elif amount_delta < 0:
-        agent.total_spent += abs(amount_delta)
+        await transfer(
+            db, str(agent_id), counter_account, -amount_delta, entry_type, reference_id,
+            require_funds=require_funds,
+        )
+
+    # Update total_earned/spent stats if appropriate
+    if track_totals and amount_delta > 0:
+        await adjust_totals(db, agent_id, earned=amount_delta)
+    elif track_totals and amount_delta < 0:
+        await adjust_totals(db, agent_id, spent=-amount_delta)
+
+    if commit:
+        await db.commit()
+        set_committed_value(agent, "balance", await get_balance(db, str(agent_id)))
 
-    await db.commit()
-    await db.refresh(agent)
-    
     return agent
 
 
+async def adjust_totals(
+    db: AsyncSession,
+    agent_id: str,
+    earned: Decimal = Decimal("0"),
+    spent: Decimal = Decimal("0"),
+) -> None:
+    """
+    Increment an agent's lifetime total_earned/total_spent in place.
+
+    A single UPDATE with relative increments, so no read-modify-write
+    race; the caller commits.
+
+    Args:
+        db: Database session
+        agent_id: Agent UUID
+        earned: Amount to add to total_earned (can be negative)
+        spent: Amount to add to total_spent (can be negative)
+    """
+    await db.execute(
+        update(Agent)
+        .where(Agent.id == agent_id)
+        .values(
+            total_earned=Agent.total_earned + earned,
+            total_spent=Agent.total_spent + spent,
+        )
+    )
+
+
 async def create_agent(db: AsyncSession, agent_data: AgentCreate) -> Tuple[Agent, str]:
     """
     Create a new agent with API key.
@@ -76,6 +135,8 @@ async def create_agent(db: AsyncSession, agent_data: AgentCreate) -> Tuple[Agent
     )
 
     db.add(agent)
+    await db.flush()
+    await set_agent_capabilities(db, agent.id, agent.capabilities)
     await db.commit()
     await db.refresh(agent)
 
@@ -98,6 +159,8 @@ async def search_agents(
     has_services: Optional[bool] = None,
     limit: int = 50,
     offset: int = 0,
+    capability_match: str = MATCH_ANY,
+    cursor: Optional[Cursor] = None,
 ) -> List[Agent]:
     """
     Search agents with filters.
@@ -105,34 +168,32 @@ async def search_agents(
     Args:
         db: Database session
         query_text: General search query (name or description)
-        capabilities: Filter by capabilities (any match)
+        capabilities: Filter by capabilities
         status: Filter by status
         min_reputation: Minimum reputation score
         has_services: Only agents with active services
         limit: Maximum results
         offset: Pagination offset
+        capability_match: "any" or "all" of the given capabilities
+        cursor: Keyset position to continue after (newest first); not
+            available with query_text, whose results are ranked
 
     Returns:
         List of matching agents
+
+    Raises:
+        ValueError: If capability_match is invalid, or a cursor is combined
+            with query_text
     """
+    if cursor is not None and query_text:
+        raise ValueError("Cursor pagination is not available for ranked text search; use offset")
+
     query = select(Agent)
 
-    # Text search (Multi-term AND logic for SQLite "Google-like" search)
+    # Full-text search: every term must match name or description,
+    # results ordered by relevance
     if query_text:
-        terms = query_text.strip().split()
-        if terms:
-            # For each term, add a filter that requires it to be in name OR description
-            # resulting in: (name LIKE %term1% OR desc LIKE %term1%) AND (name LIKE %term2% OR desc LIKE %term2%)
-            term_filters = []
-            for term in terms:
-                term_filter = or_(
-                    Agent.name.ilike(f"%{term}%"),
-                    Agent.description.ilike(f"%{term}%")
-                )
-                term_filters.append(term_filter)
-            
-            # Combine all term filters with AND
-            query = query.where(and_(*term_filters))
+        query = apply_text_search(db, query, Agent, query_text)
 
     # Apply filters
     if status:
@@ -142,18 +203,20 @@ async def search_agents(
         query = query.where(Agent.reputation_score >= min_reputation)
 
     if capabilities:
-        # Match any of the provided capabilities
-        filters = [
-            Agent.capabilities.op('@>')(f'["{cap}"]')
-            for cap in capabilities
-        ]
-        query = query.where(or_(*filters))
+        # Indexed lookup in agent_capabilities
+        capability_clause = agent_capability_filter(capabilities, capability_match)
+        if capability_clause is not None:
+            query = query.where(capability_clause)
 
     # Note: has_services would require a join, simplified for now
     # Could be added with: query = query.join(Service).where(Service.is_active == True)
 
-    # Pagination
-    query = query.offset(offset).limit(limit)
+    # Pagination: ranked search keeps offset; listings page by keyset
+    if not query_text:
+        query = apply_keyset(query, Agent, cursor)
+    if cursor is None and offset:
+        query = query.offset(offset)
+    query = query.limit(limit)
 
     result = await db.execute(query)
     return list(result.scalars().all())
@@ -187,24 +250,73 @@ async def update_agent(
         raise ValueError("Agent not found")
 
     # Update fields
+    previous_status = agent.status
     update_data = updates.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(agent, field, value)
 
+    if "capabilities" in update_data:
+        await set_agent_capabilities(db, agent.id, agent.capabilities or [])
+
     await db.commit()
     await db.refresh(agent)
 
+    # Cached principals carry status, so drop the stale entry
+    principal_cache.invalidate_agent(str(agent.id))
+
     # Emit event if status changed
     if "status" in update_data:
         await event_bus.publish("agent_status_changed", {
             "agent_id": str(agent.id),
             "name": agent.name,
             "status": agent.status,
+            "previous_status": previous_status,
         })
 
     return agent
 
 
+async def rotate_api_key(db: AsyncSession, agent_id: str) -> Tuple[Agent, str]:
+    """
+    Replace an agent's API key with a newly generated one.
+
+    The previous key stops working immediately on this worker. Other
+    workers evict their cached principal when they receive the
+    agent_key_rotated event; without a shared event bus backend
+    (EVENT_BUS_BACKEND=postgres) they may accept it until
+    AUTH_CACHE_TTL_SECONDS expires.
+
+    Args:
+        db: Database session
+        agent_id: Agent UUID
+
+    Returns:
+        Tuple of (Agent, new_plaintext_api_key)
+
+    Raises:
+        ValueError: If agent not found
+    """
+    result = await db.execute(
+        select(Agent).where(Agent.id == agent_id)
+    )
+    agent = result.scalar_one_or_none()
+
+    if not agent:
+        raise ValueError("Agent not found")
+
+    api_key = generate_api_key()
+    agent.api_key_hash = hash_api_key(api_key)
+
+    await db.commit()
+    await db.refresh(agent)
+
+    principal_cache.invalidate_agent(str(agent.id))
+    # Every worker's principal cache listens for this and evicts the old key
+    await event_bus.publish("agent_key_rotated", {"agent_id": str(agent.id)})
+
+    return agent, api_key
+
+
 async def get_agent_by_id(db: AsyncSession, agent_id: str) -> Optional[Agent]:
     """
     Get an agent by ID.
@@ -220,3 +332,23 @@ async def get_agent_by_id(db: AsyncSession, agent_id: str) -> Optional[Agent]:
         select(Agent).where(Agent.id == agent_id)
     )
     return result.scalar_one_or_none()
+
+
+async def get_agent_by_api_key(db: AsyncSession, api_key: str) -> Optional[Agent]:
+    """
+    Get an agent by its plaintext API key.
+
+    The key is hashed and matched against the unique index on
+    ``agents.api_key_hash``, so the lookup is a single point query.
+
+    Args:
+        db: Database session
+        api_key: Plaintext API key from the X-Agent-Key header
+
+    Returns:
+        Agent or None if no agent owns the key
+    """
+    result = await db.execute(
+        select(Agent).where(Agent.api_key_hash == hash_api_key(api_key))
+    )
+    return result.scalar_one_or_none()
@@ -0,0 +1,109 @@
+"""Capability index maintenance and capability filters."""
+
+from typing import Iterable, List
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.agent import Agent
+from app.models.service import Service
+from app.models.capability import AgentCapability, ServiceCapability
+
+MATCH_ANY = "any"
+MATCH_ALL = "all"
+
+
+def normalize_capabilities(capabilities: Iterable[str]) -> List[str]:
+    """
+    Normalize capability names for indexing and matching.
+
+    Args:
+        capabilities: Raw capability names
+
+    Returns:
+        Stripped, lowercased, de-duplicated names in original order
+    """
+    seen = []
+    for capability in capabilities or []:
+        name = str(capability).strip().lower()[:100]
+        if name and name not in seen:
+            seen.append(name)
+    return seen
+
+
+async def set_agent_capabilities(db: AsyncSession, agent_id: str, capabilities: Iterable[str]) -> None:
+    """
+    Replace an agent's capability index rows (caller commits).
+
+    Args:
+        db: Database session
+        agent_id: Agent UUID
+        capabilities: Capabilities from Agent.capabilities
+    """
+    await db.execute(delete(AgentCapability).where(AgentCapability.agent_id == agent_id))
+    rows = [{"agent_id": agent_id, "capability": c} for c in normalize_capabilities(capabilities)]
+    if rows:
+        await db.execute(insert(AgentCapability), rows)
+
+
+async def set_service_capabilities(db: AsyncSession, service_id: str, capabilities: Iterable[str]) -> None:
+    """
+    Replace a service's capability index rows (caller commits).
+
+    Args:
+        db: Database session
+        service_id: Service UUID
+        capabilities: Capabilities from Service.capabilities_required
+    """
+    await db.execute(delete(ServiceCapability).where(ServiceCapability.service_id == service_id))
+    rows = [{"service_id": service_id, "capability": c} for c in normalize_capabilities(capabilities)]
+    if rows:
+        await db.execute(insert(ServiceCapability), rows)
+
+
+def capability_filter(id_column, owner_column, capability_column, capabilities: List[str], match: str = MATCH_ANY):
+    """
+    Build a WHERE clause restricting rows to those with matching capabilities.
+
+    Args:
+        id_column: Primary key of the filtered model (e.g. Agent.id)
+        owner_column: Owner column of the index table (e.g. AgentCapability.agent_id)
+        capability_column: Capability column of the index table
+        capabilities: Requested capabilities
+        match: "any" for at least one, "all" for every capability
+
+    Returns:
+        SQL expression, or None if no capabilities were requested
+
+    Raises:
+        ValueError: If match is not "any" or "all"
+    """
+    if match not in (MATCH_ANY, MATCH_ALL):
+        raise ValueError(f"Invalid capability match mode: {match}")
+
+    names = normalize_capabilities(capabilities)
+    if not names:
+        return None
+
+    # Index range scan on (capability, owner_id)
+    owners = select(owner_column).where(capability_column.in_(names))
+    if match == MATCH_ALL and len(names) > 1:
+        owners = owners.group_by(owner_column).having(
+            func.count(capability_column) == len(names)
+        )
+
+    return id_column.in_(owners)
+
+
+def agent_capability_filter(capabilities: List[str], match: str = MATCH_ANY):
+    """Capability filter for Agent queries."""
+    return capability_filter(
+        Agent.id, AgentCapability.agent_id, AgentCapability.capability, capabilities, match
+    )
+
+
+def service_capability_filter(capabilities: List[str], match: str = MATCH_ANY):
+    """Capability filter for Service queries."""
+    return capability_filter(
+        Service.id, ServiceCapability.service_id, ServiceCapability.capability, capabilities, match
+    )
@@ -0,0 +1,544 @@
+"""Shared non-blocking, pooled JSON-RPC access for the chain-facing services."""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+from urllib.parse import urlsplit
+
+import aiohttp
+from web3 import AsyncWeb3
+from web3._utils.method_formatters import receipt_formatter
+from web3.exceptions import TransactionNotFound
+from web3.providers.rpc.utils import ExceptionRetryConfiguration
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Just enough ABI to read a token's decimals
+ERC20_DECIMALS_ABI = [
+    {
+        "constant": True,
+        "inputs": [],
+        "name": "decimals",
+        "outputs": [{"name": "", "type": "uint8"}],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+
+class ChainDataCache:
+    """
+    LRU cache for chain data that never changes once observed.
+
+    There is no TTL: only immutable values (mined receipts, token
+    decimals) are stored, so the size bound is the only reason to drop an
+    entry. Not thread-safe - it is only touched from the event loop.
+    """
+
+    def __init__(self, max_entries: int):
+        """Initialize an empty cache holding at most max_entries values."""
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss."""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Cache a value, evicting the least recently used entry if full."""
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all cached values (counters are kept)."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss/eviction counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+class RpcTransport:
+    """
+    Pooled keep-alive HTTP session for one RPC endpoint.
+
+    web3's default async session closes the connection after every request
+    (force_close), paying a TCP and TLS handshake per RPC call. This
+    transport owns an aiohttp session whose connector keeps up to
+    pool_size connections alive and reuses them, and counts how often a
+    connection is reused versus newly opened.
+    """
+
+    def __init__(self, pool_size: int, keepalive_seconds: float, request_timeout_seconds: float):
+        """Configure the pool; the session is created lazily on the running loop."""
+        self.pool_size = pool_size
+        self.keepalive_seconds = keepalive_seconds
+        self.request_timeout_seconds = request_timeout_seconds
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Loop the session was created on; a session can't be used from another
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.requests = 0
+        self.request_errors = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+
+    async def session(self) -> Tuple[aiohttp.ClientSession, bool]:
+        """
+        Return the pooled session, creating it if missing, closed or on a stale loop.
+
+        Returns:
+            Tuple of (session, whether it was just created)
+        """
+        loop = asyncio.get_running_loop()
+        session = self._session
+        if session is not None and not session.closed and self._session_loop is loop:
+            return session, False
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._on_request_start)
+        trace.on_request_exception.append(self._on_request_exception)
+        trace.on_connection_create_end.append(self._on_connection_created)
+        trace.on_connection_reuseconn.append(self._on_connection_reused)
+        self._session = aiohttp.ClientSession(
+            raise_for_status=True,
+            connector=aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size,
+                keepalive_timeout=self.keepalive_seconds,
+            ),
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout_seconds),
+            trace_configs=[trace],
+        )
+        self._session_loop = loop
+        return self._session, True
+
+    async def close(self) -> None:
+        """Close the session and its pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+    async def _on_request_start(self, session, context, params) -> None:
+        self.requests += 1
+
+    async def _on_request_exception(self, session, context, params) -> None:
+        self.request_errors += 1
+
+    async def _on_connection_created(self, session, context, params) -> None:
+        self.connections_created += 1
+
+    async def _on_connection_reused(self, session, context, params) -> None:
+        self.connections_reused += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return connection reuse counters."""
+        connections = self.connections_created + self.connections_reused
+        return {
+            "requests": self.requests,
+            "request_errors": self.request_errors,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_ratio": round(self.connections_reused / connections, 4) if connections else None,
+            "pool_size": self.pool_size,
+        }
+
+
+class ChainClient:
+    """
+    Async Web3 client for one RPC endpoint, shared by every service using it.
+
+    Every RPC round trip goes through call(), which awaits it without
+    blocking the event loop, bounds it with a timeout and caps how many
+    run at once, so a slow node degrades into timeouts instead of an
+    unbounded pile-up of requests. Requests go over the pooled transport;
+    read-only methods that fail with a connection error or timeout are
+    retried with exponential backoff by the provider.
+    """
+
+    def __init__(
+        self,
+        rpc_url: str,
+        timeout_seconds: float,
+        max_concurrency: int,
+        method_timeouts: Optional[Dict[str, float]] = None,
+        transport: Optional[RpcTransport] = None,
+        retries: int = 3,
+        backoff_seconds: float = 0.25,
+        receipt_cache_size: int = 10000,
+        token_cache_size: int = 1000,
+        receipt_cache_confirmations: int = 12,
+    ):
+        """Create the client; no connection is opened until the first call."""
+        self.rpc_url = rpc_url
+        self.timeout_seconds = timeout_seconds
+        self.max_concurrency = max_concurrency
+        self.method_timeouts = method_timeouts or {}
+        self.transport = transport or RpcTransport(
+            pool_size=max_concurrency,
+            keepalive_seconds=30.0,
+            request_timeout_seconds=timeout_seconds,
+        )
+        self.web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(
+            rpc_url,
+            exception_retry_configuration=ExceptionRetryConfiguration(
+                errors=(aiohttp.ClientError, asyncio.TimeoutError),
+                retries=max(1, retries),
+                backoff_factor=backoff_seconds,
+            ),
+        ))
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.receipts = ChainDataCache(receipt_cache_size)
+        # Only receipts this deep are treated as final; shallower ones can still be reorged out
+        self.receipt_cache_confirmations = receipt_cache_confirmations
+        self.token_decimals_cache = ChainDataCache(token_cache_size)
+        # Latest block head, shared by every caller that accepts a slightly stale one
+        self._head: Optional[int] = None
+        self._head_at = 0.0
+        self._head_lock = asyncio.Lock()
+
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.in_flight = 0
+        self.batches = 0
+        self.head_polls = 0
+        self.head_hits = 0
+
+    async def call(
+        self,
+        fn: Callable[..., Awaitable[T]],
+        *args: Any,
+        method: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> T:
+        """
+        Run one RPC coroutine function under the concurrency cap and a timeout.
+
+        The timeout covers waiting for a free slot, the call and its retries.
+
+        Args:
+            fn: Async callable performing the RPC (e.g. web3.eth.get_transaction_receipt
+                or contract.functions.decimals().call)
+            *args: Arguments for fn
+            method: JSON-RPC method name, used to pick a per-method timeout
+            timeout: Seconds before giving up (defaults to the method's
+                timeout, then timeout_seconds)
+
+        Returns:
+            Result of fn
+
+        Raises:
+            asyncio.TimeoutError: If the call did not finish in time
+        """
+        async def run() -> T:
+            async with self._semaphore:
+                self.in_flight += 1
+                try:
+                    return await fn(*args)
+                finally:
+                    self.in_flight -= 1
+
+        session, created = await self.transport.session()
+        if created:
+            await self.web3.provider.cache_async_session(session)
+
+        self.calls += 1
+        timeout = timeout or self.method_timeouts.get(method) or self.timeout_seconds
+        try:
+            return await asyncio.wait_for(run(), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"RPC call {getattr(fn, '__name__', fn)} to {_endpoint_label(self.rpc_url)} timed out")
+            raise
+        except Exception:
+            self.errors += 1
+            raise
+
+    def contract(self, address: str, abi: List[Dict[str, Any]]):
+        """Return an async contract bound to this client's connection."""
+        return self.web3.eth.contract(address=address, abi=abi)
+
+    async def get_transaction_receipt(self, tx_hash: str, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Fetch a transaction receipt, from the cache once it is final.
+
+        Args:
+            tx_hash: Transaction hash
+            use_cache: Pass False to always read the chain, e.g. to re-check
+                depth before crediting
+
+        Raises:
+            TransactionNotFound: If the transaction is unknown or pending
+        """
+        key = tx_hash.lower()
+        receipt = self.receipts.get(key) if use_cache else None
+        if receipt is not None:
+            return receipt
+
+        receipt = await self.call(self.web3.eth.get_transaction_receipt, tx_hash, method="eth_getTransactionReceipt")
+        await self._cache_final_receipts({key: receipt})
+        return receipt
+
+    async def get_transaction_receipts(
+        self, tx_hashes: List[str], use_cache: bool = True
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Fetch many receipts, sending every cache miss in one JSON-RPC batch.
+
+        A null or error result for one hash does not fail the others. If the
+        endpoint rejects batching, the misses are fetched concurrently one by
+        one instead.
+
+        Args:
+            tx_hashes: Transaction hashes
+            use_cache: Pass False to read every receipt from the chain
+
+        Returns:
+            Receipt per lowercased hash, or None if unknown or still pending
+        """
+        receipts: Dict[str, Optional[Dict[str, Any]]] = {}
+        missing: List[str] = []
+        for tx_hash in tx_hashes:
+            key = tx_hash.lower()
+            if key in receipts or key in missing:
+                continue
+            receipt = self.receipts.get(key) if use_cache else None
+            if receipt is not None:
+                receipts[key] = receipt
+            else:
+                missing.append(key)
+
+        if not missing:
+            return receipts
+
+        try:
+            self.batches += 1
+            responses = await self.call(
+                self.web3.provider.make_batch_request,
+                [("eth_getTransactionReceipt", [key]) for key in missing],
+                method="eth_getTransactionReceipt",
+            )
+            if not isinstance(responses, list) or len(responses) != len(missing):
+                raise ValueError("RPC endpoint returned an invalid batch response")
+        except Exception as e:
+            logger.warning(f"Batch receipt request failed, fetching one by one: {e}")
+            fetched = await asyncio.gather(
+                *(self.get_transaction_receipt(key, use_cache=False) for key in missing),
+                return_exceptions=True,
+            )
+            for key, receipt in zip(missing, fetched):
+                if isinstance(receipt, TransactionNotFound):
+                    receipts[key] = None
+                elif isinstance(receipt, BaseException):
+                    raise receipt
+                else:
+                    receipts[key] = receipt
+            return receipts
+
+        fetched = {}
+        for key, response in zip(missing, responses):
+            result = response.get("result") if isinstance(response, dict) else None
+            fetched[key] = receipt_formatter(result) if result else None
+        await self._cache_final_receipts(fetched)
+        receipts.update(fetched)
+        return receipts
+
+    async def _cache_final_receipts(self, receipts: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        """
+        Cache the receipts that are at least receipt_cache_confirmations blocks deep.
+
+        A stale head only undercounts depth, so a recently fetched one is
+        reused. If the head cannot be read, nothing is cached.
+        """
+        mined = {
+            key: receipt for key, receipt in receipts.items()
+            if receipt and receipt.get("blockNumber") is not None
+        }
+        if not mined:
+            return
+
+        if self.receipt_cache_confirmations > 1:
+            try:
+                head = await self.block_number(max_age_seconds=self.timeout_seconds)
+            except Exception as e:
+                logger.debug(f"Not caching receipts, block head unavailable: {e}")
+                return
+        else:
+            head = None
+
+        for key, receipt in mined.items():
+            if head is None or head - receipt["blockNumber"] + 1 >= self.receipt_cache_confirmations:
+                self.receipts.put(key, receipt)
+
+    async def block_number(self, max_age_seconds: float = 0.0) -> int:
+        """
+        Return the latest block number, reusing one fetched less than max_age_seconds ago.
+
+        Concurrent callers wait for a single eth_blockNumber request instead
+        of sending one each.
+
+        Args:
+            max_age_seconds: How stale a previously fetched head may be
+
+        Returns:
+            Latest block number
+        """
+        loop = asyncio.get_running_loop()
+        async with self._head_lock:
+            if self._head is not None and loop.time() - self._head_at < max_age_seconds:
+                self.head_hits += 1
+                return self._head
+
+            self.head_polls += 1
+            self._head = await self.call(self.web3.eth.get_block_number, method="eth_blockNumber")
+            self._head_at = loop.time()
+            return self._head
+
+    async def token_decimals(self, token_address: str) -> int:
+        """
+        Return an ERC-20 token's decimals, read from chain once per address.
+
+        Args:
+            token_address: Token contract address
+
+        Returns:
+            Number of decimals
+        """
+        key = token_address.lower()
+        decimals = self.token_decimals_cache.get(key)
+        if decimals is None:
+            contract = self.contract(token_address, ERC20_DECIMALS_ABI)
+            decimals = await self.eth_call(contract.functions.decimals())
+            self.token_decimals_cache.put(key, decimals)
+        return decimals
+
+    async def eth_call(self, contract_function) -> Any:
+        """
+        Call a read-only contract function.
+
+        Args:
+            contract_function: Bound function, e.g. contract.functions.decimals()
+
+        Returns:
+            Decoded return value
+        """
+        return await self.call(contract_function.call, method="eth_call")
+
+    async def is_connected(self) -> bool:
+        """Check that the RPC endpoint answers."""
+        try:
+            return await self.call(self.web3.is_connected)
+        except Exception:
+            return False
+
+    async def close(self) -> None:
+        """Close the pooled HTTP session."""
+        try:
+            await self.transport.close()
+        except Exception as e:
+            logger.debug(f"Error closing RPC session for {_endpoint_label(self.rpc_url)}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return call counters for /metrics."""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "in_flight": self.in_flight,
+            "batches": self.batches,
+            "head": self._head,
+            "head_polls": self.head_polls,
+            "head_hits": self.head_hits,
+            "max_concurrency": self.max_concurrency,
+            "timeout_seconds": self.timeout_seconds,
+            "transport": self.transport.stats(),
+            "receipt_cache": self.receipts.stats(),
+            "token_cache": self.token_decimals_cache.stats(),
+        }
+
+
+# Transport registry: one client, and so one connection pool, per RPC URL
+_clients: Dict[str, ChainClient] = {}
+
+
+def get_chain_client(rpc_url: Optional[str] = None) -> ChainClient:
+    """
+    Return the shared client for an RPC URL, creating it on first use.
+
+    Services pointing at the same URL share its connection pool,
+    concurrency cap and counters.
+
+    Args:
+        rpc_url: JSON-RPC endpoint (defaults to WEB3_RPC_URL)
+
+    Returns:
+        ChainClient for that endpoint
+    """
+    rpc_url = rpc_url or settings.WEB3_RPC_URL
+    client = _clients.get(rpc_url)
+    if client is None:
+        client = ChainClient(
+            rpc_url,
+            timeout_seconds=settings.CHAIN_RPC_TIMEOUT_SECONDS,
+            max_concurrency=settings.CHAIN_RPC_MAX_CONCURRENCY,
+            method_timeouts=settings.CHAIN_RPC_METHOD_TIMEOUTS,
+            transport=RpcTransport(
+                pool_size=settings.CHAIN_RPC_POOL_SIZE,
+                keepalive_seconds=settings.CHAIN_RPC_KEEPALIVE_SECONDS,
+                request_timeout_seconds=settings.CHAIN_RPC_TIMEOUT_SECONDS,
+            ),
+            retries=settings.CHAIN_RPC_RETRIES,
+            backoff_seconds=settings.CHAIN_RPC_BACKOFF_SECONDS,
+            receipt_cache_size=settings.CHAIN_RECEIPT_CACHE_SIZE,
+            token_cache_size=settings.CHAIN_TOKEN_CACHE_SIZE,
+            receipt_cache_confirmations=max(settings.CHAIN_RECEIPT_CACHE_CONFIRMATIONS, settings.MIN_CONFIRMATIONS),
+        )
+        _clients[rpc_url] = client
+    return client
+
+
+async def close_chain_clients() -> None:
+    """Close every shared client (call on application shutdown)."""
+    for client in _clients.values():
+        await client.close()
+
+
+def _endpoint_label(rpc_url: str) -> str:
+    """Scheme and host of an RPC URL; paths often embed API keys."""
+    parts = urlsplit(rpc_url)
+    return f"{parts.scheme}://{parts.hostname}" if parts.hostname else "rpc"
+
+
+def chain_client_stats() -> Dict[str, Any]:
+    """Return per-endpoint call counters for /metrics."""
+    return {_endpoint_label(url): client.stats() for url, client in _clients.items()}
@@ -1,19 +1,20 @@
 """Chain service for interacting with blockchain networks."""
 
-import os
+import asyncio
 import logging
 from decimal import Decimal
-from typing import Optional
-from web3 import Web3
+from typing import Any, Dict, List, Optional, Tuple
 from web3.exceptions import TransactionNotFound
 
+from app.config import settings
+from app.services.chain_client import ChainClient, get_chain_client
+
 logger = logging.getLogger(__name__)
 
 class ChainService:
-    def __init__(self):
-        self.rpc_url = os.getenv("WEB3_RPC_URL", "https://rpc.sepolia.org")
-        self.web3 = Web3(Web3.HTTPProvider(self.rpc_url))
-        self.usdc_address = os.getenv("USDC_ADDRESS", "0x1c7D4B196Cb0C7B01d743Fbc6116a902379C7238") # Ethereum Sepolia USDC
+    def __init__(self, client: Optional[ChainClient] = None):
+        self.client = client or get_chain_client(settings.WEB3_RPC_URL)
+        self.usdc_address = settings.USDC_ADDRESS
         
         # Reduced ABI for Transfer events and decimals
         self.erc20_abi = [
@@ -38,7 +39,7 @@ class ChainService:
             }
         ]
         
-    def verify_transaction(
+    async def verify_transaction(
         self,
         tx_hash: str,
         expected_amount: Decimal,
@@ -64,8 +65,93 @@ class ChainService:
             )
 
             # 1. Get Transaction Receipt
-            receipt = self.web3.eth.get_transaction_receipt(tx_hash)
+            receipt = await self.client.get_transaction_receipt(tx_hash)
+            return await self.verify_receipt(
+                tx_hash, receipt, expected_amount, recipient_address, token_address
+            )
+
+        except TransactionNotFound:
+            logger.warning(f"Transaction not found on blockchain: {tx_hash}")
+            return False
+        except Exception as e:
+            logger.error(f"Error verifying transaction {tx_hash}: {e}", exc_info=True)
+            return False
+
+    async def is_confirmed(self, receipt: Optional[Dict[str, Any]]) -> bool:
+        """
+        Check that a receipt is at least MIN_CONFIRMATIONS blocks deep.
+
+        The block it was mined in counts as the first confirmation, so with
+        MIN_CONFIRMATIONS <= 1 any mined receipt passes without reading the
+        head. Otherwise the head is shared with every other caller for up to
+        CONFIRMATION_POLL_SECONDS.
+
+        Args:
+            receipt: Transaction receipt, or None if not found
+
+        Returns:
+            True if mined and deep enough
+        """
+        block_number = receipt.get('blockNumber') if receipt else None
+        if block_number is None:
+            return False
+        if settings.MIN_CONFIRMATIONS <= 1:
+            return True
+
+        head = await self.client.block_number(max_age_seconds=settings.CONFIRMATION_POLL_SECONDS)
+        return head - block_number + 1 >= settings.MIN_CONFIRMATIONS
+
+    async def verify_transactions(
+        self,
+        checks: List[Tuple[str, Decimal, str, Optional[str]]]
+    ) -> List[Tuple[bool, Optional[Dict[str, Any]]]]:
+        """
+        Verify several transactions, fetching their receipts in one batch.
+
+        Args:
+            checks: (tx_hash, expected_amount, recipient_address, token_address) per transaction
+
+        Returns:
+            (is_valid, receipt) per check, in order; receipt is None if not found
+        """
+        if not checks:
+            return []
 
+        try:
+            receipts = await self.client.get_transaction_receipts([check[0] for check in checks])
+        except Exception as e:
+            logger.error(f"Error fetching receipts for {len(checks)} transactions: {e}", exc_info=True)
+            return [(False, None) for _ in checks]
+
+        found = [receipts.get(tx_hash.lower()) for tx_hash, _, _, _ in checks]
+        results = await asyncio.gather(*(
+            self.verify_receipt(tx_hash, receipt, expected_amount, recipient_address, token_address)
+            for (tx_hash, expected_amount, recipient_address, token_address), receipt in zip(checks, found)
+        ))
+        return list(zip(results, found))
+
+    async def verify_receipt(
+        self,
+        tx_hash: str,
+        receipt: Optional[Dict[str, Any]],
+        expected_amount: Decimal,
+        recipient_address: str,
+        token_address: Optional[str] = None
+    ) -> bool:
+        """
+        Check that a fetched receipt pays expected_amount of the token to recipient_address.
+
+        Args:
+            tx_hash: Transaction hash string (for logging)
+            receipt: Transaction receipt, or None if not found
+            expected_amount: Expected amount (in human readable units)
+            recipient_address: Expected recipient wallet address
+            token_address: Optional token contract address (defaults to USDC env var)
+
+        Returns:
+            True if valid and confirmed
+        """
+        try:
             if not receipt:
                 logger.warning(f"Transaction receipt not found for tx_hash={tx_hash}")
                 return False
@@ -76,7 +162,7 @@ class ChainService:
 
             # 2. Check for Token Transfer
             target_token = token_address or self.usdc_address
-            contract = self.web3.eth.contract(address=target_token, abi=self.erc20_abi)
+            contract = self.client.contract(target_token, self.erc20_abi)
 
             # Parse logs for Transfer events
             transfers = contract.events.Transfer().process_receipt(receipt)
@@ -99,8 +185,8 @@ class ChainService:
                     continue
 
                 # Check amount
-                # We need decimals to convert
-                decimals = contract.functions.decimals().call()
+                # We need decimals to convert (cached per token)
+                decimals = await self.client.token_decimals(target_token)
                 amount_wei = args['value']
                 amount_human = Decimal(amount_wei) / Decimal(10 ** decimals)
 
@@ -121,9 +207,6 @@ class ChainService:
             logger.warning(f"No matching Transfer event found for tx_hash={tx_hash}")
             return False
 
-        except TransactionNotFound:
-            logger.warning(f"Transaction not found on blockchain: {tx_hash}")
-            return False
         except Exception as e:
             logger.error(f"Error verifying transaction {tx_hash}: {e}", exc_info=True)
             return False
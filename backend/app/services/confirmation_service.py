@@ -0,0 +1,250 @@
+"""Background pipeline crediting payments and deposits once they are confirmed."""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.core.events import event_bus
+from app.database import AsyncSessionLocal
+from app.models.deposit_transaction import DepositTransaction
+from app.models.payment_transaction import PaymentTransaction, TransactionStatus
+from app.services.chain_service import chain_service
+from app.services.deposit_service import deposit_service
+from app.services.payment_verification_service import payment_verification_service
+
+logger = logging.getLogger(__name__)
+
+PENDING_EVENTS = ("payment_pending", "deposit_pending")
+
+
+class ConfirmationTracker:
+    """
+    Credits pending payments and deposits once they are MIN_CONFIRMATIONS deep.
+
+    The verify endpoints park transactions that are not mined yet, or not
+    deep enough, as pending rows and publish payment_pending or
+    deposit_pending, which wakes the tracker. While anything is pending it
+    polls eth_blockNumber once per interval for all of them (sharing the
+    head with the endpoints); each new head triggers a single batch receipt
+    request for every pending hash. Rows that reached the required depth
+    are verified and credited or failed, and the agent is notified through
+    the event bus. Rows whose transaction is still not mined
+    PAYMENT_VERIFICATION_TIMEOUT seconds after submission are failed.
+
+    Pending rows live in the database, so they survive restarts and any
+    process's tracker can finish them; guarded status updates make sure
+    each one is credited once. Receipts are always re-read from the chain
+    rather than the cache, so the depth check and the credit use the
+    receipt's current block; one reorged out is simply waited for again.
+    """
+
+    def __init__(
+        self,
+        poll_interval_seconds: float,
+        timeout_seconds: float,
+        batch_size: int,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+    ):
+        """Initialize the tracker; call start() to run it."""
+        self.poll_interval_seconds = poll_interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.batch_size = batch_size
+        self._session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._last_head: Optional[int] = None
+
+        self.pending = 0
+        self.heads = 0
+        self.credited = 0
+        self.failed = 0
+        self.expired = 0
+        self.failures = 0
+        self.wakeups = 0
+
+    def on_event(self, event: Dict[str, Any]) -> None:
+        """
+        Wake the tracker when a payment or deposit is parked (event bus listener).
+
+        Args:
+            event: Event dictionary with type and data
+        """
+        if event["type"] in PENDING_EVENTS:
+            self._wakeup.set()
+            self.wakeups += 1
+
+    async def start(self) -> None:
+        """Subscribe to pending events and start the tracking loop."""
+        event_bus.add_listener(self.on_event)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the tracking loop; pending rows are picked up again on the next start."""
+        event_bus.remove_listener(self.on_event)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def check(self, db: Optional[AsyncSession] = None) -> int:
+        """
+        Check pending payments and deposits against the current block head.
+
+        Does nothing (and makes no RPC calls) when nothing is pending, and
+        fetches receipts only when the head moved since the last check.
+
+        Args:
+            db: Session to use; a new one is opened when omitted
+
+        Returns:
+            Number of rows still pending
+        """
+        if db is None:
+            async with self._session_factory() as session:
+                return await self.check(session)
+
+        payments = list((await db.execute(
+            select(PaymentTransaction)
+            .where(PaymentTransaction.status == TransactionStatus.PENDING)
+            .order_by(PaymentTransaction.created_at)
+            .limit(self.batch_size)
+        )).scalars())
+        deposits = list((await db.execute(
+            select(DepositTransaction)
+            .where(DepositTransaction.status == "pending")
+            .order_by(DepositTransaction.created_at)
+            .limit(self.batch_size)
+        )).scalars())
+
+        self.pending = len(payments) + len(deposits)
+        if not self.pending:
+            return 0
+
+        head = await chain_service.client.block_number(max_age_seconds=self.poll_interval_seconds)
+        if head == self._last_head:
+            return self.pending
+        self._last_head = head
+        self.heads += 1
+
+        # Never trust a cached receipt here: a shallow one may have been reorged out
+        receipts = await chain_service.client.get_transaction_receipts(
+            [payment.tx_hash for payment in payments] + [deposit.swap_tx_hash for deposit in deposits],
+            use_cache=False,
+        )
+        expired_before = datetime.utcnow() - timedelta(seconds=self.timeout_seconds)
+        # A rollback expires every loaded row; reload before touching one again
+        stale = False
+
+        for payment in payments:
+            if stale and not await self._still_pending(db, payment, TransactionStatus.PENDING):
+                self.pending -= 1
+                continue
+            tx_hash = payment.tx_hash
+            receipt = receipts.get(tx_hash.lower())
+            try:
+                if receipt is None and payment.created_at < expired_before:
+                    await payment_verification_service.expire_pending_payment(db, payment)
+                    self.expired += 1
+                elif await chain_service.is_confirmed(receipt):
+                    credited = await payment_verification_service.confirm_pending_payment(db, payment, receipt)
+                    if credited is not None:
+                        self.credited += 1
+                    else:
+                        self.failed += 1
+                else:
+                    continue
+                self.pending -= 1
+            except ValueError:
+                # A verify request finished it first
+                await db.rollback()
+                stale = True
+                self.pending -= 1
+            except Exception as e:
+                await db.rollback()
+                stale = True
+                self.failures += 1
+                logger.error(f"Failed to confirm payment {tx_hash}: {e}", exc_info=True)
+
+        for deposit in deposits:
+            if stale and not await self._still_pending(db, deposit, "pending"):
+                self.pending -= 1
+                continue
+            tx_hash = deposit.swap_tx_hash
+            receipt = receipts.get(tx_hash.lower())
+            try:
+                if receipt is None and deposit.created_at < expired_before:
+                    await deposit_service.expire_pending_deposit(db, deposit)
+                    self.expired += 1
+                elif await chain_service.is_confirmed(receipt):
+                    error = await deposit_service.confirm_pending_deposit(db, deposit, receipt)
+                    if error is None:
+                        self.credited += 1
+                    else:
+                        self.failed += 1
+                else:
+                    continue
+                self.pending -= 1
+            except ValueError:
+                await db.rollback()
+                stale = True
+                self.pending -= 1
+            except Exception as e:
+                await db.rollback()
+                stale = True
+                self.failures += 1
+                logger.error(f"Failed to confirm deposit {tx_hash}: {e}", exc_info=True)
+
+        return self.pending
+
+    async def _still_pending(self, db: AsyncSession, row: Any, pending_status: Any) -> bool:
+        """Reload a row expired by a rollback and check it is still pending."""
+        await db.refresh(row)
+        return row.status == pending_status
+
+    def stats(self) -> Dict[str, Any]:
+        """Return tracker counters for /metrics."""
+        return {
+            "min_confirmations": settings.MIN_CONFIRMATIONS,
+            "poll_interval_seconds": self.poll_interval_seconds,
+            "pending": self.pending,
+            "last_head": self._last_head,
+            "heads": self.heads,
+            "credited": self.credited,
+            "failed": self.failed,
+            "expired": self.expired,
+            "failures": self.failures,
+            "wakeups": self.wakeups,
+        }
+
+    async def _run(self) -> None:
+        """Check every interval, or as soon as something is parked."""
+        while True:
+            try:
+                await self.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Confirmation check failed: {e}", exc_info=True)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+confirmation_tracker = ConfirmationTracker(
+    poll_interval_seconds=settings.CONFIRMATION_POLL_SECONDS,
+    timeout_seconds=settings.PAYMENT_VERIFICATION_TIMEOUT,
+    batch_size=settings.CONFIRMATION_BATCH_SIZE,
+)
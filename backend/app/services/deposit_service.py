@@ -0,0 +1,210 @@
+"""Deposit service for crediting token deposits to the platform wallet."""
+
+import logging
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Optional
+import uuid
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from web3.exceptions import TransactionNotFound
+
+from app.config import settings
+from app.core.events import event_bus
+from app.models.deposit_transaction import DepositTransaction
+from app.services.agent_service import update_balance
+from app.services.chain_service import chain_service
+from app.services.ledger_service import PLATFORM_DEPOSITS
+from app.services.uniswap_service import uniswap_service
+
+logger = logging.getLogger(__name__)
+
+
+class DepositService:
+    """Service for verifying deposits and crediting AGNT once they are confirmed."""
+
+    async def verify_and_credit_deposit(
+        self,
+        db: AsyncSession,
+        agent_id: str,
+        tx_hash: str,
+        min_agnt_amount: Optional[Decimal] = None
+    ) -> DepositTransaction:
+        """
+        Record a deposit and credit it if its transaction is confirmed.
+
+        A transaction that is not mined yet, or is fewer than MIN_CONFIRMATIONS
+        blocks deep, stays pending and is credited later by the confirmation
+        tracker, which publishes deposit_credited or deposit_failed.
+
+        Args:
+            db: Database session
+            agent_id: Depositing agent UUID
+            tx_hash: Transaction hash of the transfer to the platform wallet
+            min_agnt_amount: Minimum AGNT credit to accept
+
+        Returns:
+            The deposit: verified, or pending while waiting for confirmations
+
+        Raises:
+            ValueError: If already processed, previously failed or verification fails
+        """
+        result = await db.execute(
+            select(DepositTransaction).where(DepositTransaction.swap_tx_hash == tx_hash)
+        )
+        existing = result.scalar_one_or_none()
+        if existing:
+            if existing.status == "verified" or existing.agent_id != agent_id:
+                raise ValueError(f"Transaction {tx_hash} already processed")
+            if existing.status == "failed":
+                raise ValueError(f"Transaction {tx_hash} previously failed verification")
+            logger.info(f"Deposit {tx_hash} is already waiting for confirmations")
+            return existing
+
+        deposit = DepositTransaction(
+            id=str(uuid.uuid4()),
+            agent_id=agent_id,
+            swap_tx_hash=tx_hash,
+            usdc_amount_in=Decimal("0"),
+            agnt_amount_out=Decimal("0"),
+            exchange_rate=Decimal("0"),
+            min_agnt_amount=min_agnt_amount,
+            status="pending",
+            created_at=datetime.utcnow()
+        )
+        db.add(deposit)
+        await db.commit()
+
+        try:
+            receipt = await chain_service.client.get_transaction_receipt(tx_hash, use_cache=False)
+        except TransactionNotFound:
+            receipt = None
+
+        if not await chain_service.is_confirmed(receipt):
+            # Park it; the confirmation tracker credits it once deep enough
+            logger.info(f"Deposit {tx_hash} not confirmed yet, waiting for confirmations")
+            await self._publish_status(deposit)
+            return deposit
+
+        error = await self.confirm_pending_deposit(db, deposit, receipt)
+        if error:
+            raise ValueError(error)
+        return deposit
+
+    async def confirm_pending_deposit(
+        self,
+        db: AsyncSession,
+        deposit: DepositTransaction,
+        receipt: Dict[str, Any]
+    ) -> Optional[str]:
+        """
+        Verify a pending deposit whose transaction is confirmed, then credit or fail it.
+
+        Accepts a USDC transfer (credited at USDC_TO_AGNT_RATE) or an AGNT
+        transfer (credited 1:1) to the platform wallet. Commits, and
+        publishes deposit_credited or deposit_failed.
+
+        Args:
+            db: Database session
+            deposit: Deposit in pending status
+            receipt: Its receipt, freshly fetched and at least MIN_CONFIRMATIONS deep
+
+        Returns:
+            None if credited, else why the deposit failed
+
+        Raises:
+            ValueError: If a concurrent request already moved the deposit out of pending
+        """
+        details = None
+        error = None
+        try:
+            details = await uniswap_service.verify_deposit(
+                tx_hash=deposit.swap_tx_hash,
+                platform_address=settings.PLATFORM_WALLET_ADDRESS,
+                receipt=receipt
+            )
+            if deposit.min_agnt_amount is not None and details['agnt_credit'] < deposit.min_agnt_amount:
+                error = (
+                    f"AGNT credit {details['agnt_credit']} below expected minimum {deposit.min_agnt_amount}"
+                )
+        except ValueError as e:
+            error = f"Deposit verification failed: {str(e)}"
+
+        values: Dict[str, Any] = {"status": "failed" if error else "verified"}
+        if details is not None:
+            values.update(
+                usdc_amount_in=details['usdc_amount'],
+                agnt_amount_out=details['agnt_credit'],
+                exchange_rate=details['exchange_rate'],
+            )
+        if error is None:
+            values["verified_at"] = datetime.utcnow()
+        await self._transition(db, deposit, values)
+
+        if error is None:
+            # Deposits count as "earned"
+            await update_balance(
+                db, deposit.agent_id, details['agnt_credit'],
+                counter_account=PLATFORM_DEPOSITS,
+                entry_type="deposit",
+                reference_id=deposit.id,
+                commit=False,
+            )
+        await db.commit()
+
+        if error:
+            logger.warning(f"Deposit verification failed for {deposit.swap_tx_hash}: {error}")
+        else:
+            logger.info(
+                f"Deposit verified: {details['usdc_amount']} USDC → {details['agnt_credit']} AGNT "
+                f"(rate: {details['exchange_rate']} AGNT/USDC) for agent {deposit.agent_id}"
+            )
+        await self._publish_status(deposit)
+        return error
+
+    async def expire_pending_deposit(self, db: AsyncSession, deposit: DepositTransaction) -> None:
+        """
+        Fail a pending deposit whose transaction was not mined within PAYMENT_VERIFICATION_TIMEOUT.
+
+        Raises:
+            ValueError: If a concurrent request already moved the deposit out of pending
+        """
+        await self._transition(db, deposit, {"status": "failed"})
+        await db.commit()
+        logger.warning(f"Deposit {deposit.swap_tx_hash} expired waiting to be mined")
+        await self._publish_status(deposit)
+
+    async def _transition(self, db: AsyncSession, deposit: DepositTransaction, values: Dict[str, Any]) -> None:
+        """
+        Update a deposit only if it is still pending.
+
+        Raises:
+            ValueError: If a concurrent request changed the status first
+        """
+        result = await db.execute(
+            update(DepositTransaction)
+            .where(DepositTransaction.id == deposit.id, DepositTransaction.status == "pending")
+            .values(**values)
+        )
+        if result.rowcount != 1:
+            raise ValueError(f"Transaction {deposit.swap_tx_hash} is already being verified")
+
+    async def _publish_status(self, deposit: DepositTransaction) -> None:
+        """Tell the depositing agent the deposit is pending, credited or failed."""
+        event_type = {
+            "pending": "deposit_pending",
+            "verified": "deposit_credited",
+            "failed": "deposit_failed",
+        }[deposit.status]
+        await event_bus.publish(event_type, {
+            "deposit_id": deposit.id,
+            "tx_hash": deposit.swap_tx_hash,
+            "agent_id": deposit.agent_id,
+            "agnt_amount": str(deposit.agnt_amount_out),
+            "status": deposit.status,
+        })
+
+
+# Singleton instance
+deposit_service = DepositService()
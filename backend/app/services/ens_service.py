@@ -6,6 +6,7 @@ from typing import Optional
 from web3 import Web3
 
 from app.config import settings
+from app.services.chain_client import get_chain_client
 
 logger = logging.getLogger(__name__)
 
@@ -57,15 +58,13 @@ class ENSService:
             return
 
         try:
-            self.web3 = Web3(Web3.HTTPProvider(settings.ETH_SEPOLIA_RPC_URL))
+            # No connectivity probe here: it would block at import. An
+            # unreachable RPC makes each lookup fail and return None instead.
+            self.client = get_chain_client(settings.ETH_SEPOLIA_RPC_URL)
 
-            if not self.web3.is_connected():
-                logger.warning("ENS integration disabled: cannot connect to Ethereum Sepolia RPC")
-                return
-
-            self.registry = self.web3.eth.contract(
-                address=Web3.to_checksum_address(settings.ENS_REGISTRY_ADDRESS),
-                abi=ENS_REGISTRY_ABI
+            self.registry = self.client.contract(
+                Web3.to_checksum_address(settings.ENS_REGISTRY_ADDRESS),
+                ENS_REGISTRY_ABI
             )
 
             self.enabled = True
@@ -105,19 +104,16 @@ class ENSService:
             node = self._namehash(name)
 
             # Get the resolver for this name
-            resolver_addr = self.registry.functions.resolver(node).call()
+            resolver_addr = await self.client.eth_call(self.registry.functions.resolver(node))
 
             if resolver_addr == "0x0000000000000000000000000000000000000000":
                 logger.debug(f"No resolver set for {name}")
                 return None
 
             # Query the resolver for the address
-            resolver = self.web3.eth.contract(
-                address=resolver_addr,
-                abi=ENS_RESOLVER_ABI
-            )
+            resolver = self.client.contract(resolver_addr, ENS_RESOLVER_ABI)
 
-            addr = resolver.functions.addr(node).call()
+            addr = await self.client.eth_call(resolver.functions.addr(node))
 
             if addr == "0x0000000000000000000000000000000000000000":
                 logger.debug(f"No address record for {name}")
@@ -152,18 +148,15 @@ class ENSService:
             node = self._namehash(reverse_name)
 
             # Get the resolver for the reverse record
-            resolver_addr = self.registry.functions.resolver(node).call()
+            resolver_addr = await self.client.eth_call(self.registry.functions.resolver(node))
 
             if resolver_addr == "0x0000000000000000000000000000000000000000":
                 logger.debug(f"No reverse resolver for {address}")
                 return None
 
-            resolver = self.web3.eth.contract(
-                address=resolver_addr,
-                abi=ENS_RESOLVER_ABI
-            )
+            resolver = self.client.contract(resolver_addr, ENS_RESOLVER_ABI)
 
-            name = resolver.functions.name(node).call()
+            name = await self.client.eth_call(resolver.functions.name(node))
 
             if not name:
                 return None
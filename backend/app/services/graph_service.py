@@ -0,0 +1,622 @@
+"""In-memory collaboration graph with versioned, incremental updates."""
+
+import asyncio
+import heapq
+import logging
+import uuid
+from collections import deque
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.core.events import event_bus
+from app.database import AsyncSessionLocal
+from app.models.agent import Agent
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+EdgeKey = Tuple[str, str]
+
+CENTRALITY_METRICS = ("pagerank", "degree")
+
+
+def compute_pagerank(
+    nodes: List[str],
+    edges: Dict[EdgeKey, int],
+    damping: float = 0.85,
+    max_iterations: int = 100,
+    tolerance: float = 1.0e-6,
+) -> Dict[str, float]:
+    """
+    Weighted PageRank by power iteration.
+
+    Rank flows from clients to the workers they hire, weighted by the
+    number of completed jobs, so workers hired repeatedly by well-ranked
+    clients score highest. Dangling nodes spread their rank uniformly.
+
+    Args:
+        nodes: Node ids
+        edges: (client_id, worker_id) -> weight
+        damping: Damping factor
+        max_iterations: Iteration cap
+        tolerance: L1 convergence threshold
+
+    Returns:
+        Node id -> score (scores sum to 1)
+    """
+    n = len(nodes)
+    if n == 0:
+        return {}
+
+    out_weight: Dict[str, float] = {}
+    incoming: Dict[str, List[Tuple[str, float]]] = {}
+    for (source, target), weight in edges.items():
+        out_weight[source] = out_weight.get(source, 0.0) + weight
+        incoming.setdefault(target, []).append((source, float(weight)))
+
+    rank = {node: 1.0 / n for node in nodes}
+    for _ in range(max_iterations):
+        dangling = sum(rank[node] for node in nodes if node not in out_weight)
+        base = (1.0 - damping) / n + damping * dangling / n
+
+        new_rank = {}
+        for node in nodes:
+            score = base
+            for source, weight in incoming.get(node, ()):
+                score += damping * rank[source] * weight / out_weight[source]
+            new_rank[node] = score
+
+        delta = sum(abs(new_rank[node] - rank[node]) for node in nodes)
+        rank = new_rank
+        if delta < tolerance:
+            break
+
+    return rank
+
+
+def compute_degree(nodes: List[str], edges: Dict[EdgeKey, int]) -> Dict[str, float]:
+    """
+    Degree centrality: distinct trading partners over (n - 1).
+
+    Args:
+        nodes: Node ids
+        edges: (client_id, worker_id) -> weight
+
+    Returns:
+        Node id -> score in [0, 1]
+    """
+    partners: Dict[str, Set[str]] = {node: set() for node in nodes}
+    for source, target in edges:
+        if source != target:
+            partners.setdefault(source, set()).add(target)
+            partners.setdefault(target, set()).add(source)
+
+    scale = 1.0 / (len(nodes) - 1) if len(nodes) > 1 else 0.0
+    return {node: len(partners.get(node, ())) * scale for node in nodes}
+
+
+class CollaborationGraph:
+    """
+    Agents (nodes) and completed-job relationships (client -> worker edges).
+
+    The graph carries a version that increases on every change, and every
+    node and edge remembers the version it last changed at, so callers can
+    use the version as an ETag and fetch only what changed since a version
+    they already have. Versions only mean something within one process, so
+    the token handed out ("<epoch>-<version>") is prefixed with an epoch
+    picked at construction; a token from another worker or an earlier boot
+    gets the full graph with reset set instead of a delta. job_completed, agent_registered and
+    reputation_updated events update it in place; periodic reconciliation
+    against the database fixes drift and only bumps entries that differ.
+
+    An adjacency index backs neighbourhood and partner queries, and
+    centrality scores are recomputed in the background whenever the
+    version moves, so queries never scan the whole graph.
+    """
+
+    def __init__(
+        self,
+        reconcile_interval_seconds: float,
+        analytics_interval_seconds: float = 30.0,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+    ):
+        """Initialize an empty, unloaded graph."""
+        self.reconcile_interval_seconds = reconcile_interval_seconds
+        self.analytics_interval_seconds = analytics_interval_seconds
+        self._session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+        self._analytics_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._analytics_lock = asyncio.Lock()
+
+        self.version = 0
+        # Distinguishes version tokens of this process from other workers and boots
+        self.epoch = uuid.uuid4().hex[:12]
+        self.loaded = False
+        self._nodes: Dict[str, Dict[str, Any]] = {}
+        self._node_versions: Dict[str, int] = {}
+        # (client_id, worker_id) -> [jobs_count, total_value]
+        self._edges: Dict[EdgeKey, List[Any]] = {}
+        self._edge_versions: Dict[EdgeKey, int] = {}
+        # Adjacency index: client -> workers hired, worker -> clients served
+        self._out: Dict[str, Set[str]] = {}
+        self._in: Dict[str, Set[str]] = {}
+        # Removed entries -> version they were removed at
+        self._removed_nodes: Dict[str, int] = {}
+        self._removed_edges: Dict[EdgeKey, int] = {}
+        # metric -> (graph version, node id -> score)
+        self._centrality: Dict[str, Tuple[int, Dict[str, float]]] = {}
+        self.analytics_runs = 0
+
+    @property
+    def etag(self) -> str:
+        """Weak ETag identifying the current graph epoch and version."""
+        return f'W/"graph-{self.version_token}"'
+
+    @property
+    def version_token(self) -> str:
+        """Version token returned to clients and accepted by delta()."""
+        return self._version_token(self.version)
+
+    def _version_token(self, version: int) -> str:
+        """Prefix a version with this process's epoch."""
+        return f"{self.epoch}-{version}"
+
+    def _parse_version_token(self, token: str) -> Optional[int]:
+        """
+        Return the version in a token issued by this graph.
+
+        Returns:
+            The version, or None if the token is malformed, from another
+            epoch, or ahead of the current version
+        """
+        epoch, _, version = token.rpartition("-")
+        if epoch != self.epoch or not version.isdigit():
+            return None
+        version_number = int(version)
+        if version_number > self.version:
+            return None
+        return version_number
+
+    def on_event(self, event: Dict[str, Any]) -> None:
+        """
+        Apply a lifecycle event to the graph (event bus listener).
+
+        Args:
+            event: Event dictionary with type and data
+        """
+        if not self.loaded:
+            return
+
+        event_type = event["type"]
+        data = event.get("data") or {}
+
+        if event_type == "agent_registered":
+            agent_id = str(data["agent_id"])
+            self._set_node(agent_id, {
+                "id": agent_id,
+                "name": data.get("name"),
+                "type": "agent",
+                "reputation": 0.0,
+                "jobs": 0,
+            })
+        elif event_type == "reputation_updated":
+            agent_id = str(data["agent_id"])
+            node = self._nodes.get(agent_id)
+            if node is not None:
+                self._set_node(agent_id, {**node, "reputation": float(data["new_score"])})
+        elif event_type == "job_completed":
+            client_id = str(data["client_id"])
+            worker_id = str(data["worker_id"])
+            price = Decimal(str(data.get("price_usd") or "0"))
+
+            jobs_count, total_value = self._edges.get((client_id, worker_id), (0, Decimal("0")))
+            self._set_edge((client_id, worker_id), [jobs_count + 1, total_value + price])
+
+            for agent_id in {client_id, worker_id}:
+                node = self._nodes.get(agent_id)
+                if node is not None:
+                    bump = 2 if client_id == worker_id else 1
+                    self._set_node(agent_id, {**node, "jobs": node["jobs"] + bump})
+
+    async def ensure_loaded(self, db: Optional[AsyncSession] = None) -> None:
+        """Load the graph from the database if it has never been loaded."""
+        if not self.loaded:
+            await self.reconcile(db)
+
+    async def reconcile(self, db: Optional[AsyncSession] = None) -> None:
+        """
+        Rebuild the graph from the database, versioning only what changed.
+
+        Args:
+            db: Session to use; a new one is opened when omitted
+        """
+        async with self._lock:
+            if db is not None:
+                nodes, edges = await self._query(db)
+            else:
+                async with self._session_factory() as session:
+                    nodes, edges = await self._query(session)
+
+            for agent_id, node in nodes.items():
+                if self._nodes.get(agent_id) != node:
+                    self._set_node(agent_id, node)
+            for agent_id in set(self._nodes) - set(nodes):
+                self._remove_node(agent_id)
+
+            for key, edge in edges.items():
+                if self._edges.get(key) != edge:
+                    self._set_edge(key, edge)
+            for key in set(self._edges) - set(edges):
+                self._remove_edge(key)
+
+            self.loaded = True
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the full graph."""
+        return {
+            "version": self.version_token,
+            "nodes": list(self._nodes.values()),
+            "edges": [self._render_edge(key) for key in self._edges],
+        }
+
+    def delta(self, since_version: str) -> Dict[str, Any]:
+        """
+        Return nodes and edges changed or removed after since_version.
+
+        A token this graph did not issue (another worker, an earlier boot,
+        or a version it has not reached) cannot be diffed against, so the
+        full snapshot is returned with reset set and the client should
+        replace its copy.
+
+        Args:
+            since_version: Version token the client already has
+
+        Returns:
+            Changed nodes/edges and ids of removed ones, or the full graph
+            with reset set
+        """
+        base_version = self._parse_version_token(since_version)
+        if base_version is None:
+            return {**self.snapshot(), "since_version": since_version, "reset": True}
+
+        return {
+            "version": self.version_token,
+            "since_version": since_version,
+            "reset": False,
+            "nodes": [
+                self._nodes[agent_id]
+                for agent_id, version in self._node_versions.items()
+                if version > base_version
+            ],
+            "edges": [
+                self._render_edge(key)
+                for key, version in self._edge_versions.items()
+                if version > base_version
+            ],
+            "removed_nodes": [
+                agent_id for agent_id, version in self._removed_nodes.items()
+                if version > base_version
+            ],
+            "removed_edges": [
+                {"source": source, "target": target}
+                for (source, target), version in self._removed_edges.items()
+                if version > base_version
+            ],
+        }
+
+    def has_node(self, agent_id: str) -> bool:
+        """Return whether the agent is in the graph."""
+        return str(agent_id) in self._nodes
+
+    def neighbourhood(self, agent_id: str, hops: int, max_nodes: int) -> Dict[str, Any]:
+        """
+        Extract the subgraph within a number of hops of an agent.
+
+        Edges are followed in both directions. Breadth-first search stops
+        once max_nodes agents have been collected.
+
+        Args:
+            agent_id: Centre agent UUID
+            hops: Maximum distance from the centre
+            max_nodes: Cap on the number of nodes returned
+
+        Returns:
+            Nodes (with their hop distance) and the edges between them
+        """
+        agent_id = str(agent_id)
+        distance = {agent_id: 0}
+        queue = deque([agent_id])
+        truncated = False
+
+        while queue:
+            current = queue.popleft()
+            if distance[current] >= hops:
+                continue
+            for neighbour in self._out.get(current, set()) | self._in.get(current, set()):
+                if neighbour in distance:
+                    continue
+                if len(distance) >= max_nodes:
+                    truncated = True
+                    queue.clear()
+                    break
+                distance[neighbour] = distance[current] + 1
+                queue.append(neighbour)
+
+        edges = [
+            self._render_edge((source, target))
+            for source in distance
+            for target in self._out.get(source, ())
+            if target in distance
+        ]
+
+        return {
+            "version": self.version_token,
+            "agent_id": agent_id,
+            "hops": hops,
+            "truncated": truncated,
+            "nodes": [
+                {**self._nodes.get(node_id, {"id": node_id}), "distance": hops_away}
+                for node_id, hops_away in distance.items()
+            ],
+            "edges": edges,
+        }
+
+    def top_partners(self, agent_id: str, k: int) -> List[Dict[str, Any]]:
+        """
+        Rank an agent's trading partners by completed-job volume.
+
+        Volume in both directions (hiring and being hired) is combined.
+
+        Args:
+            agent_id: Agent UUID
+            k: Number of partners to return
+
+        Returns:
+            Up to k partners, highest total_value first
+        """
+        agent_id = str(agent_id)
+        totals: Dict[str, List[Any]] = {}
+        for partner in self._out.get(agent_id, ()):
+            jobs_count, total_value = self._edges[(agent_id, partner)]
+            entry = totals.setdefault(partner, [0, Decimal("0"), 0, 0])
+            entry[0] += jobs_count
+            entry[1] += total_value
+            entry[2] += jobs_count
+        for partner in self._in.get(agent_id, ()):
+            jobs_count, total_value = self._edges[(partner, agent_id)]
+            entry = totals.setdefault(partner, [0, Decimal("0"), 0, 0])
+            entry[0] += jobs_count
+            entry[1] += total_value
+            entry[3] += jobs_count
+
+        top = heapq.nlargest(k, totals.items(), key=lambda item: (item[1][1], item[1][0]))
+        return [
+            {
+                "agent_id": partner,
+                "name": self._nodes.get(partner, {}).get("name"),
+                "jobs_count": jobs_count,
+                "total_value": float(total_value),
+                "jobs_hired": hired,
+                "jobs_worked": worked,
+            }
+            for partner, (jobs_count, total_value, hired, worked) in top
+        ]
+
+    async def centrality(self, metric: str, limit: int) -> Dict[str, Any]:
+        """
+        Return the highest-ranked agents for a centrality metric.
+
+        Served from the background-computed scores; only the very first
+        call computes them inline.
+
+        Args:
+            metric: "pagerank" or "degree"
+            limit: Number of agents to return
+
+        Returns:
+            Ranked agents and the graph version the scores were computed at
+
+        Raises:
+            ValueError: If the metric is unknown
+        """
+        if metric not in CENTRALITY_METRICS:
+            raise ValueError(f"Unknown centrality metric: {metric}")
+
+        if metric not in self._centrality:
+            await self.refresh_analytics()
+
+        version, scores = self._centrality[metric]
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return {
+            "metric": metric,
+            "version": self._version_token(version),
+            "agents": [
+                {
+                    "agent_id": agent_id,
+                    "name": self._nodes.get(agent_id, {}).get("name"),
+                    "score": round(score, 6),
+                }
+                for agent_id, score in top
+            ],
+        }
+
+    async def refresh_analytics(self) -> None:
+        """Recompute centrality scores if the graph changed since last time."""
+        async with self._analytics_lock:
+            version = self.version
+            if all(self._centrality.get(metric, (None,))[0] == version for metric in CENTRALITY_METRICS):
+                return
+
+            nodes = list(self._nodes)
+            edges = {key: edge[0] for key, edge in self._edges.items()}
+
+            # Plain CPU work on a copy; keep it off the event loop
+            pagerank = await asyncio.to_thread(compute_pagerank, nodes, edges)
+            degree = compute_degree(nodes, edges)
+
+            self._centrality["pagerank"] = (version, pagerank)
+            self._centrality["degree"] = (version, degree)
+            self.analytics_runs += 1
+
+    async def start(self) -> None:
+        """Subscribe to lifecycle events and start the background loops."""
+        event_bus.add_listener(self.on_event)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        if self._analytics_task is None or self._analytics_task.done():
+            self._analytics_task = asyncio.create_task(self._run_analytics())
+
+    async def stop(self) -> None:
+        """Stop the background loops and unsubscribe."""
+        event_bus.remove_listener(self.on_event)
+        for task in (self._task, self._analytics_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._analytics_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return graph size and version for /metrics."""
+        return {
+            "epoch": self.epoch,
+            "version": self.version,
+            "nodes": len(self._nodes),
+            "edges": len(self._edges),
+            "loaded": self.loaded,
+            "analytics_runs": self.analytics_runs,
+            "centrality_version": self._centrality.get("pagerank", (None,))[0],
+        }
+
+    async def _run(self) -> None:
+        """Reconcile immediately, then every interval."""
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Failed to reconcile collaboration graph: {e}", exc_info=True)
+            await asyncio.sleep(self.reconcile_interval_seconds)
+
+    async def _run_analytics(self) -> None:
+        """Recompute centrality every interval when the graph has changed."""
+        while True:
+            await asyncio.sleep(self.analytics_interval_seconds)
+            if not self.loaded:
+                continue
+            try:
+                await self.refresh_analytics()
+            except Exception as e:
+                logger.error(f"Failed to compute graph centrality: {e}", exc_info=True)
+
+    async def _query(self, db: AsyncSession) -> Tuple[Dict[str, Dict[str, Any]], Dict[EdgeKey, List[Any]]]:
+        """Read nodes and aggregated edges from the database."""
+        agents = (await db.execute(
+            select(
+                Agent.id,
+                Agent.name,
+                Agent.reputation_score,
+                Agent.jobs_completed,
+                Agent.jobs_hired,
+            )
+        )).all()
+
+        nodes = {
+            str(agent.id): {
+                "id": str(agent.id),
+                "name": agent.name,
+                "type": "agent",
+                "reputation": float(agent.reputation_score),
+                "jobs": agent.jobs_completed + agent.jobs_hired,
+            }
+            for agent in agents
+        }
+
+        # Group by client-worker pairs and count jobs + total value
+        rows = (await db.execute(
+            select(
+                Job.client_agent_id,
+                Job.worker_agent_id,
+                func.count(Job.id).label('jobs_count'),
+                func.sum(Job.price_usd).label('total_value')
+            ).where(
+                Job.status == 'completed'
+            ).group_by(
+                Job.client_agent_id,
+                Job.worker_agent_id
+            )
+        )).all()
+
+        edges = {
+            (str(row.client_agent_id), str(row.worker_agent_id)): [
+                row.jobs_count,
+                Decimal(str(row.total_value or 0)),
+            ]
+            for row in rows
+        }
+        return nodes, edges
+
+    def _set_node(self, agent_id: str, node: Dict[str, Any]) -> None:
+        """Store a node and stamp it with a new version."""
+        self.version += 1
+        self._nodes[agent_id] = node
+        self._node_versions[agent_id] = self.version
+        self._removed_nodes.pop(agent_id, None)
+
+    def _remove_node(self, agent_id: str) -> None:
+        """Remove a node, leaving a tombstone for deltas."""
+        self.version += 1
+        self._nodes.pop(agent_id, None)
+        self._node_versions.pop(agent_id, None)
+        self._removed_nodes[agent_id] = self.version
+
+    def _set_edge(self, key: EdgeKey, edge: List[Any]) -> None:
+        """Store an edge and stamp it with a new version."""
+        self.version += 1
+        self._edges[key] = edge
+        self._edge_versions[key] = self.version
+        self._removed_edges.pop(key, None)
+        self._out.setdefault(key[0], set()).add(key[1])
+        self._in.setdefault(key[1], set()).add(key[0])
+
+    def _remove_edge(self, key: EdgeKey) -> None:
+        """Remove an edge, leaving a tombstone for deltas."""
+        self.version += 1
+        self._edges.pop(key, None)
+        self._edge_versions.pop(key, None)
+        self._removed_edges[key] = self.version
+        self._discard_adjacent(self._out, key[0], key[1])
+        self._discard_adjacent(self._in, key[1], key[0])
+
+    @staticmethod
+    def _discard_adjacent(index: Dict[str, Set[str]], agent_id: str, neighbour: str) -> None:
+        """Drop one adjacency entry, removing empty sets."""
+        neighbours = index.get(agent_id)
+        if neighbours is not None:
+            neighbours.discard(neighbour)
+            if not neighbours:
+                del index[agent_id]
+
+    def _render_edge(self, key: EdgeKey) -> Dict[str, Any]:
+        """Serialize an edge for the API."""
+        jobs_count, total_value = self._edges[key]
+        return {
+            "source": key[0],
+            "target": key[1],
+            "jobs_count": jobs_count,
+            "total_value": float(total_value),
+        }
+
+
+# Singleton instance
+collaboration_graph = CollaborationGraph(
+    reconcile_interval_seconds=settings.GRAPH_RECONCILE_INTERVAL_SECONDS,
+    analytics_interval_seconds=settings.GRAPH_ANALYTICS_INTERVAL_SECONDS,
+)
@@ -0,0 +1,120 @@
+"""Per-worker long-poll queue for claiming pending jobs."""
+
+import asyncio
+from typing import Any, Dict, Optional, Set
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.events import event_bus
+from app.models.job import Job
+from app.services.job_service import claim_next_job
+
+
+class WorkerJobQueue:
+    """
+    Long-poll waiters for workers waiting on their next job.
+
+    A waiter first tries to claim a pending job; if there is none, it
+    releases its database connection and sleeps until a job_created event
+    for that worker arrives from the event bus (which spans processes with
+    the postgres backend), then claims again. A periodic re-check bounds
+    the delay if a wakeup is missed, e.g. jobs created by another process
+    on the in-memory event bus.
+    """
+
+    def __init__(self, max_wait_seconds: float, recheck_interval_seconds: float):
+        """Initialize with no waiters; call start() to receive wakeups."""
+        self.max_wait_seconds = max_wait_seconds
+        self.recheck_interval_seconds = recheck_interval_seconds
+        self._waiters: Dict[str, Set[asyncio.Event]] = {}
+        self._stopped = False
+
+        self.claims = 0
+        self.timeouts = 0
+        self.wakeups = 0
+
+    def on_event(self, event: Dict[str, Any]) -> None:
+        """
+        Wake the waiters of the worker a new job was assigned to (event bus listener).
+
+        Args:
+            event: Event dictionary with type and data
+        """
+        if event["type"] != "job_created":
+            return
+        worker_id = (event.get("data") or {}).get("worker_id")
+        for waiter in self._waiters.get(str(worker_id), ()):
+            waiter.set()
+            self.wakeups += 1
+
+    async def start(self) -> None:
+        """Subscribe to job_created events."""
+        self._stopped = False
+        event_bus.add_listener(self.on_event)
+
+    async def stop(self) -> None:
+        """Unsubscribe and wake every waiter so it can return."""
+        self._stopped = True
+        event_bus.remove_listener(self.on_event)
+        for waiters in self._waiters.values():
+            for waiter in waiters:
+                waiter.set()
+
+    async def claim(self, db: AsyncSession, worker_agent_id: str, wait: float) -> Optional[Job]:
+        """
+        Claim the worker's next pending job, waiting up to wait seconds for one.
+
+        Args:
+            db: Database session
+            worker_agent_id: Worker agent UUID
+            wait: Seconds to wait when nothing is pending (capped at max_wait_seconds)
+
+        Returns:
+            Job moved to in_progress, or None on timeout
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max(0.0, min(wait, self.max_wait_seconds))
+        worker_agent_id = str(worker_agent_id)
+
+        while True:
+            # Register before looking so a job created in between still wakes us
+            waiter = asyncio.Event()
+            self._waiters.setdefault(worker_agent_id, set()).add(waiter)
+            try:
+                job = await claim_next_job(db, worker_agent_id)
+                if job is not None:
+                    self.claims += 1
+                    return job
+
+                remaining = deadline - loop.time()
+                if remaining <= 0 or self._stopped:
+                    self.timeouts += 1
+                    return None
+
+                try:
+                    await asyncio.wait_for(waiter.wait(), min(remaining, self.recheck_interval_seconds))
+                except asyncio.TimeoutError:
+                    pass
+            finally:
+                waiters = self._waiters.get(worker_agent_id)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self._waiters[worker_agent_id]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue counters for /metrics."""
+        return {
+            "waiting": sum(len(waiters) for waiters in self._waiters.values()),
+            "waiting_workers": len(self._waiters),
+            "claims": self.claims,
+            "timeouts": self.timeouts,
+            "wakeups": self.wakeups,
+        }
+
+
+worker_job_queue = WorkerJobQueue(
+    max_wait_seconds=settings.JOB_QUEUE_MAX_WAIT_SECONDS,
+    recheck_interval_seconds=settings.JOB_QUEUE_RECHECK_SECONDS,
+)
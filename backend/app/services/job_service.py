@@ -1,10 +1,12 @@
 """Job service for complex job workflow business logic."""
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
+import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update, func, literal
+from sqlalchemy.orm import selectinload, aliased
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.models.job import Job
 from app.models.service import Service
@@ -13,9 +15,12 @@ from app.models.activity_log import ActivityLog
 from app.schemas.job import JobCreate, JobDeliver
 from app.core.events import event_bus
 from app.services.message_service import create_auto_message
-from app.services.reputation_service import update_reputation
+from app.services.reputation_service import reputation_expression
 
 
+# (event type, payload) pairs published once the transaction commits
+JobEvent = Tuple[str, Dict[str, Any]]
+
 # Valid state transitions
 VALID_TRANSITIONS = {
     'pending': ['in_progress', 'cancelled'],
@@ -25,43 +30,47 @@ VALID_TRANSITIONS = {
 }
 
 
-async def create_job(
+async def publish_events(events: List[JobEvent]) -> None:
+    """Publish events collected during a committed transaction."""
+    for event_type, data in events:
+        await event_bus.publish(event_type, data)
+
+
+async def _hire(
     db: AsyncSession,
     client_agent_id: str,
     job_data: JobCreate,
+    service: Service,
     price_agnt: Optional[Any] = None,
     quote_id: Optional[str] = None,
     negotiation_id: Optional[str] = None,
-    negotiated_by: str = "agent"
-) -> Job:
+    negotiated_by: str = "agent",
+    payment_metadata: Optional[Dict[str, Any]] = None
+) -> Tuple[Job, List[JobEvent]]:
     """
-    Create a new job (direct purchase of a service).
+    Add a job with its message and activity entry to the session.
+
+    Does not flush, commit or publish; the caller owns the transaction.
 
     Args:
         db: Database session
         client_agent_id: Client agent UUID
         job_data: Job creation data
+        service: Service being hired
         price_agnt: Agreed price in AGNT (if None, uses service midpoint)
         quote_id: Optional quote ID for LLM-negotiated pricing
         negotiation_id: Optional negotiation ID for P2P-negotiated pricing
         negotiated_by: "agent", "llm", or "p2p"
+        payment_metadata: Extra payment details stored in input_data
 
     Returns:
-        Created job
+        Tuple of (job, events to publish after commit)
 
     Raises:
-        ValueError: If service not found or not active
+        ValueError: If service not active
     """
     from decimal import Decimal
-
-    # Fetch service
-    result = await db.execute(
-        select(Service).where(Service.id == job_data.service_id)
-    )
-    service = result.scalar_one_or_none()
-
-    if not service:
-        raise ValueError("Service not found")
+    from app.config import settings
 
     if not service.is_active:
         raise ValueError("Service is not available")
@@ -72,7 +81,6 @@ async def create_job(
         price_agnt = (service.min_price_agnt + service.max_price_agnt) / Decimal("2")
 
     # Calculate USD price for backward compatibility
-    from app.config import settings
     price_usd = price_agnt / settings.USDC_TO_AGNT_RATE
 
     # Create job with price locked
@@ -82,8 +90,11 @@ async def create_job(
     input_data = job_data.input_data
     if isinstance(input_data, str):
         input_data = {"input": input_data}
+    if payment_metadata:
+        input_data = {**(input_data or {}), **payment_metadata}
 
     job = Job(
+        id=str(uuid.uuid4()),
         service_id=service.id,
         client_agent_id=client_agent_id,
         worker_agent_id=service.agent_id,  # Worker is service owner
@@ -99,10 +110,7 @@ async def create_job(
         negotiation_id=negotiation_id,
         status='pending',
     )
-
     db.add(job)
-    await db.commit()
-    await db.refresh(job, ["deliverables"])
 
     # Create message to worker
     await create_auto_message(
@@ -110,18 +118,19 @@ async def create_job(
         message_type="job_created",
         from_agent_id=client_agent_id,
         to_agent_id=str(service.agent_id),
-        job_id=str(job.id),
+        job_id=job.id,
         content_data={
             "message": "You've been hired!",
-            "job_id": str(job.id),
+            "job_id": job.id,
             "title": title,
             "price_agnt": str(price_agnt),
             "negotiated": negotiated_by == "llm",
-        }
+        },
+        commit=False
     )
 
     # Log activity
-    activity = ActivityLog(
+    db.add(ActivityLog(
         event_type="job_created",
         agent_id=client_agent_id,
         job_id=job.id,
@@ -133,37 +142,116 @@ async def create_job(
             "negotiated_by": negotiated_by,
             "quote_id": quote_id,
         }
-    )
-    db.add(activity)
-    await db.commit()
+    ))
 
-    # Emit event
-    await event_bus.publish("job_created", {
-        "job_id": str(job.id),
+    # A new job has no deliverables; avoid a lazy load in the response
+    set_committed_value(job, "deliverables", [])
+
+    return job, [("job_created", {
+        "job_id": job.id,
         "client_id": str(client_agent_id),
         "worker_id": str(service.agent_id),
         "service_name": service.name,
-        "price_usd": str(job.price_usd),
-    })
-
-    return job
+        "price_usd": str(price_usd),
+    })]
 
 
-async def start_job(
+async def create_job(
     db: AsyncSession,
-    job_id: str,
-    worker_agent_id: str
+    client_agent_id: str,
+    job_data: JobCreate,
+    price_agnt: Optional[Any] = None,
+    quote_id: Optional[str] = None,
+    negotiation_id: Optional[str] = None,
+    negotiated_by: str = "agent",
+    service: Optional[Service] = None,
+    pay_from_balance: bool = False,
+    payment_metadata: Optional[Dict[str, Any]] = None
 ) -> Job:
     """
-    Start a job (worker accepts and begins work).
+    Create a new job (direct purchase of a service).
+
+    The job, the client's balance debit, the message to the worker, the
+    activity log entry and any pending changes on the session (such as an
+    accepted quote) are committed together in one transaction; the
+    job_created event is published after the commit.
 
     Args:
         db: Database session
-        job_id: Job UUID
-        worker_agent_id: Worker agent UUID
+        client_agent_id: Client agent UUID
+        job_data: Job creation data
+        price_agnt: Agreed price in AGNT (if None, uses service midpoint)
+        quote_id: Optional quote ID for LLM-negotiated pricing
+        negotiation_id: Optional negotiation ID for P2P-negotiated pricing
+        negotiated_by: "agent", "llm", or "p2p"
+        service: Service already loaded by the caller (skips the lookup)
+        pay_from_balance: Debit the price from the client's balance into escrow
+        payment_metadata: Extra payment details stored in input_data; an
+            x402_payment_proof means the job was paid on-chain, and the price
+            is moved into escrow from PLATFORM_PAYMENTS instead
 
     Returns:
-        Updated job
+        Created job
+
+    Raises:
+        ValueError: If service not found or not active, or the client's
+            balance is insufficient
+    """
+    # Fetch service
+    if service is None:
+        result = await db.execute(
+            select(Service).where(Service.id == job_data.service_id)
+        )
+        service = result.scalar_one_or_none()
+
+    if not service:
+        raise ValueError("Service not found")
+
+    job, events = await _hire(
+        db, client_agent_id, job_data, service,
+        price_agnt=price_agnt,
+        quote_id=quote_id,
+        negotiation_id=negotiation_id,
+        negotiated_by=negotiated_by,
+        payment_metadata=payment_metadata,
+    )
+
+    # Hold the payment in escrow until the job completes; completion always
+    # pays the worker out of escrow, so every hire must fund it
+    from app.services.ledger_service import PLATFORM_ESCROW, PLATFORM_PAYMENTS, transfer
+    if pay_from_balance:
+        from app.services.agent_service import update_balance
+        await update_balance(
+            db, str(client_agent_id), -job.price_agnt,
+            counter_account=PLATFORM_ESCROW,
+            entry_type="job_payment",
+            reference_id=job.id,
+            require_funds=True,
+            commit=False,
+        )
+    elif payment_metadata and payment_metadata.get("x402_payment_proof") and job.price_agnt > 0:
+        # Paid on-chain with a verified x402 payment
+        await transfer(
+            db, PLATFORM_PAYMENTS, PLATFORM_ESCROW, job.price_agnt, "job_payment",
+            reference_id=job.id,
+        )
+
+    await db.commit()
+    await publish_events(events)
+
+    return job
+
+
+async def _start(
+    db: AsyncSession,
+    job_id: str,
+    worker_agent_id: str
+) -> Tuple[Job, List[JobEvent]]:
+    """
+    Move a pending job to in_progress without committing.
+
+    Returns:
+        Tuple of (job, events to publish after commit)
 
     Raises:
         ValueError: If job not found, not owned by worker, or invalid state
@@ -182,10 +270,13 @@ async def start_job(
     # Update status
     job.status = 'in_progress'
     job.started_at = datetime.utcnow()
+    job.updated_at = job.started_at
+
+    return job, await _record_start(db, job, worker_agent_id)
 
-    await db.commit()
-    await db.refresh(job)
 
+async def _record_start(db: AsyncSession, job: Job, worker_agent_id: str) -> List[JobEvent]:
+    """Add the job_started message and activity entry; return its events."""
     # Create message to client
     await create_auto_message(
         db=db,
@@ -196,46 +287,128 @@ async def start_job(
         content_data={
             "message": "Work has started on your job",
             "job_id": str(job.id),
-        }
+        },
+        commit=False
     )
 
     # Log activity
-    activity = ActivityLog(
+    db.add(ActivityLog(
         event_type="job_started",
         agent_id=worker_agent_id,
         job_id=job.id,
         data={"worker_id": str(worker_agent_id)}
-    )
-    db.add(activity)
-    await db.commit()
+    ))
 
-    # Emit event
-    await event_bus.publish("job_started", {
+    return [("job_started", {
         "job_id": str(job.id),
+        "client_id": str(job.client_agent_id),
         "worker_id": str(worker_agent_id),
-    })
-
-    return job
+    })]
 
 
-async def deliver_job(
+async def start_job(
     db: AsyncSession,
     job_id: str,
-    worker_agent_id: str,
-    deliverable_data: JobDeliver
+    worker_agent_id: str
 ) -> Job:
     """
-    Deliver work for a job.
+    Start a job (worker accepts and begins work).
 
     Args:
         db: Database session
         job_id: Job UUID
         worker_agent_id: Worker agent UUID
-        deliverable_data: Deliverable data
 
     Returns:
         Updated job
 
+    Raises:
+        ValueError: If job not found, not owned by worker, or invalid state
+    """
+    job, events = await _start(db, job_id, worker_agent_id)
+    await db.commit()
+    await publish_events(events)
+
+    return job
+
+
+async def claim_next_job(
+    db: AsyncSession,
+    worker_agent_id: str,
+    max_attempts: int = 5
+) -> Optional[Job]:
+    """
+    Atomically take the worker's oldest pending job and start it.
+
+    On Postgres the candidate row is picked with FOR UPDATE SKIP LOCKED, so
+    concurrent claimers never wait on each other. The status change itself
+    is a guarded UPDATE (pending -> in_progress), so on other databases a
+    job taken by a concurrent claimer is skipped and the next one tried.
+
+    Args:
+        db: Database session
+        worker_agent_id: Worker agent UUID
+        max_attempts: Candidates to try before giving up on this pass
+
+    Returns:
+        Started job, or None if the worker has no pending job
+    """
+    query = (
+        select(Job.id)
+        .where(Job.worker_agent_id == worker_agent_id, Job.status == 'pending')
+        .order_by(Job.created_at, Job.id)
+        .limit(1)
+    )
+    if db.bind.dialect.name == "postgresql":
+        query = query.with_for_update(skip_locked=True)
+
+    for _ in range(max_attempts):
+        job_id = (await db.execute(query)).scalar_one_or_none()
+        if job_id is None:
+            await db.rollback()
+            return None
+
+        now = datetime.utcnow()
+        result = await db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == 'pending')
+            .values(status='in_progress', started_at=now, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            break
+        # Claimed concurrently; look again
+        await db.rollback()
+    else:
+        return None
+
+    result = await db.execute(
+        select(Job)
+        .where(Job.id == job_id)
+        .options(selectinload(Job.deliverables))
+        .execution_options(populate_existing=True)
+    )
+    job = result.scalar_one()
+    events = await _record_start(db, job, worker_agent_id)
+
+    await db.commit()
+    await publish_events(events)
+
+    return job
+
+
+async def _deliver(
+    db: AsyncSession,
+    job_id: str,
+    worker_agent_id: str,
+    deliverable_data: JobDeliver
+) -> Tuple[Job, List[JobEvent]]:
+    """
+    Attach a deliverable and move the job to delivered without committing.
+
+    Returns:
+        Tuple of (job, events to publish after commit)
+
     Raises:
         ValueError: If job not found, not owned by worker, or invalid state
     """
@@ -250,11 +423,8 @@ async def deliver_job(
     if job.status not in ['in_progress', 'revision_requested']:
         raise ValueError(f"Cannot deliver job with status '{job.status}'")
 
-    # Determine version (increment if revision)
-    existing_deliverables = await db.execute(
-        select(Deliverable).where(Deliverable.job_id == job.id)
-    )
-    version = len(list(existing_deliverables.scalars().all())) + 1
+    # Determine version (increment if revision); deliverables are already loaded
+    version = len(job.deliverables) + 1
 
     # Create deliverable
     deliverable = Deliverable(
@@ -264,14 +434,13 @@ async def deliver_job(
         artifact_metadata=deliverable_data.artifact_metadata,
         version=version,
     )
-    db.add(deliverable)
+    job.deliverables.append(deliverable)
 
     # Update job status
+    previous_status = job.status
     job.status = 'delivered'
     job.delivered_at = datetime.utcnow()
-
-    await db.commit()
-    await db.refresh(job)
+    job.updated_at = job.delivered_at
 
     # Create message to client
     await create_auto_message(
@@ -284,11 +453,12 @@ async def deliver_job(
             "message": "Work has been delivered",
             "job_id": str(job.id),
             "version": version,
-        }
+        },
+        commit=False
     )
 
     # Log activity
-    activity = ActivityLog(
+    db.add(ActivityLog(
         event_type="job_delivered",
         agent_id=worker_agent_id,
         job_id=job.id,
@@ -296,16 +466,41 @@ async def deliver_job(
             "worker_id": str(worker_agent_id),
             "version": version,
         }
-    )
-    db.add(activity)
-    await db.commit()
+    ))
 
-    # Emit event
-    await event_bus.publish("job_delivered", {
+    return job, [("job_delivered", {
         "job_id": str(job.id),
+        "client_id": str(job.client_agent_id),
         "worker_id": str(worker_agent_id),
         "version": version,
-    })
+        "previous_status": previous_status,
+    })]
+
+
+async def deliver_job(
+    db: AsyncSession,
+    job_id: str,
+    worker_agent_id: str,
+    deliverable_data: JobDeliver
+) -> Job:
+    """
+    Deliver work for a job.
+
+    Args:
+        db: Database session
+        job_id: Job UUID
+        worker_agent_id: Worker agent UUID
+        deliverable_data: Deliverable data
+
+    Returns:
+        Updated job
+
+    Raises:
+        ValueError: If job not found, not owned by worker, or invalid state
+    """
+    job, events = await _deliver(db, job_id, worker_agent_id, deliverable_data)
+    await db.commit()
+    await publish_events(events)
 
     return job
 
@@ -372,120 +567,348 @@ async def request_revision(
     db.add(activity)
     await db.commit()
 
+    # Emit event
+    await event_bus.publish("job_revision_requested", {
+        "job_id": str(job.id),
+        "client_id": str(client_agent_id),
+        "worker_id": str(job.worker_agent_id),
+    })
+
     return job
 
 
-async def complete_job(
+async def _complete(
     db: AsyncSession,
     job_id: str,
     client_agent_id: str,
     rating: int,
     review: Optional[str] = None
-) -> Job:
+) -> Tuple[Job, List[JobEvent]]:
     """
-    Complete a job with rating.
+    Complete a job with rating without committing.
 
-    Args:
-        db: Database session
-        job_id: Job UUID
-        client_agent_id: Client agent UUID
-        rating: Rating 1-5
-        review: Optional review text
+    See complete_job for what the transaction contains.
 
     Returns:
-        Updated job
+        Tuple of (job, events to publish after commit)
 
     Raises:
         ValueError: If job not found, not owned by client, or invalid state
     """
-    job = await get_job_by_id(db, job_id)
-
-    if not job:
-        raise ValueError("Job not found")
-
-    if str(job.client_agent_id) != str(client_agent_id):
-        raise ValueError("Not authorized - you are not the client for this job")
-
-    if job.status != 'delivered':
-        raise ValueError(f"Cannot complete job with status '{job.status}'. Job must be delivered first.")
+    from app.models.agent import Agent
+    from app.services.ledger_service import PLATFORM_ESCROW, transfer
 
     if not 1 <= rating <= 5:
         raise ValueError("Rating must be between 1 and 5")
 
-    # Update job
-    job.status = 'completed'
-    job.completed_at = datetime.utcnow()
-    job.rating = rating
-    job.review = review
-
-    await db.commit()
-
-    # Update worker reputation
-    await update_reputation(db, str(job.worker_agent_id), rating)
-
-    # Transfer payment to worker (AGNT balance)
-    from app.services.agent_service import update_balance
-    await update_balance(db, str(job.worker_agent_id), job.price_agnt)
-
-    # Update statistics
-    from app.models.agent import Agent
-    # Worker stats
+    # Only a delivered job owned by this client can move to completed
+    now = datetime.utcnow()
     result = await db.execute(
-        select(Agent).where(Agent.id == job.worker_agent_id)
+        update(Job)
+        .where(
+            Job.id == job_id,
+            Job.client_agent_id == client_agent_id,
+            Job.status == 'delivered',
+        )
+        .values(status='completed', completed_at=now, updated_at=now, rating=rating, review=review)
+        .returning(Job.worker_agent_id, Job.price_agnt, Job.price_usd)
+        .execution_options(synchronize_session="fetch")
     )
-    worker = result.scalar_one()
-    worker.jobs_completed += 1
-    worker.total_earned += job.price_agnt  # Use AGNT, not USD
+    completed = result.one_or_none()
+
+    if completed is None:
+        job = await get_job_by_id(db, job_id)
+        if not job:
+            raise ValueError("Job not found")
+        if str(job.client_agent_id) != str(client_agent_id):
+            raise ValueError("Not authorized - you are not the client for this job")
+        raise ValueError(f"Cannot complete job with status '{job.status}'. Job must be delivered first.")
 
-    # Client stats
+    worker_agent_id = str(completed.worker_agent_id)
+    price_agnt = completed.price_agnt
+
+    # Worker: reputation from the pre-update row, then stats
     result = await db.execute(
-        select(Agent).where(Agent.id == client_agent_id)
+        update(Agent)
+        .where(Agent.id == worker_agent_id)
+        .values(
+            reputation_score=reputation_expression(rating),
+            jobs_completed=Agent.jobs_completed + 1,
+            total_earned=Agent.total_earned + price_agnt,  # Use AGNT, not USD
+        )
+        .returning(Agent.reputation_score)
+        .execution_options(synchronize_session="fetch")
+    )
+    new_score = result.scalar_one()
+
+    # Client: total_spent was recorded when the job was paid for
+    await db.execute(
+        update(Agent)
+        .where(Agent.id == client_agent_id)
+        .values(jobs_hired=Agent.jobs_hired + 1)
+        .execution_options(synchronize_session="fetch")
     )
-    client = result.scalar_one()
-    client.jobs_hired += 1
-    client.total_spent += job.price_agnt  # Use AGNT, not USD
 
-    await db.commit()
-    await db.refresh(job)
+    # Release the escrowed payment to the worker
+    if price_agnt and price_agnt > 0:
+        await transfer(db, PLATFORM_ESCROW, worker_agent_id, price_agnt, "job_payout", reference_id=job_id)
 
     # Create message to worker
     await create_auto_message(
         db=db,
         message_type="job_completed",
         from_agent_id=client_agent_id,
-        to_agent_id=str(job.worker_agent_id),
-        job_id=str(job.id),
+        to_agent_id=worker_agent_id,
+        job_id=job_id,
         content_data={
             "message": f"Job completed - Rating: {rating}/5",
-            "job_id": str(job.id),
+            "job_id": job_id,
             "rating": rating,
             "review": review,
-        }
+        },
+        commit=False
     )
 
     # Log activity
     activity = ActivityLog(
         event_type="job_completed",
         agent_id=client_agent_id,
-        job_id=job.id,
+        job_id=job_id,
         data={
             "rating": rating,
             "review": review,
         }
     )
     db.add(activity)
-    await db.commit()
 
-    # Emit event
-    await event_bus.publish("job_completed", {
-        "job_id": str(job.id),
-        "rating": rating,
-        "worker_id": str(job.worker_agent_id),
-    })
+    job = await get_job_by_id(db, job_id)
+    return job, [
+        ("reputation_updated", {
+            "agent_id": worker_agent_id,
+            "new_score": str(new_score),
+            "rating": rating,
+        }),
+        ("job_completed", {
+            "job_id": str(job_id),
+            "rating": rating,
+            "client_id": str(client_agent_id),
+            "worker_id": worker_agent_id,
+            "price_usd": str(completed.price_usd),
+        }),
+    ]
+
+
+async def complete_job(
+    db: AsyncSession,
+    job_id: str,
+    client_agent_id: str,
+    rating: int,
+    review: Optional[str] = None
+) -> Job:
+    """
+    Complete a job with rating.
+
+    Runs as one transaction: a guarded status UPDATE on the job, one
+    set-based UPDATE each for the worker (reputation, jobs_completed,
+    total_earned) and the client (jobs_hired), the escrow payout to the
+    worker, the message and the activity entry. Events are published after
+    the commit. The client's total_spent was already counted at hire time.
+
+    Args:
+        db: Database session
+        job_id: Job UUID
+        client_agent_id: Client agent UUID
+        rating: Rating 1-5
+        review: Optional review text
+
+    Returns:
+        Updated job
+
+    Raises:
+        ValueError: If job not found, not owned by client, or invalid state
+    """
+    job, events = await _complete(db, job_id, client_agent_id, rating, review)
+    await db.commit()
+    await publish_events(events)
 
     return job
 
 
+# (job, error message) for one batch item; exactly one side is set
+BatchItemResult = Tuple[Optional[Job], Optional[str]]
+
+
+async def hire_batch(
+    db: AsyncSession,
+    client_agent_id: str,
+    items: List[JobCreate]
+) -> Tuple[List[BatchItemResult], Any]:
+    """
+    Hire several services at their midpoint price, paid from balance.
+
+    All services are loaded with one query and the client's balance is
+    checked once against the sum of the valid items. Jobs, escrow transfers,
+    messages and activity entries are inserted in a single flush and
+    committed together; events are published after the commit. Items that
+    reference a missing or inactive service, or that carry negotiated
+    pricing, fail individually without affecting the rest.
+
+    Args:
+        db: Database session
+        client_agent_id: Client agent UUID
+        items: Job creation data, one per hire
+
+    Returns:
+        Tuple of (per-item results in request order, total AGNT debited)
+
+    Raises:
+        ValueError: If the client's balance cannot cover the valid items
+    """
+    from decimal import Decimal
+    from app.services.agent_service import adjust_totals
+    from app.services.ledger_service import PLATFORM_ESCROW, ensure_funds, transfer
+
+    service_ids = {item.service_id for item in items}
+    result = await db.execute(select(Service).where(Service.id.in_(service_ids)))
+    services = {str(service.id): service for service in result.scalars()}
+
+    # Validate and price every item before touching the session
+    results: List[Optional[BatchItemResult]] = []
+    priced: List[Tuple[int, JobCreate, Service, Any]] = []
+    for index, item in enumerate(items):
+        service = services.get(item.service_id)
+        if item.quote_id or item.negotiation_id:
+            results.append((None, "Negotiated pricing is not supported in batch hires"))
+        elif not service:
+            results.append((None, "Service not found"))
+        elif not service.is_active:
+            results.append((None, "Service is not available"))
+        else:
+            price = (service.min_price_agnt + service.max_price_agnt) / Decimal("2")
+            priced.append((index, item, service, price))
+            results.append(None)
+
+    total = sum((price for *_, price in priced), Decimal("0"))
+    if not priced:
+        return results, total
+
+    # One check for the whole batch
+    await ensure_funds(db, str(client_agent_id), total)
+
+    hires: List[Job] = []
+    events: List[JobEvent] = []
+    for index, item, service, price in priced:
+        job, job_events = await _hire(db, client_agent_id, item, service, price_agnt=price)
+        results[index] = (job, None)
+        hires.append(job)
+        events.extend(job_events)
+
+    for job in hires:
+        await transfer(
+            db, str(client_agent_id), PLATFORM_ESCROW, job.price_agnt, "job_payment",
+            reference_id=job.id, flush=False,
+        )
+    await adjust_totals(db, client_agent_id, spent=total)
+
+    await db.commit()
+    await publish_events(events)
+
+    return results, total
+
+
+async def _run_batch(db: AsyncSession, steps: List[Any]) -> List[BatchItemResult]:
+    """
+    Run per-item job transitions in one transaction.
+
+    Each step is a zero-argument coroutine function returning (job, events);
+    it runs inside its own savepoint so a ValueError rolls back only that
+    item. Surviving items are committed together, then their events are
+    published.
+    """
+    results: List[BatchItemResult] = []
+    events: List[JobEvent] = []
+    for step in steps:
+        try:
+            async with db.begin_nested():
+                job, step_events = await step()
+        except ValueError as e:
+            results.append((None, str(e)))
+            continue
+        results.append((job, None))
+        events.extend(step_events)
+
+    await db.commit()
+    await publish_events(events)
+
+    return results
+
+
+async def start_batch(
+    db: AsyncSession,
+    job_ids: List[str],
+    worker_agent_id: str
+) -> List[BatchItemResult]:
+    """
+    Start several jobs as the worker, in one transaction.
+
+    Args:
+        db: Database session
+        job_ids: Job UUIDs
+        worker_agent_id: Worker agent UUID
+
+    Returns:
+        Per-item results in request order
+    """
+    return await _run_batch(db, [
+        lambda job_id=job_id: _start(db, job_id, worker_agent_id)
+        for job_id in job_ids
+    ])
+
+
+async def deliver_batch(
+    db: AsyncSession,
+    items: List[Any],
+    worker_agent_id: str
+) -> List[BatchItemResult]:
+    """
+    Deliver several jobs as the worker, in one transaction.
+
+    Args:
+        db: Database session
+        items: Deliverables, each with the job_id it belongs to
+        worker_agent_id: Worker agent UUID
+
+    Returns:
+        Per-item results in request order
+    """
+    return await _run_batch(db, [
+        lambda item=item: _deliver(db, item.job_id, worker_agent_id, item)
+        for item in items
+    ])
+
+
+async def complete_batch(
+    db: AsyncSession,
+    items: List[Any],
+    client_agent_id: str
+) -> List[BatchItemResult]:
+    """
+    Complete and rate several jobs as the client, in one transaction.
+
+    Args:
+        db: Database session
+        items: Ratings, each with the job_id it belongs to
+        client_agent_id: Client agent UUID
+
+    Returns:
+        Per-item results in request order
+    """
+    return await _run_batch(db, [
+        lambda item=item: _complete(db, item.job_id, client_agent_id, item.rating, item.review)
+        for item in items
+    ])
+
+
 async def cancel_job(
     db: AsyncSession,
     job_id: str,
@@ -549,6 +972,7 @@ async def cancel_job(
     await event_bus.publish("job_cancelled", {
         "job_id": str(job.id),
         "client_id": str(client_agent_id),
+        "worker_id": str(job.worker_agent_id),
     })
 
     return job
@@ -573,38 +997,140 @@ async def get_job_by_id(db: AsyncSession, job_id: str) -> Optional[Job]:
     return result.scalar_one_or_none()
 
 
-async def get_job_tree(db: AsyncSession, job_id: str) -> Dict[str, Any]:
+def _job_tree_cte(job_id: str, depth: int):
     """
-    Get job with parent and sub-jobs (hierarchical structure).
+    Recursive CTE of (id, parent_job_id, depth, path) below job_id.
+
+    path is the chain of ids from the root ("/a/b/c/"); a child already on
+    its own path is skipped, so a parent_job_id cycle cannot recurse.
+    """
+    root = (
+        select(
+            Job.id,
+            Job.parent_job_id,
+            literal(0).label("depth"),
+            (literal("/") + Job.id + "/").label("path"),
+        )
+        .where(Job.id == job_id)
+        .cte("job_tree", recursive=True)
+    )
+    child = aliased(Job)
+    return root.union_all(
+        select(
+            child.id,
+            child.parent_job_id,
+            root.c.depth + 1,
+            root.c.path + child.id + "/",
+        )
+        .join(root, child.parent_job_id == root.c.id)
+        .where(
+            root.c.depth < depth,
+            ~root.c.path.contains("/" + child.id + "/"),
+        )
+    )
+
+
+def _empty_subtree() -> Dict[str, Any]:
+    from decimal import Decimal
+    return {"job_count": 0, "status_counts": {}, "total_price_agnt": Decimal("0")}
+
+
+async def get_job_tree(
+    db: AsyncSession,
+    job_id: str,
+    depth: int = 1,
+    max_nodes: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Get a job with its parent and its sub-jobs down to depth levels.
+
+    The whole subtree is read with one recursive CTE. Every node carries
+    aggregate status counts and total AGNT cost of its own subtree. If the
+    tree has more than max_nodes jobs, the shallowest are returned and the
+    summary is computed over the full tree in a second query.
 
     Args:
         db: Database session
         job_id: Job UUID
+        depth: Levels of sub-jobs to include (capped at JOB_TREE_MAX_DEPTH)
+        max_nodes: Max jobs returned (default and cap JOB_TREE_MAX_NODES)
 
     Returns:
-        Hierarchical job structure
+        Dict with "job", "parent", "sub_jobs" (direct children), "tree"
+        (nested nodes with job, depth, children and subtree), "summary"
+        (subtree aggregates of the root), "depth" and "truncated"
 
     Raises:
         ValueError: If job not found
     """
-    job = await get_job_by_id(db, job_id)
+    from app.config import settings
 
-    if not job:
-        raise ValueError("Job not found")
+    depth = max(0, min(depth, settings.JOB_TREE_MAX_DEPTH))
+    if max_nodes is None or max_nodes > settings.JOB_TREE_MAX_NODES:
+        max_nodes = settings.JOB_TREE_MAX_NODES
 
-    # Fetch sub-jobs
+    tree = _job_tree_cte(job_id, depth)
     result = await db.execute(
-        select(Job).where(Job.parent_job_id == job_id)
+        select(Job, tree.c.depth)
+        .join(tree, Job.id == tree.c.id)
+        .order_by(tree.c.depth, Job.created_at, Job.id)
+        .limit(max_nodes + 1)
     )
-    sub_jobs = list(result.scalars().all())
+    rows = result.all()
+
+    if not rows:
+        raise ValueError("Job not found")
+
+    truncated = len(rows) > max_nodes
+    rows = rows[:max_nodes]
+
+    # Link nodes deepest-first so each subtree is complete before its parent
+    nodes: Dict[str, Dict[str, Any]] = {}
+    for job, node_depth in rows:
+        nodes[job.id] = {"job": job, "depth": node_depth, "children": [], "subtree": _empty_subtree()}
+    root_job = rows[0][0]
+    for job, node_depth in reversed(rows):
+        node = nodes[job.id]
+        subtree = node["subtree"]
+        subtree["job_count"] += 1
+        subtree["status_counts"][job.status] = subtree["status_counts"].get(job.status, 0) + 1
+        subtree["total_price_agnt"] += job.price_agnt
+        if node_depth == 0:
+            continue
+        parent = nodes[job.parent_job_id]
+        parent["children"].append(node)
+        parent_subtree = parent["subtree"]
+        parent_subtree["job_count"] += subtree["job_count"]
+        parent_subtree["total_price_agnt"] += subtree["total_price_agnt"]
+        for job_status, count in subtree["status_counts"].items():
+            parent_subtree["status_counts"][job_status] = parent_subtree["status_counts"].get(job_status, 0) + count
+    for node in nodes.values():
+        node["children"].reverse()
+
+    summary = nodes[root_job.id]["subtree"]
+    if truncated:
+        result = await db.execute(
+            select(Job.status, func.count(), func.coalesce(func.sum(Job.price_agnt), 0))
+            .join(tree, Job.id == tree.c.id)
+            .group_by(Job.status)
+        )
+        summary = _empty_subtree()
+        for job_status, count, total in result.all():
+            summary["job_count"] += count
+            summary["status_counts"][job_status] = count
+            summary["total_price_agnt"] += total
 
     # Fetch parent job if exists
     parent_job = None
-    if job.parent_job_id:
-        parent_job = await get_job_by_id(db, str(job.parent_job_id))
+    if root_job.parent_job_id:
+        parent_job = await db.get(Job, root_job.parent_job_id)
 
     return {
-        "job": job,
+        "job": root_job,
         "parent": parent_job,
-        "sub_jobs": sub_jobs,
+        "sub_jobs": [child["job"] for child in nodes[root_job.id]["children"]],
+        "tree": nodes[root_job.id],
+        "summary": summary,
+        "depth": depth,
+        "truncated": truncated,
     }
@@ -0,0 +1,358 @@
+"""Append-only balance ledger with periodic per-account snapshots."""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.agent import Agent
+from app.models.ledger import BalanceSnapshot, LedgerEntry
+
+logger = logging.getLogger(__name__)
+
+# System accounts on the other side of agent balance movements
+PLATFORM_DEPOSITS = "platform:deposits"  # AGNT entering via USDC swaps
+PLATFORM_PAYMENTS = "platform:payments"  # Verified x402 top-up and P2P payments
+PLATFORM_WITHDRAWALS = "platform:withdrawals"  # AGNT leaving via withdrawals
+PLATFORM_ESCROW = "platform:escrow"  # Job payments held until completion
+PLATFORM_OPENING = "platform:opening"  # Balances that predate the ledger
+PLATFORM_ADJUSTMENTS = "platform:adjustments"  # Manual credits and debits
+
+# Advisory lock key serializing snapshot folds across workers
+FOLD_LOCK_KEY = "ledger:fold"
+
+
+def is_system_account(account: str) -> bool:
+    """Return whether an account is a platform account rather than an agent."""
+    return account.startswith("platform:")
+
+
+async def transfer(
+    db: AsyncSession,
+    from_account: str,
+    to_account: str,
+    amount: Decimal,
+    entry_type: str,
+    reference_id: Optional[str] = None,
+    require_funds: bool = False,
+    flush: bool = True,
+) -> str:
+    """
+    Record a balance transfer as two ledger entries.
+
+    Only inserts rows, so concurrent transfers never contend on an agent
+    row. The caller commits.
+
+    Args:
+        db: Database session
+        from_account: Account debited
+        to_account: Account credited
+        amount: Positive amount moved
+        entry_type: Kind of movement (deposit, job_payment, ...)
+        reference_id: Related job/deposit/withdrawal/payment id
+        require_funds: Reject the transfer if from_account would go negative
+        flush: Flush now; pass False to let many transfers insert in one flush
+
+    Returns:
+        Transfer id shared by both entries
+
+    Raises:
+        ValueError: If amount is not positive or funds are insufficient
+    """
+    if amount <= 0:
+        raise ValueError("Transfer amount must be positive")
+
+    if require_funds:
+        await ensure_funds(db, from_account, amount)
+
+    transfer_id = str(uuid.uuid4())
+    now = datetime.utcnow()
+    db.add_all([
+        LedgerEntry(
+            transfer_id=transfer_id,
+            account=from_account,
+            amount=-amount,
+            entry_type=entry_type,
+            reference_id=reference_id,
+            created_at=now,
+        ),
+        LedgerEntry(
+            transfer_id=transfer_id,
+            account=to_account,
+            amount=amount,
+            entry_type=entry_type,
+            reference_id=reference_id,
+            created_at=now,
+        ),
+    ])
+    if flush:
+        await db.flush()
+
+    return transfer_id
+
+
+async def ensure_funds(db: AsyncSession, account: str, amount: Decimal) -> Decimal:
+    """
+    Check that an account can pay amount, holding off concurrent debits.
+
+    On Postgres this takes a transaction-scoped advisory lock on the
+    account, which serializes its debits without locking the agent row.
+
+    Args:
+        db: Database session
+        account: Account about to be debited
+        amount: Total amount about to be debited
+
+    Returns:
+        Balance before the debit
+
+    Raises:
+        ValueError: If the balance is insufficient
+    """
+    if db.bind.dialect.name == "postgresql":
+        await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(account))))
+
+    available = await get_balance(db, account)
+    if available < amount:
+        raise ValueError(f"Insufficient balance. Available: {available} AGNT, required: {amount} AGNT")
+    return available
+
+
+async def get_balance(db: AsyncSession, account: str) -> Decimal:
+    """
+    Read an account balance: latest snapshot plus unfolded entries.
+
+    Both parts come from one statement, so a concurrent snapshot fold is
+    seen either entirely or not at all.
+
+    Args:
+        db: Database session
+        account: Agent UUID or system account
+
+    Returns:
+        Current balance
+    """
+    snapshot = (
+        select(BalanceSnapshot.balance)
+        .where(BalanceSnapshot.account == account)
+        .scalar_subquery()
+    )
+    pending = (
+        select(func.sum(LedgerEntry.amount))
+        .where(LedgerEntry.account == account, LedgerEntry.snapshotted.is_(False))
+        .scalar_subquery()
+    )
+    result = await db.execute(select(func.coalesce(snapshot, 0) + func.coalesce(pending, 0)))
+    return Decimal(str(result.scalar() or 0))
+
+
+async def get_balances(db: AsyncSession, accounts: Sequence[str]) -> Dict[str, Decimal]:
+    """
+    Read several account balances in one statement.
+
+    Args:
+        db: Database session
+        accounts: Agent UUIDs or system accounts
+
+    Returns:
+        Account -> current balance (zero for unknown accounts)
+    """
+    balances = {account: Decimal("0") for account in accounts}
+    if not balances:
+        return balances
+
+    pending = (
+        select(LedgerEntry.account, LedgerEntry.amount.label("amount"))
+        .where(LedgerEntry.account.in_(balances), LedgerEntry.snapshotted.is_(False))
+    )
+    folded = (
+        select(BalanceSnapshot.account, BalanceSnapshot.balance.label("amount"))
+        .where(BalanceSnapshot.account.in_(balances))
+    )
+    combined = pending.union_all(folded).subquery()
+    result = await db.execute(
+        select(combined.c.account, func.sum(combined.c.amount)).group_by(combined.c.account)
+    )
+    for account, balance in result.all():
+        balances[account] = Decimal(str(balance or 0))
+    return balances
+
+
+class LedgerSnapshotter:
+    """
+    Folds new ledger entries into per-account balance snapshots.
+
+    Runs as the only writer of balance_snapshots. Each fold claims a batch
+    of unfolded entries with UPDATE ... RETURNING, so an entry committed
+    mid-fold is either claimed and summed or left for the next fold. Every
+    worker runs a snapshotter, so on Postgres each batch takes a
+    transaction-scoped advisory lock and reads the snapshots FOR UPDATE;
+    two folds never read the same balance and both write it back. The
+    folded agent balances are mirrored onto agents.balance for listings
+    that read the column directly.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float,
+        batch_size: int,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+    ):
+        """Initialize the snapshotter."""
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+        self.folds = 0
+        self.entries_folded = 0
+        self.failures = 0
+
+    async def fold(self, db: Optional[AsyncSession] = None) -> int:
+        """
+        Fold all unfolded entries into snapshots, one batch per transaction.
+
+        Args:
+            db: Session to use; a new one is opened when omitted
+
+        Returns:
+            Number of entries folded
+        """
+        async with self._lock:
+            total = 0
+            while True:
+                if db is not None:
+                    folded = await self._fold_batch(db)
+                else:
+                    async with self._session_factory() as session:
+                        folded = await self._fold_batch(session)
+                total += folded
+                if folded < self.batch_size:
+                    break
+
+            if total:
+                self.folds += 1
+                self.entries_folded += total
+            return total
+
+    async def start(self) -> None:
+        """Start the background fold loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the fold loop and fold whatever is pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        try:
+            await self.fold()
+        except Exception as e:
+            logger.error(f"Failed to fold ledger entries on shutdown: {e}", exc_info=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return fold counters."""
+        return {
+            "interval_seconds": self.interval_seconds,
+            "batch_size": self.batch_size,
+            "folds": self.folds,
+            "entries_folded": self.entries_folded,
+            "failures": self.failures,
+        }
+
+    async def _run(self) -> None:
+        """Fold every interval."""
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.fold()
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Failed to fold ledger entries: {e}", exc_info=True)
+
+    async def _fold_batch(self, db: AsyncSession) -> int:
+        """Claim one batch of entries and add them to their snapshots."""
+        postgres = db.bind.dialect.name == "postgresql"
+        if postgres:
+            # Held until commit, so snapshot reads and creates never interleave
+            await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(FOLD_LOCK_KEY))))
+
+        batch = (
+            select(LedgerEntry.id)
+            .where(LedgerEntry.snapshotted.is_(False))
+            .order_by(LedgerEntry.id)
+            .limit(self.batch_size)
+        )
+        claimed = (await db.execute(
+            update(LedgerEntry)
+            .where(LedgerEntry.id.in_(batch.scalar_subquery()), LedgerEntry.snapshotted.is_(False))
+            .values(snapshotted=True)
+            .returning(LedgerEntry.account, LedgerEntry.amount)
+            .execution_options(synchronize_session=False)
+        )).all()
+
+        if not claimed:
+            await db.rollback()
+            return 0
+
+        deltas: Dict[str, List[Any]] = {}
+        for account, amount in claimed:
+            entry = deltas.setdefault(account, [Decimal("0"), 0])
+            entry[0] += amount
+            entry[1] += 1
+
+        query = select(BalanceSnapshot).where(BalanceSnapshot.account.in_(deltas))
+        if postgres:
+            query = query.with_for_update()
+        snapshots = {
+            snapshot.account: snapshot
+            for snapshot in (await db.execute(query)).scalars()
+        }
+
+        now = datetime.utcnow()
+        for account, (amount, count) in deltas.items():
+            snapshot = snapshots.get(account)
+            if snapshot is None:
+                snapshot = BalanceSnapshot(account=account, balance=Decimal("0"), entries_folded=0)
+                db.add(snapshot)
+                snapshots[account] = snapshot
+            snapshot.balance += amount
+            snapshot.entries_folded += count
+            snapshot.updated_at = now
+
+        # Mirror folded agent balances onto agents.balance in one executemany
+        agent_rows = [
+            {"agent_id": account, "new_balance": snapshot.balance}
+            for account, snapshot in snapshots.items()
+            if not is_system_account(account)
+        ]
+        if agent_rows:
+            await db.execute(
+                Agent.__table__.update()
+                .where(Agent.__table__.c.id == bindparam("agent_id"))
+                .values(balance=bindparam("new_balance")),
+                agent_rows,
+            )
+
+        await db.commit()
+        return len(claimed)
+
+
+# Singleton instance
+ledger_snapshotter = LedgerSnapshotter(
+    interval_seconds=settings.LEDGER_SNAPSHOT_INTERVAL_SECONDS,
+    batch_size=settings.LEDGER_SNAPSHOT_BATCH_SIZE,
+)
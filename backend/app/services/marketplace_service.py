@@ -9,6 +9,13 @@ from app.models.service import Service
 from app.models.agent import Agent
 from app.schemas.service import ServiceCreate, ServiceUpdate
 from app.core.events import event_bus
+from app.core.pagination import Cursor, apply_keyset
+from app.services.search_service import apply_text_search
+from app.services.capability_service import (
+    MATCH_ANY,
+    service_capability_filter,
+    set_service_capabilities,
+)
 
 
 async def create_service(
@@ -65,6 +72,8 @@ async def create_service(
     )
 
     db.add(service)
+    await db.flush()
+    await set_service_capabilities(db, service.id, service.capabilities_required)
     await db.commit()
     await db.refresh(service)
 
@@ -90,6 +99,8 @@ async def search_services(
     search_text: Optional[str] = None,
     limit: int = 50,
     offset: int = 0,
+    capability_match: str = MATCH_ANY,
+    cursor: Optional[Cursor] = None,
 ) -> List[Service]:
     """
     Search services with filters.
@@ -101,13 +112,23 @@ async def search_services(
         max_price: Maximum price
         output_type: Filter by output type
         agent_id: Filter by agent
-        search_text: Search in name and description
+        search_text: Full-text search in name and description (ranked)
         limit: Maximum results
         offset: Pagination offset
+        capability_match: "any" or "all" of the given capabilities
+        cursor: Keyset position to continue after (newest first); not
+            available with search_text, whose results are ranked
 
     Returns:
         List of matching services
+
+    Raises:
+        ValueError: If capability_match is invalid, or a cursor is combined
+            with search_text
     """
+    if cursor is not None and search_text:
+        raise ValueError("Cursor pagination is not available for ranked text search; use offset")
+
     from sqlalchemy.orm import selectinload
 
     query = select(Service).where(Service.is_active == True).options(
@@ -121,6 +142,12 @@ async def search_services(
     if output_type:
         query = query.where(Service.output_type == output_type)
 
+    if capabilities:
+        # Indexed lookup in service_capabilities
+        capability_clause = service_capability_filter(capabilities, capability_match)
+        if capability_clause is not None:
+            query = query.where(capability_clause)
+
     # Filter by AGNT price range
     # Services are shown if their price range overlaps with the search range
     if min_price is not None:
@@ -132,14 +159,15 @@ async def search_services(
         query = query.where(Service.min_price_agnt <= max_price)
 
     if search_text:
-        search_pattern = f"%{search_text}%"
-        query = query.where(
-            Service.name.ilike(search_pattern) |
-            Service.description.ilike(search_pattern)
-        )
+        # Full-text match on name/description, ordered by relevance
+        query = apply_text_search(db, query, Service, search_text)
 
-    # Pagination
-    query = query.offset(offset).limit(limit)
+    # Pagination: ranked search keeps offset; listings page by keyset
+    if not search_text:
+        query = apply_keyset(query, Service, cursor)
+    if cursor is None and offset:
+        query = query.offset(offset)
+    query = query.limit(limit)
 
     result = await db.execute(query)
     return list(result.scalars().all())
@@ -178,6 +206,7 @@ async def update_service(
         raise ValueError("Not authorized to update this service")
 
     # Update fields
+    was_active = service.is_active
     update_data = updates.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(service, field, value)
@@ -190,6 +219,8 @@ async def update_service(
         "service_id": str(service.id),
         "agent_id": str(agent_id),
         "updates": update_data,
+        "is_active": service.is_active,
+        "was_active": was_active,
     })
 
     return service
@@ -239,8 +270,15 @@ async def deactivate_service(
     if str(service.agent_id) != str(agent_id):
         raise ValueError("Not authorized to deactivate this service")
 
+    was_active = service.is_active
     service.is_active = False
     await db.commit()
     await db.refresh(service)
 
+    if was_active:
+        await event_bus.publish("service_deactivated", {
+            "service_id": str(service.id),
+            "agent_id": str(agent_id),
+        })
+
     return service
@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func
 
 from app.models.message import Message
+from app.core.pagination import Cursor, apply_keyset
 
 
 async def create_auto_message(
@@ -14,7 +15,8 @@ async def create_auto_message(
     from_agent_id: str,
     to_agent_id: str,
     job_id: Optional[str],
-    content_data: Dict[str, Any]
+    content_data: Dict[str, Any],
+    commit: bool = True
 ) -> Message:
     """
     Create an automatic message.
@@ -26,6 +28,7 @@ async def create_auto_message(
         to_agent_id: Recipient agent UUID
         job_id: Optional job UUID
         content_data: Message content
+        commit: Commit now; pass False to add it to the caller's transaction
 
     Returns:
         Created message
@@ -39,8 +42,9 @@ async def create_auto_message(
     )
 
     db.add(message)
-    await db.commit()
-    await db.refresh(message)
+    if commit:
+        await db.commit()
+        await db.refresh(message)
 
     return message
 
@@ -52,7 +56,8 @@ async def get_inbox(
     job_id: Optional[str] = None,
     since: Optional[datetime] = None,
     limit: int = 50,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[Cursor] = None
 ) -> tuple[List[Message], int, int]:
     """
     Get messages for an agent's inbox.
@@ -64,7 +69,8 @@ async def get_inbox(
         job_id: Filter by job
         since: Only messages after this timestamp
         limit: Maximum results
-        offset: Pagination offset
+        offset: Pagination offset (deprecated; ignored when cursor is given)
+        cursor: Keyset position to continue after (newest first)
 
     Returns:
         Tuple of (messages, total_count, unread_count)
@@ -97,7 +103,10 @@ async def get_inbox(
     unread_count = unread_result.scalar()
 
     # Get messages with pagination
-    query = query.order_by(Message.created_at.desc()).offset(offset).limit(limit)
+    query = apply_keyset(query, Message, cursor)
+    if cursor is None and offset:
+        query = query.offset(offset)
+    query = query.limit(limit)
     result = await db.execute(query)
     messages = list(result.scalars().all())
 
@@ -11,6 +11,7 @@ from sqlalchemy.orm import selectinload
 from app.models.negotiation import Negotiation, NegotiationOffer
 from app.models.service import Service
 from app.models.agent import Agent
+from app.services.ledger_service import get_balance
 
 
 class P2PNegotiationService:
@@ -67,8 +68,9 @@ class P2PNegotiationService:
         if not client:
             raise ValueError("Client agent not found")
 
-        if client.balance < initial_offer:
-            raise ValueError(f"Insufficient balance. You have {client.balance} AGNT, need {initial_offer} AGNT")
+        available = await get_balance(db, client_agent_id)
+        if available < initial_offer:
+            raise ValueError(f"Insufficient balance. You have {available} AGNT, need {initial_offer} AGNT")
 
         # Create negotiation
         negotiation = Negotiation(
@@ -187,10 +189,9 @@ class P2PNegotiationService:
 
             # Check client has sufficient balance for counter
             if agent_role == "client":
-                result = await db.execute(select(Agent).where(Agent.id == agent_id))
-                agent = result.scalar_one_or_none()
-                if agent.balance < counter_price:
-                    raise ValueError(f"Insufficient balance for counter offer. You have {agent.balance} AGNT, need {counter_price} AGNT")
+                available = await get_balance(db, agent_id)
+                if available < counter_price:
+                    raise ValueError(f"Insufficient balance for counter offer. You have {available} AGNT, need {counter_price} AGNT")
 
             # Check max rounds
             negotiation.round_count += 1
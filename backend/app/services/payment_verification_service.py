@@ -3,10 +3,13 @@
 import logging
 from decimal import Decimal
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.orm.attributes import set_committed_value
 from fastapi import HTTPException, status
+from web3.exceptions import TransactionNotFound
 
 from app.models.payment_transaction import (
     PaymentTransaction,
@@ -14,12 +17,22 @@ from app.models.payment_transaction import (
     TransactionType
 )
 from app.models.agent import Agent
+from app.core.events import event_bus
+from app.core.pagination import Cursor, apply_keyset
 from app.services.chain_service import chain_service
 from app.services.agent_service import update_balance, get_agent_by_id
+from app.services.ledger_service import PLATFORM_PAYMENTS, get_balance, get_balances
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Per-item outcome of a batch verification: (payment transaction, error message)
+PaymentBatchResult = Tuple[Optional[PaymentTransaction], Optional[str]]
+
+VERIFICATION_FAILED_REASON = (
+    "Blockchain verification failed: transaction not found, amount mismatch, or invalid recipient"
+)
+
 
 class PaymentVerificationService:
     """Service for verifying on-chain payments and managing transaction records."""
@@ -34,10 +47,14 @@ class PaymentVerificationService:
         transaction_type: TransactionType = TransactionType.TOP_UP,
         recipient_agent_id: Optional[str] = None,
         token_address: Optional[str] = None
-    ) -> Tuple[PaymentTransaction, Agent]:
+    ) -> Tuple[PaymentTransaction, Optional[Agent]]:
         """
         Verify an on-chain payment and credit the appropriate agent's balance.
 
+        A transaction that is not mined yet, or is fewer than MIN_CONFIRMATIONS
+        blocks deep, is left PENDING and credited later by the confirmation
+        tracker, which publishes payment_credited or payment_failed.
+
         Args:
             db: Database session
             tx_hash: Transaction hash to verify
@@ -49,15 +66,13 @@ class PaymentVerificationService:
             token_address: Optional token contract address
 
         Returns:
-            Tuple of (PaymentTransaction, credited_agent)
+            Tuple of (PaymentTransaction, credited_agent); credited_agent is
+            None while the payment waits for confirmations
 
         Raises:
             HTTPException: If verification fails or transaction already processed
         """
-        # Normalize tx_hash
-        tx_hash = tx_hash.strip().lower()
-        if not tx_hash.startswith("0x"):
-            tx_hash = f"0x{tx_hash}"
+        tx_hash = self._normalize_tx_hash(tx_hash)
 
         # Check for replay attack - has this transaction already been processed?
         existing_tx = await self._get_transaction_by_hash(db, tx_hash)
@@ -74,6 +89,9 @@ class PaymentVerificationService:
                 # Transaction was verified but not credited yet - could be a retry
                 logger.info(f"Transaction {tx_hash} already verified, completing credit operation")
                 return await self._complete_credit(db, existing_tx)
+            elif existing_tx.status == TransactionStatus.PENDING:
+                logger.info(f"Transaction {tx_hash} is already waiting for confirmations")
+                return existing_tx, None
             elif existing_tx.status == TransactionStatus.FAILED:
                 logger.info(f"Retrying previously failed transaction {tx_hash}")
                 # Allow retry of failed transactions
@@ -106,58 +124,338 @@ class PaymentVerificationService:
         )
 
         try:
-            # Verify transaction on blockchain
-            is_valid = chain_service.verify_transaction(
-                tx_hash=tx_hash,
-                expected_amount=amount,
-                recipient_address=recipient_address,
-                token_address=token_address
+            receipt = await self._get_receipt(tx_hash)
+            if not await chain_service.is_confirmed(receipt):
+                # Park it; the confirmation tracker credits it once deep enough
+                logger.info(f"Transaction {tx_hash} not confirmed yet, waiting for confirmations")
+                await self._publish_status(payment_tx)
+                return payment_tx, None
+
+            credited_agent = await self.confirm_pending_payment(db, payment_tx, receipt)
+
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(e)
             )
+        except Exception as e:
+            await db.rollback()
+            await db.refresh(payment_tx)
+            payment_tx.status = TransactionStatus.FAILED
+            payment_tx.failure_reason = f"Unexpected error during verification: {str(e)}"
+            await db.commit()
 
-            if not is_valid:
-                payment_tx.status = TransactionStatus.FAILED
-                payment_tx.failure_reason = "Blockchain verification failed: transaction not found, amount mismatch, or invalid recipient"
-                await db.commit()
+            logger.error(f"Unexpected error verifying payment {tx_hash}: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An unexpected error occurred during payment verification."
+            )
 
-                logger.warning(
-                    f"Payment verification failed for tx_hash={tx_hash}: blockchain validation returned False"
-                )
+        if credited_agent is None:
+            if payment_tx.failure_reason == VERIFICATION_FAILED_REASON:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Payment verification failed. Please verify the transaction hash, amount, and recipient address."
                 )
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=payment_tx.failure_reason
+            )
 
-            # Mark as verified
-            payment_tx.status = TransactionStatus.VERIFIED
-            payment_tx.verified_at = datetime.utcnow()
+        return payment_tx, credited_agent
 
-            # Get transaction details for metadata
-            try:
-                receipt = chain_service.web3.eth.get_transaction_receipt(tx_hash)
-                payment_tx.block_number = receipt.get('blockNumber')
-                payment_tx.from_address = receipt.get('from')
-            except Exception as e:
-                logger.warning(f"Could not fetch transaction receipt details: {e}")
+    async def confirm_pending_payment(
+        self,
+        db: AsyncSession,
+        payment_tx: PaymentTransaction,
+        receipt: Dict[str, Any]
+    ) -> Optional[Agent]:
+        """
+        Verify a pending payment whose receipt is confirmed, then credit or fail it.
 
-            await db.commit()
+        Commits, and publishes payment_credited or payment_failed.
 
-            logger.info(f"Transaction {tx_hash} verified successfully on blockchain")
+        Args:
+            db: Database session
+            payment_tx: Payment in PENDING status
+            receipt: Its receipt, freshly fetched and at least MIN_CONFIRMATIONS deep
 
-            # Credit the balance
-            return await self._complete_credit(db, payment_tx)
+        Returns:
+            Credited agent (with its new balance), or None if the payment failed
 
-        except HTTPException:
-            raise
-        except Exception as e:
-            payment_tx.status = TransactionStatus.FAILED
-            payment_tx.failure_reason = f"Unexpected error during verification: {str(e)}"
+        Raises:
+            ValueError: If a concurrent request already moved the payment out of PENDING
+        """
+        is_valid = await chain_service.verify_receipt(
+            payment_tx.tx_hash, receipt, payment_tx.amount, payment_tx.to_address, payment_tx.token_address
+        )
+
+        if not is_valid:
+            await self._transition(db, payment_tx, TransactionStatus.PENDING, TransactionStatus.FAILED)
+            payment_tx.failure_reason = VERIFICATION_FAILED_REASON
             await db.commit()
+            logger.warning(
+                f"Payment verification failed for tx_hash={payment_tx.tx_hash}: blockchain validation returned False"
+            )
+            await self._publish_status(payment_tx)
+            return None
 
-            logger.error(f"Unexpected error verifying payment {tx_hash}: {e}", exc_info=True)
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="An unexpected error occurred during payment verification."
+        await self._transition(db, payment_tx, TransactionStatus.PENDING, TransactionStatus.VERIFIED)
+        payment_tx.verified_at = datetime.utcnow()
+        payment_tx.block_number = receipt.get('blockNumber')
+        payment_tx.from_address = receipt.get('from')
+
+        try:
+            credited_agent_id = await self._credit_in_transaction(db, payment_tx)
+        except ValueError as e:
+            await db.rollback()
+            await db.refresh(payment_tx)
+            await self._transition(db, payment_tx, TransactionStatus.PENDING, TransactionStatus.FAILED)
+            payment_tx.failure_reason = f"Balance update failed: {str(e)}"
+            await db.commit()
+            logger.error(f"Failed to credit balance for tx {payment_tx.tx_hash}: {e}")
+            await self._publish_status(payment_tx)
+            return None
+
+        await db.commit()
+
+        credited_agent = await db.get(Agent, credited_agent_id)
+        set_committed_value(credited_agent, "balance", await get_balance(db, credited_agent_id))
+
+        logger.info(
+            f"Successfully credited {payment_tx.amount} {payment_tx.currency} "
+            f"to agent {credited_agent_id} from transaction {payment_tx.tx_hash}"
+        )
+        await self._publish_status(payment_tx)
+        return credited_agent
+
+    async def expire_pending_payment(self, db: AsyncSession, payment_tx: PaymentTransaction) -> None:
+        """
+        Fail a pending payment whose transaction was not mined within PAYMENT_VERIFICATION_TIMEOUT.
+
+        Raises:
+            ValueError: If a concurrent request already moved the payment out of PENDING
+        """
+        await self._transition(db, payment_tx, TransactionStatus.PENDING, TransactionStatus.FAILED)
+        payment_tx.failure_reason = (
+            f"Transaction not mined within {settings.PAYMENT_VERIFICATION_TIMEOUT} seconds"
+        )
+        await db.commit()
+        logger.warning(f"Payment {payment_tx.tx_hash} expired waiting to be mined")
+        await self._publish_status(payment_tx)
+
+    async def verify_and_credit_batch(
+        self,
+        db: AsyncSession,
+        items: Sequence[Any],
+        initiator_agent_id: str
+    ) -> Tuple[List[PaymentBatchResult], Dict[str, Decimal]]:
+        """
+        Verify many on-chain payments and credit all valid ones in one transaction.
+
+        Receipts for every hash are fetched in a single JSON-RPC batch and
+        checked concurrently before anything is written. Each item is then
+        recorded and credited in its own savepoint, so one failing item does
+        not undo the others, and the whole batch is committed once. Items
+        not yet MIN_CONFIRMATIONS deep are left PENDING for the confirmation
+        tracker.
+
+        Args:
+            db: Database session
+            items: Payments with tx_hash, amount, currency, transaction_type,
+                recipient_agent_id and token_address, as accepted by /verify
+            initiator_agent_id: Agent who initiated this verification
+
+        Returns:
+            Tuple of ((payment transaction, error message) per item in order,
+            new balance per credited agent)
+        """
+        hashes = [self._normalize_tx_hash(item.tx_hash) for item in items]
+        results: List[PaymentBatchResult] = [(None, None)] * len(items)
+
+        existing: Dict[str, PaymentTransaction] = {}
+        if hashes:
+            rows = await db.execute(
+                select(PaymentTransaction).where(PaymentTransaction.tx_hash.in_(set(hashes)))
             )
+            existing = {tx.tx_hash: tx for tx in rows.scalars()}
+
+        recipient_ids = {
+            str(item.recipient_agent_id) for item in items
+            if item.transaction_type == TransactionType.P2P and item.recipient_agent_id
+        }
+        recipients: Dict[str, Agent] = {}
+        if recipient_ids:
+            rows = await db.execute(select(Agent).where(Agent.id.in_(recipient_ids)))
+            recipients = {str(agent.id): agent for agent in rows.scalars()}
+
+        seen = set()
+        to_credit = []  # (index, already verified row)
+        to_verify = []  # (index, item, tx_hash, recipient address, previously failed row)
+        for index, (item, tx_hash) in enumerate(zip(items, hashes)):
+            if tx_hash in seen:
+                results[index] = (None, f"Transaction {tx_hash} appears more than once in this batch")
+                continue
+            seen.add(tx_hash)
+
+            existing_tx = existing.get(tx_hash)
+            if existing_tx is not None and existing_tx.status == TransactionStatus.CREDITED:
+                logger.warning(
+                    f"Replay attack attempt: tx_hash={tx_hash} already credited to agent={existing_tx.initiator_agent_id}"
+                )
+                results[index] = (None, f"Transaction {tx_hash} has already been processed and credited.")
+                continue
+            if existing_tx is not None and existing_tx.status == TransactionStatus.PENDING:
+                results[index] = (existing_tx, self._pending_message(tx_hash))
+                continue
+            if existing_tx is not None and existing_tx.status == TransactionStatus.VERIFIED:
+                to_credit.append((index, existing_tx))
+                continue
+
+            try:
+                recipient_address = self._batch_recipient_address(item, recipients)
+            except ValueError as e:
+                results[index] = (None, str(e))
+                continue
+            to_verify.append((index, item, tx_hash, recipient_address, existing_tx))
+
+        outcomes = await chain_service.verify_transactions([
+            (tx_hash, item.amount, recipient_address, item.token_address)
+            for _, item, tx_hash, recipient_address, _ in to_verify
+        ])
+        confirmed = [await chain_service.is_confirmed(receipt) for _, receipt in outcomes]
+
+        credited_agent_ids = set()
+        recorded: List[PaymentTransaction] = []
+
+        for index, payment_tx in to_credit:
+            try:
+                async with db.begin_nested():
+                    await self._transition(db, payment_tx, TransactionStatus.VERIFIED, TransactionStatus.CREDITED)
+                    credited_agent_ids.add(await self._credit_or_raise(db, payment_tx))
+                results[index] = (payment_tx, None)
+                recorded.append(payment_tx)
+            except ValueError as e:
+                results[index] = (None, str(e))
+
+        for (index, item, tx_hash, recipient_address, failed_tx), (is_valid, receipt), is_confirmed in zip(
+            to_verify, outcomes, confirmed
+        ):
+            try:
+                async with db.begin_nested():
+                    payment_tx = failed_tx
+                    if payment_tx is None:
+                        payment_tx = PaymentTransaction(tx_hash=tx_hash, status=TransactionStatus.PENDING)
+                        db.add(payment_tx)
+                    else:
+                        logger.info(f"Retrying previously failed transaction {tx_hash}")
+                        await self._transition(db, payment_tx, TransactionStatus.FAILED, TransactionStatus.PENDING)
+                        payment_tx.failure_reason = None
+
+                    payment_tx.amount = item.amount
+                    payment_tx.currency = item.currency
+                    payment_tx.transaction_type = item.transaction_type
+                    payment_tx.initiator_agent_id = initiator_agent_id
+                    payment_tx.recipient_agent_id = item.recipient_agent_id
+                    payment_tx.to_address = recipient_address
+                    payment_tx.token_address = item.token_address or settings.USDC_ADDRESS
+                    await db.flush()
+
+                    if not is_confirmed:
+                        pass  # Stays PENDING until the confirmation tracker picks it up
+                    elif not is_valid:
+                        payment_tx.status = TransactionStatus.FAILED
+                        payment_tx.failure_reason = VERIFICATION_FAILED_REASON
+                    else:
+                        payment_tx.status = TransactionStatus.VERIFIED
+                        payment_tx.verified_at = datetime.utcnow()
+                        payment_tx.block_number = receipt.get('blockNumber')
+                        payment_tx.from_address = receipt.get('from')
+                        credited_agent_ids.add(await self._credit_or_raise(db, payment_tx))
+
+                recorded.append(payment_tx)
+                if not is_confirmed:
+                    results[index] = (payment_tx, self._pending_message(tx_hash))
+                elif is_valid:
+                    results[index] = (payment_tx, None)
+                else:
+                    results[index] = (
+                        payment_tx,
+                        "Payment verification failed. Please verify the transaction hash, amount, and recipient address."
+                    )
+            except IntegrityError:
+                results[index] = (None, f"Transaction {tx_hash} is already being verified")
+            except ValueError as e:
+                results[index] = (None, str(e))
+
+        await db.commit()
+        for payment_tx in recorded:
+            await self._publish_status(payment_tx)
+
+        succeeded = sum(1 for _, error in results if error is None)
+        logger.info(
+            f"Batch payment verification by agent {initiator_agent_id}: "
+            f"{succeeded}/{len(items)} credited"
+        )
+
+        balances = await get_balances(db, sorted(credited_agent_ids))
+        return results, balances
+
+    async def _transition(
+        self,
+        db: AsyncSession,
+        payment_tx: PaymentTransaction,
+        from_status: TransactionStatus,
+        to_status: TransactionStatus
+    ) -> None:
+        """
+        Move a payment to to_status only if it is still in from_status.
+
+        Raises:
+            ValueError: If a concurrent request changed the status first
+        """
+        result = await db.execute(
+            update(PaymentTransaction)
+            .where(PaymentTransaction.id == payment_tx.id, PaymentTransaction.status == from_status)
+            .values(status=to_status)
+        )
+        if result.rowcount != 1:
+            raise ValueError(f"Transaction {payment_tx.tx_hash} is already being verified")
+
+    async def _credit_or_raise(self, db: AsyncSession, payment_tx: PaymentTransaction) -> str:
+        """Credit within a batch savepoint, labelling failures for the per-item result."""
+        try:
+            return await self._credit_in_transaction(db, payment_tx)
+        except ValueError as e:
+            raise ValueError(f"Balance update failed: {e}") from e
+
+    async def _credit_in_transaction(self, db: AsyncSession, payment_tx: PaymentTransaction) -> str:
+        """
+        Credit a verified payment without committing.
+
+        Returns:
+            ID of the credited agent
+
+        Raises:
+            ValueError: If the payment cannot be credited or the agent is not found
+        """
+        if payment_tx.transaction_type == TransactionType.TOP_UP:
+            agent_to_credit_id = payment_tx.initiator_agent_id
+        elif payment_tx.transaction_type == TransactionType.P2P and payment_tx.recipient_agent_id:
+            agent_to_credit_id = payment_tx.recipient_agent_id
+        else:
+            raise ValueError(f"Unsupported transaction type: {payment_tx.transaction_type}")
+
+        await update_balance(
+            db, agent_to_credit_id, payment_tx.amount,
+            counter_account=PLATFORM_PAYMENTS,
+            entry_type=TransactionType(payment_tx.transaction_type).value,
+            reference_id=str(payment_tx.id),
+            commit=False,
+        )
+        payment_tx.status = TransactionStatus.CREDITED
+        payment_tx.credited_at = datetime.utcnow()
+        return str(agent_to_credit_id)
 
     async def _complete_credit(
         self,
@@ -185,7 +483,10 @@ class PaymentVerificationService:
         # Credit the agent's balance
         try:
             credited_agent = await update_balance(
-                db, agent_to_credit_id, payment_tx.amount
+                db, agent_to_credit_id, payment_tx.amount,
+                counter_account=PLATFORM_PAYMENTS,
+                entry_type=TransactionType(payment_tx.transaction_type).value,
+                reference_id=str(payment_tx.id),
             )
 
             payment_tx.status = TransactionStatus.CREDITED
@@ -211,6 +512,67 @@ class PaymentVerificationService:
                 detail=str(e)
             )
 
+    async def _get_receipt(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """Fetch a fresh (uncached) receipt, or None if the transaction is unknown or not mined yet."""
+        try:
+            return await chain_service.client.get_transaction_receipt(tx_hash, use_cache=False)
+        except TransactionNotFound:
+            return None
+
+    async def _publish_status(self, payment_tx: PaymentTransaction) -> None:
+        """Tell the initiating agent the payment is pending, credited or failed."""
+        event_type = {
+            TransactionStatus.PENDING: "payment_pending",
+            TransactionStatus.CREDITED: "payment_credited",
+            TransactionStatus.FAILED: "payment_failed",
+        }.get(payment_tx.status)
+        if event_type is None:
+            return
+        await event_bus.publish(event_type, {
+            "payment_id": payment_tx.id,
+            "tx_hash": payment_tx.tx_hash,
+            "agent_id": payment_tx.initiator_agent_id,
+            "recipient_agent_id": payment_tx.recipient_agent_id,
+            "amount": str(payment_tx.amount),
+            "currency": payment_tx.currency,
+            "status": TransactionStatus(payment_tx.status).value,
+            "failure_reason": payment_tx.failure_reason,
+        })
+
+    @staticmethod
+    def _pending_message(tx_hash: str) -> str:
+        """Per-item message for a payment parked until it is confirmed."""
+        return f"Transaction {tx_hash} is waiting for {settings.MIN_CONFIRMATIONS} confirmation(s)"
+
+    @staticmethod
+    def _normalize_tx_hash(tx_hash: str) -> str:
+        """Lowercase a tx hash and add the 0x prefix."""
+        tx_hash = tx_hash.strip().lower()
+        if not tx_hash.startswith("0x"):
+            tx_hash = f"0x{tx_hash}"
+        return tx_hash
+
+    def _batch_recipient_address(self, item: Any, recipients: Dict[str, Agent]) -> str:
+        """
+        Determine a batch item's recipient address from preloaded recipient agents.
+
+        Raises:
+            ValueError: If the recipient is missing, unknown or has no wallet
+        """
+        if item.transaction_type == TransactionType.TOP_UP:
+            return settings.PLATFORM_WALLET_ADDRESS
+        if item.transaction_type != TransactionType.P2P:
+            raise ValueError(f"Unsupported transaction type: {item.transaction_type}")
+        if not item.recipient_agent_id:
+            raise ValueError("P2P payment requires recipient_agent_id")
+
+        recipient_agent = recipients.get(str(item.recipient_agent_id))
+        if not recipient_agent:
+            raise ValueError(f"Recipient agent {item.recipient_agent_id} not found")
+        if not recipient_agent.wallet_address:
+            raise ValueError(f"Recipient agent {item.recipient_agent_id} has no wallet address configured")
+        return recipient_agent.wallet_address
+
     async def _get_transaction_by_hash(
         self, db: AsyncSession, tx_hash: str
     ) -> Optional[PaymentTransaction]:
@@ -271,7 +633,8 @@ class PaymentVerificationService:
         agent_id: Optional[str] = None,
         status_filter: Optional[TransactionStatus] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[Cursor] = None
     ) -> list[PaymentTransaction]:
         """
         Get transaction history with optional filters.
@@ -281,7 +644,8 @@ class PaymentVerificationService:
             agent_id: Filter by initiator or recipient agent
             status_filter: Filter by transaction status
             limit: Maximum results
-            offset: Pagination offset
+            offset: Pagination offset (deprecated; ignored when cursor is given)
+            cursor: Keyset position to continue after (newest first)
 
         Returns:
             List of payment transactions
@@ -297,8 +661,10 @@ class PaymentVerificationService:
         if status_filter:
             query = query.where(PaymentTransaction.status == status_filter)
 
-        query = query.order_by(PaymentTransaction.created_at.desc())
-        query = query.offset(offset).limit(limit)
+        query = apply_keyset(query, PaymentTransaction, cursor)
+        if cursor is None and offset:
+            query = query.offset(offset)
+        query = query.limit(limit)
 
         result = await db.execute(query)
         return list(result.scalars().all())
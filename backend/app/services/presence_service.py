@@ -0,0 +1,149 @@
+"""Presence service that batches agent last_seen_at updates."""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.agent import Agent
+
+logger = logging.getLogger(__name__)
+
+
+class LastSeenWriter:
+    """
+    Buffers last-seen timestamps in memory and flushes them in bulk.
+
+    Authenticated requests call record(), which only touches a dict, so
+    read-only endpoints no longer open a write transaction on the agent row.
+    A background task writes all buffered timestamps in a single bulk
+    UPDATE every flush interval, when the buffer fills up, and on shutdown.
+    """
+
+    def __init__(
+        self,
+        flush_interval_seconds: float,
+        max_buffer_entries: int,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+    ):
+        """Initialize the writer with an empty buffer."""
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_buffer_entries = max_buffer_entries
+        self._session_factory = session_factory
+        self._pending: Dict[str, datetime] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.flushes = 0
+        self.rows_written = 0
+        self.dropped = 0
+        self.failures = 0
+
+    def record(self, agent_id: str, seen_at: Optional[datetime] = None) -> None:
+        """
+        Buffer a last-seen timestamp for an agent.
+
+        Repeated calls for the same agent coalesce into one row update. When
+        the buffer is full, timestamps for agents not already buffered are
+        dropped and an early flush is requested.
+
+        Args:
+            agent_id: Agent UUID
+            seen_at: Timestamp to record (defaults to now)
+        """
+        agent_id = str(agent_id)
+        if agent_id not in self._pending and len(self._pending) >= self.max_buffer_entries:
+            self.dropped += 1
+            self._wakeup.set()
+            return
+
+        self._pending[agent_id] = seen_at or datetime.utcnow()
+
+        if len(self._pending) >= self.max_buffer_entries:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """
+        Write all buffered timestamps in one bulk UPDATE.
+
+        Returns:
+            Number of agent rows written
+        """
+        if not self._pending:
+            return 0
+
+        pending, self._pending = self._pending, {}
+        rows = [
+            {"id": agent_id, "last_seen_at": seen_at}
+            for agent_id, seen_at in pending.items()
+        ]
+
+        try:
+            async with self._session_factory() as session:
+                # ORM bulk UPDATE by primary key (single executemany)
+                await session.execute(update(Agent), rows)
+                await session.commit()
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Failed to flush {len(rows)} last_seen_at updates: {e}", exc_info=True)
+
+            # Put timestamps back unless a newer one arrived meanwhile
+            for agent_id, seen_at in pending.items():
+                if agent_id not in self._pending and len(self._pending) < self.max_buffer_entries:
+                    self._pending[agent_id] = seen_at
+            return 0
+
+        self.flushes += 1
+        self.rows_written += len(rows)
+        return len(rows)
+
+    async def start(self) -> None:
+        """Start the background flush loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self.flush()
+
+    async def _run(self) -> None:
+        """Flush every interval, or sooner when the buffer fills up."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return buffer depth and flush counters."""
+        return {
+            "buffered": len(self._pending),
+            "max_buffer_entries": self.max_buffer_entries,
+            "flush_interval_seconds": self.flush_interval_seconds,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "dropped": self.dropped,
+            "failures": self.failures,
+        }
+
+
+# Singleton instance
+last_seen_writer = LastSeenWriter(
+    flush_interval_seconds=settings.LAST_SEEN_FLUSH_INTERVAL_SECONDS,
+    max_buffer_entries=settings.LAST_SEEN_BUFFER_MAX_ENTRIES,
+)
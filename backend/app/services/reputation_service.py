@@ -2,11 +2,45 @@
 
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Numeric, case, cast, func, literal, update
 
 from app.models.agent import Agent
 from app.core.events import event_bus
 
+# Cap on how many past jobs the running average weighs
+REPUTATION_MAX_WEIGHT = 50
+
+
+def reputation_expression(new_rating: int):
+    """
+    SQL expression for an agent's reputation after one more rating.
+
+    Evaluated against the row's current values inside an UPDATE, so the
+    read-modify-write happens in the database without a lost-update window.
+
+    Algorithm:
+    - If jobs_completed == 0: new_score = rating
+    - Else: weight = min(jobs_completed, 50)
+            new_score = ((old_score * weight) + new_rating) / (weight + 1)
+    - Round to 2 decimals
+
+    Args:
+        new_rating: New rating (1-5)
+
+    Returns:
+        SQL expression for the new reputation_score
+    """
+    weight = case(
+        (Agent.jobs_completed < REPUTATION_MAX_WEIGHT, Agent.jobs_completed),
+        else_=REPUTATION_MAX_WEIGHT,
+    )
+    # Keep the division numeric: a float divisor compiles to round(double
+    # precision, integer), which Postgres does not have
+    return case(
+        (Agent.jobs_completed == 0, literal(Decimal(new_rating))),
+        else_=func.round((Agent.reputation_score * weight + new_rating) / cast(weight + 1, Numeric), 2),
+    )
+
 
 async def update_reputation(
     db: AsyncSession,
@@ -16,11 +50,7 @@ async def update_reputation(
     """
     Update agent reputation with weighted average.
 
-    Algorithm:
-    - If jobs_completed == 0: new_score = rating
-    - Else: weight = min(jobs_completed, 50)
-            new_score = ((old_score * weight) + new_rating) / (weight + 1)
-    - Round to 2 decimals
+    See reputation_expression for the algorithm.
 
     Args:
         db: Database session
@@ -34,26 +64,18 @@ async def update_reputation(
         ValueError: If agent not found
     """
     result = await db.execute(
-        select(Agent).where(Agent.id == worker_agent_id)
+        update(Agent)
+        .where(Agent.id == worker_agent_id)
+        .values(reputation_score=reputation_expression(new_rating))
+        .returning(Agent.reputation_score)
+        .execution_options(synchronize_session="fetch")
     )
-    agent = result.scalar_one_or_none()
+    new_score = result.scalar_one_or_none()
 
-    if not agent:
+    if new_score is None:
         raise ValueError("Agent not found")
 
-    # Calculate weighted average
-    if agent.jobs_completed == 0:
-        new_score = Decimal(str(new_rating))
-    else:
-        weight = min(agent.jobs_completed, 50)
-        old_score = float(agent.reputation_score)
-        new_score = ((old_score * weight) + new_rating) / (weight + 1)
-        new_score = Decimal(str(round(new_score, 2)))
-
-    # Update agent
-    agent.reputation_score = new_score
     await db.commit()
-    await db.refresh(agent)
 
     # Emit event
     await event_bus.publish("reputation_updated", {
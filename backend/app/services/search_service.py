@@ -0,0 +1,83 @@
+"""Full-text search over services and agents with relevance ranking."""
+
+import re
+from typing import List
+
+from sqlalchemy import Select, func, literal_column, or_, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.search_index import SEARCH_COLUMNS, tsvector_sql
+
+# Word characters as the FTS tokenizers see them (underscore separates words)
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def tokenize(query_text: str) -> List[str]:
+    """
+    Split a search query into lowercase terms.
+
+    Args:
+        query_text: Raw search input
+
+    Returns:
+        Terms with punctuation and FTS operators stripped
+    """
+    return _TOKEN_RE.findall(query_text.lower())
+
+
+def apply_text_search(db: AsyncSession, query: Select, model, query_text: str) -> Select:
+    """
+    Restrict a query to rows matching every search term, best matches first.
+
+    Each term is a prefix match on the words of the searchable columns.
+    Uses the FTS5 index on SQLite and the tsvector GIN index on Postgres;
+    other databases fall back to unranked substring matching.
+
+    Args:
+        db: Database session (used to detect the dialect)
+        query: Select over the model
+        model: Service or Agent
+        query_text: Raw search input
+
+    Returns:
+        The query with the search filter and relevance ordering applied
+    """
+    terms = tokenize(query_text)
+    if not terms:
+        return query
+
+    tablename = model.__tablename__
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        fts = f"{tablename}_fts"
+        match_expr = " ".join(f'"{term}"*' for term in terms)
+        matches = (
+            select(
+                literal_column("id").label("id"),
+                literal_column(f"bm25({fts})").label("rank"),
+            )
+            .select_from(table(fts))
+            .where(literal_column(fts).op("MATCH")(match_expr))
+            .subquery()
+        )
+        # bm25() is lower for better matches
+        return (
+            query.join(matches, matches.c.id == model.id)
+            .order_by(matches.c.rank, model.id)
+        )
+
+    if dialect == "postgresql":
+        vector = literal_column(tsvector_sql(tablename))
+        ts_query = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        return (
+            query.where(vector.op("@@")(ts_query))
+            .order_by(func.ts_rank(vector, ts_query).desc(), model.id)
+        )
+
+    for term in terms:
+        query = query.where(or_(*[
+            getattr(model, column).ilike(f"%{term}%")
+            for column in SEARCH_COLUMNS[tablename]
+        ]))
+    return query
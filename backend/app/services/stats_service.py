@@ -0,0 +1,240 @@
+"""Materialized platform statistics maintained from lifecycle events."""
+
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.core.events import event_bus
+from app.database import AsyncSessionLocal
+from app.models.agent import Agent
+from app.models.job import Job
+from app.models.service import Service
+
+logger = logging.getLogger(__name__)
+
+# Job statuses counted as active
+ACTIVE_JOB_STATUSES = ("pending", "in_progress", "delivered")
+
+# Rolling window for the *_24h figures
+WINDOW = timedelta(days=1)
+
+
+class PlatformStats:
+    """
+    In-memory platform counters served by /api/stats.
+
+    Counters are adjusted incrementally by an event bus listener as agents,
+    services and jobs change, so reads are O(1). A background task
+    periodically recomputes everything from the database to correct drift
+    (missed events, writes from other tools, restarts); the first read
+    before any reconciliation computes the counters on demand.
+    """
+
+    def __init__(
+        self,
+        reconcile_interval_seconds: float,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+    ):
+        """Initialize empty counters; call start() or read once to load them."""
+        self.reconcile_interval_seconds = reconcile_interval_seconds
+        self._session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+        self.total_agents = 0
+        self.active_agents = 0
+        self.total_services = 0
+        self.active_jobs = 0
+        self.total_volume_usd = Decimal("0")
+        # (completed_at, price_usd) of jobs completed within the window
+        self._recent: Deque[Tuple[datetime, Decimal]] = deque()
+        self._recent_volume = Decimal("0")
+
+        self.reconciled_at: Optional[datetime] = None
+        self.updated_at: Optional[datetime] = None
+        self.reconciliations = 0
+        self.events_applied = 0
+
+    def on_event(self, event: Dict[str, Any]) -> None:
+        """
+        Apply a lifecycle event to the counters (event bus listener).
+
+        Args:
+            event: Event dictionary with type and data
+        """
+        if self.reconciled_at is None:
+            # Nothing loaded yet; the first reconciliation will include it
+            return
+
+        event_type = event["type"]
+        data = event.get("data") or {}
+
+        if event_type == "agent_registered":
+            self.total_agents += 1
+            self.active_agents += 1
+        elif event_type == "agent_status_changed":
+            was_active = data.get("previous_status") == "available"
+            is_active = data.get("status") == "available"
+            self.active_agents += int(is_active) - int(was_active)
+        elif event_type == "service_created":
+            self.total_services += 1
+        elif event_type == "service_updated":
+            if "was_active" in data:
+                self.total_services += int(bool(data.get("is_active"))) - int(bool(data["was_active"]))
+        elif event_type == "service_deactivated":
+            self.total_services -= 1
+        elif event_type == "job_created":
+            self.active_jobs += 1
+        elif event_type == "job_revision_requested":
+            self.active_jobs -= 1
+        elif event_type == "job_delivered":
+            if data.get("previous_status") == "revision_requested":
+                self.active_jobs += 1
+        elif event_type == "job_cancelled":
+            self.active_jobs -= 1
+        elif event_type == "job_completed":
+            self.active_jobs -= 1
+            price = Decimal(str(data.get("price_usd") or "0"))
+            self.total_volume_usd += price
+            self._recent.append((datetime.utcnow(), price))
+            self._recent_volume += price
+        else:
+            return
+
+        self.events_applied += 1
+        self.updated_at = datetime.utcnow()
+
+    async def reconcile(self, db: Optional[AsyncSession] = None) -> None:
+        """
+        Recompute every counter from the database.
+
+        Args:
+            db: Session to use; a new one is opened when omitted
+        """
+        async with self._lock:
+            if db is not None:
+                await self._load(db)
+            else:
+                async with self._session_factory() as session:
+                    await self._load(session)
+
+    async def get(self, db: Optional[AsyncSession] = None) -> Dict[str, Any]:
+        """
+        Return the current statistics, loading them first if needed.
+
+        Args:
+            db: Session used if the counters have never been loaded
+
+        Returns:
+            Platform statistics with freshness timestamps
+        """
+        if self.reconciled_at is None:
+            await self.reconcile(db)
+
+        self._expire_window()
+        return {
+            "total_agents": self.total_agents,
+            "active_agents": self.active_agents,
+            "total_services": self.total_services,
+            "active_jobs": self.active_jobs,
+            "completed_jobs_24h": len(self._recent),
+            "total_volume_usd": float(self.total_volume_usd),
+            "volume_24h_usd": float(self._recent_volume),
+            "as_of": self.updated_at.isoformat() if self.updated_at else None,
+            "reconciled_at": self.reconciled_at.isoformat() if self.reconciled_at else None,
+        }
+
+    async def start(self) -> None:
+        """Subscribe to lifecycle events and start periodic reconciliation."""
+        event_bus.add_listener(self.on_event)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop reconciliation and unsubscribe."""
+        event_bus.remove_listener(self.on_event)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return reconciliation counters for /metrics."""
+        return {
+            "reconciliations": self.reconciliations,
+            "events_applied": self.events_applied,
+            "reconcile_interval_seconds": self.reconcile_interval_seconds,
+            "reconciled_at": self.reconciled_at.isoformat() if self.reconciled_at else None,
+        }
+
+    async def _run(self) -> None:
+        """Reconcile immediately, then every interval."""
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Failed to reconcile platform stats: {e}", exc_info=True)
+            await asyncio.sleep(self.reconcile_interval_seconds)
+
+    async def _load(self, db: AsyncSession) -> None:
+        """Run the aggregate queries and replace the counters."""
+        since = datetime.utcnow() - WINDOW
+
+        agent_row = (await db.execute(
+            select(
+                func.count(),
+                func.count().filter(Agent.status == "available"),
+            ).select_from(Agent)
+        )).one()
+
+        total_services = (await db.execute(
+            select(func.count()).select_from(Service).where(Service.is_active == True)
+        )).scalar()
+
+        job_row = (await db.execute(
+            select(
+                func.count().filter(Job.status.in_(ACTIVE_JOB_STATUSES)),
+                func.sum(Job.price_usd).filter(Job.status == "completed"),
+            ).select_from(Job)
+        )).one()
+
+        recent = (await db.execute(
+            select(Job.completed_at, Job.price_usd)
+            .where(and_(Job.status == "completed", Job.completed_at >= since))
+            .order_by(Job.completed_at)
+        )).all()
+
+        self.total_agents, self.active_agents = agent_row
+        self.total_services = total_services
+        self.active_jobs = job_row[0]
+        self.total_volume_usd = Decimal(str(job_row[1] or 0))
+        self._recent = deque((row.completed_at, Decimal(str(row.price_usd or 0))) for row in recent)
+        self._recent_volume = sum((price for _, price in self._recent), Decimal("0"))
+
+        now = datetime.utcnow()
+        self.reconciled_at = now
+        self.updated_at = now
+        self.reconciliations += 1
+
+    def _expire_window(self) -> None:
+        """Drop completions that have aged out of the 24h window."""
+        cutoff = datetime.utcnow() - WINDOW
+        while self._recent and self._recent[0][0] < cutoff:
+            _, price = self._recent.popleft()
+            self._recent_volume -= price
+
+
+# Singleton instance
+platform_stats = PlatformStats(
+    reconcile_interval_seconds=settings.STATS_RECONCILE_INTERVAL_SECONDS,
+)
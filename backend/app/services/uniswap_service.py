@@ -7,6 +7,7 @@ from web3 import Web3
 from web3.exceptions import TransactionNotFound
 
 from app.config import settings
+from app.services.chain_client import get_chain_client
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +16,7 @@ class UniswapV4Service:
     """Service for interacting with Uniswap V4 pools."""
 
     def __init__(self):
-        self.web3 = Web3(Web3.HTTPProvider(settings.WEB3_RPC_URL))
+        self.client = get_chain_client(settings.WEB3_RPC_URL)
         self.pool_manager_address = settings.UNISWAP_V4_POOL_MANAGER
         self.pool_id = settings.AGNT_USDC_POOL_ID
         self.agnt_address = settings.AGENTCOIN_ADDRESS
@@ -132,7 +133,8 @@ class UniswapV4Service:
     async def verify_deposit(
         self,
         tx_hash: str,
-        platform_address: str
+        platform_address: str,
+        receipt: Optional[Dict] = None
     ) -> Dict:
         """
         Verify a token deposit to the platform wallet.
@@ -144,6 +146,7 @@ class UniswapV4Service:
         Args:
             tx_hash: Transaction hash to verify
             platform_address: Platform wallet address that should receive tokens
+            receipt: Already fetched receipt to check (fetched when omitted)
 
         Returns:
             Dictionary with deposit details:
@@ -162,7 +165,8 @@ class UniswapV4Service:
             logger.info(f"Verifying deposit: tx_hash={tx_hash}")
 
             # Get transaction receipt
-            receipt = self.web3.eth.get_transaction_receipt(tx_hash)
+            if receipt is None:
+                receipt = await self.client.get_transaction_receipt(tx_hash)
 
             if not receipt:
                 raise ValueError(f"Transaction not found: {tx_hash}")
@@ -171,7 +175,7 @@ class UniswapV4Service:
                 raise ValueError(f"Transaction failed on-chain: {tx_hash}")
 
             # Parse Transfer events
-            transfers = self._parse_transfer_events(receipt)
+            transfers = await self._parse_transfer_events(receipt)
 
             if not transfers:
                 raise ValueError(f"No token transfers found in transaction {tx_hash}")
@@ -259,7 +263,7 @@ class UniswapV4Service:
             )
 
             # Get transaction receipt
-            receipt = self.web3.eth.get_transaction_receipt(tx_hash)
+            receipt = await self.client.get_transaction_receipt(tx_hash)
 
             if not receipt:
                 raise ValueError(f"Transaction not found: {tx_hash}")
@@ -268,7 +272,7 @@ class UniswapV4Service:
                 raise ValueError(f"Transaction failed on-chain: {tx_hash}")
 
             # Parse Transfer events for both tokens
-            token_transfers = self._parse_transfer_events(receipt)
+            token_transfers = await self._parse_transfer_events(receipt)
 
             if not token_transfers:
                 raise ValueError(f"No token transfers found in transaction {tx_hash}")
@@ -294,23 +298,13 @@ class UniswapV4Service:
             logger.error(f"Error verifying swap transaction {tx_hash}: {e}", exc_info=True)
             raise
 
-    def _parse_transfer_events(self, receipt) -> list:
+    async def _parse_transfer_events(self, receipt) -> list:
         """Parse Transfer events from transaction receipt."""
         transfers = []
 
-        # Parse USDC transfers
-        usdc_contract = self.web3.eth.contract(
-            address=self.usdc_address,
-            abi=self.erc20_abi
-        )
-        usdc_decimals = usdc_contract.functions.decimals().call()
-
-        # Parse AGNT transfers
-        agnt_contract = self.web3.eth.contract(
-            address=self.agnt_address,
-            abi=self.erc20_abi
-        )
-        agnt_decimals = agnt_contract.functions.decimals().call()
+        # Token decimals never change; read once per process
+        usdc_decimals = await self.client.token_decimals(self.usdc_address)
+        agnt_decimals = await self.client.token_decimals(self.agnt_address)
 
         # Process all logs
         for log in receipt['logs']:
@@ -319,7 +313,7 @@ class UniswapV4Service:
                 continue
 
             # Transfer event signature
-            transfer_sig = self.web3.keccak(text='Transfer(address,address,uint256)')
+            transfer_sig = Web3.keccak(text='Transfer(address,address,uint256)')
             if log['topics'][0] != transfer_sig:
                 continue
 
@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 import uuid
 from typing import Dict
 
+from eth_account import Account
 from web3 import Web3
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
@@ -14,6 +15,9 @@ from app.config import settings
 from app.models.withdrawal_transaction import WithdrawalTransaction
 from app.models.agent import Agent
 from app.services.uniswap_service import uniswap_service
+from app.services.chain_client import get_chain_client
+from app.services.agent_service import adjust_totals, update_balance
+from app.services.ledger_service import PLATFORM_WITHDRAWALS, get_balance
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +26,7 @@ class WithdrawalService:
     """Service for handling agent withdrawals (AGNT → USDC)."""
 
     def __init__(self):
-        self.web3 = Web3(Web3.HTTPProvider(settings.WEB3_RPC_URL))
+        self.client = get_chain_client(settings.WEB3_RPC_URL)
         self.min_withdrawal = settings.WITHDRAWAL_MIN_AMOUNT
         self.fee_percent = settings.WITHDRAWAL_FEE_PERCENT
         self.rate_limit_per_hour = settings.WITHDRAWAL_RATE_LIMIT_PER_HOUR
@@ -30,7 +34,7 @@ class WithdrawalService:
         # Platform wallet for executing withdrawals
         self.platform_private_key = settings.PLATFORM_WALLET_PRIVATE_KEY
         if self.platform_private_key:
-            self.platform_account = self.web3.eth.account.from_key(self.platform_private_key)
+            self.platform_account = Account.from_key(self.platform_private_key)
             self.platform_address = self.platform_account.address
         else:
             self.platform_account = None
@@ -115,10 +119,11 @@ class WithdrawalService:
             }
 
         # Check agent has sufficient balance
-        if agent.balance < agnt_amount:
+        available = await get_balance(db, str(agent.id))
+        if available < agnt_amount:
             return {
                 'valid': False,
-                'error': f"Insufficient balance. Available: {agent.balance} AGNT"
+                'error': f"Insufficient balance. Available: {available} AGNT"
             }
 
         # Resolve ENS name if provided
@@ -219,10 +224,6 @@ class WithdrawalService:
             logger.error(f"Error getting withdrawal quote: {e}")
             usdc_estimate = Decimal("0")
 
-        # Deduct balance immediately
-        agent.balance -= agnt_amount
-        agent.total_spent += agnt_amount
-
         # Create withdrawal record
         withdrawal = WithdrawalTransaction(
             id=str(uuid.uuid4()),
@@ -237,7 +238,15 @@ class WithdrawalService:
         )
 
         db.add(withdrawal)
-        await db.commit()
+
+        # Deduct balance immediately; commits the withdrawal record too
+        await update_balance(
+            db, str(agent.id), -agnt_amount,
+            counter_account=PLATFORM_WITHDRAWALS,
+            entry_type="withdrawal",
+            reference_id=withdrawal.id,
+            require_funds=True,
+        )
         await db.refresh(withdrawal)
 
         logger.info(
@@ -279,6 +288,7 @@ class WithdrawalService:
 
             logger.info(f"Executing withdrawal {withdrawal.id} via Uniswap V4 SDK...")
 
+            import asyncio
             import subprocess
             import json
             from pathlib import Path
@@ -286,7 +296,7 @@ class WithdrawalService:
             # Calculate AGNT amount after fee
             agnt_after_fee = withdrawal.agnt_amount_in - withdrawal.fee_agnt
             agnt_raw_amount = int(agnt_after_fee * Decimal(10 ** 18))  # AGNT has 18 decimals
-            recipient = self.web3.to_checksum_address(withdrawal.recipient_address)
+            recipient = Web3.to_checksum_address(withdrawal.recipient_address)
 
             logger.info(f"Swapping {agnt_after_fee} AGNT for USDC via Uniswap V4 SDK...")
 
@@ -294,7 +304,9 @@ class WithdrawalService:
             project_root = Path(__file__).parent.parent.parent.parent
             swap_script = project_root / "scripts" / "swap_agnt_to_usdc.js"
 
-            result = subprocess.run(
+            # Run in a thread so the swap does not block the event loop
+            result = await asyncio.to_thread(
+                subprocess.run,
                 [
                     "node", str(swap_script),
                     str(agnt_raw_amount),
@@ -349,17 +361,17 @@ class WithdrawalService:
 
             # Refund AGNT to agent on failure
             try:
-                result = await db.execute(
-                    select(Agent).where(Agent.id == withdrawal.agent_id)
-                )
-                agent = result.scalar_one_or_none()
-                if agent:
-                    agent.balance += withdrawal.agnt_amount_in
-                    agent.total_spent -= withdrawal.agnt_amount_in
-
                 withdrawal.status = "failed"
                 withdrawal.error_message = str(e)[:500]
-                await db.commit()
+
+                await adjust_totals(db, withdrawal.agent_id, spent=-withdrawal.agnt_amount_in)
+                await update_balance(
+                    db, withdrawal.agent_id, withdrawal.agnt_amount_in,
+                    counter_account=PLATFORM_WITHDRAWALS,
+                    entry_type="withdrawal_refund",
+                    reference_id=withdrawal.id,
+                    track_totals=False,
+                )
 
                 logger.info(f"Refunded {withdrawal.agnt_amount_in} AGNT to agent {withdrawal.agent_id}")
             except Exception as refund_error:
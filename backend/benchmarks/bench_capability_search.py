@@ -0,0 +1,138 @@
+"""
+Benchmark capability filtering on a 100k-service fixture.
+
+Builds a throwaway SQLite database, then times "services with any/all of
+these capabilities" two ways: scanning the JSON capabilities_required column
+(the previous approach) and the indexed service_capabilities lookup.
+
+Usage (from backend/, with DATABASE_URL set as for the app):
+    python -m benchmarks.bench_capability_search
+    python -m benchmarks.bench_capability_search --services 100000 --repeat 20
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import uuid
+from decimal import Decimal
+
+from sqlalchemy import exists, func, insert, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import Base
+from app.models import Agent, Service, ServiceCapability
+from app.services.capability_service import (
+    MATCH_ALL,
+    MATCH_ANY,
+    normalize_capabilities,
+    service_capability_filter,
+)
+
+CAPABILITY_POOL = [f"capability-{i}" for i in range(200)]
+
+
+async def _build_fixture(session: AsyncSession, services: int, agents: int) -> None:
+    """Insert agents and services with 1-4 random capabilities each."""
+    rng = random.Random(42)
+    agent_ids = [str(uuid.uuid4()) for _ in range(agents)]
+    await session.execute(insert(Agent), [
+        {"id": agent_id, "name": f"agent-{i}", "api_key_hash": agent_id, "capabilities": []}
+        for i, agent_id in enumerate(agent_ids)
+    ])
+
+    batch = 10_000
+    for start in range(0, services, batch):
+        service_rows, capability_rows = [], []
+        for _ in range(start, min(start + batch, services)):
+            service_id = str(uuid.uuid4())
+            capabilities = rng.sample(CAPABILITY_POOL, rng.randint(1, 4))
+            service_rows.append({
+                "id": service_id,
+                "agent_id": rng.choice(agent_ids),
+                "name": "Benchmark service",
+                "description": "Benchmark service",
+                "output_type": "text",
+                "price_usd": Decimal("10"),
+                "capabilities_required": capabilities,
+            })
+            capability_rows.extend(
+                {"service_id": service_id, "capability": c}
+                for c in normalize_capabilities(capabilities)
+            )
+        await session.execute(insert(Service), service_rows)
+        await session.execute(insert(ServiceCapability), capability_rows)
+    await session.commit()
+
+
+def _json_scan_filter(capabilities, match):
+    """Previous approach: inspect the JSON column of every service."""
+    if match == MATCH_ANY:
+        return exists(
+            select(literal_column("1"))
+            .select_from(func.json_each(Service.capabilities_required))
+            .where(literal_column("json_each.value").in_(capabilities))
+        )
+    return (
+        select(func.count())
+        .select_from(func.json_each(Service.capabilities_required))
+        .where(literal_column("json_each.value").in_(capabilities))
+        .scalar_subquery()
+    ) == len(capabilities)
+
+
+async def _time(session: AsyncSession, clause, repeat: int) -> tuple:
+    """Run a count query repeatedly; return (rows, average milliseconds)."""
+    query = select(func.count()).select_from(Service).where(clause)
+    rows = (await session.execute(query)).scalar()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await session.execute(query)
+    return rows, (time.perf_counter() - start) * 1000 / repeat
+
+
+async def _run(services: int, agents: int, repeat: int) -> None:
+    """Build the fixture and print timings for each query shape."""
+    path = os.path.join(tempfile.mkdtemp(), "bench_capabilities.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        start = time.perf_counter()
+        await _build_fixture(session, services, agents)
+        print(f"fixture: {services} services in {time.perf_counter() - start:.1f}s ({path})")
+
+        cases = [
+            (MATCH_ANY, CAPABILITY_POOL[:1]),
+            (MATCH_ANY, CAPABILITY_POOL[:3]),
+            (MATCH_ALL, CAPABILITY_POOL[:2]),
+        ]
+        print(f"{'query':<28} {'rows':>7} {'json scan':>11} {'indexed':>10} {'speedup':>8}")
+        for match, capabilities in cases:
+            rows, scan_ms = await _time(session, _json_scan_filter(capabilities, match), repeat)
+            indexed_rows, index_ms = await _time(
+                session, service_capability_filter(capabilities, match), repeat
+            )
+            assert rows == indexed_rows, (rows, indexed_rows)
+            label = f"{match} of {len(capabilities)}"
+            print(f"{label:<28} {rows:>7} {scan_ms:>9.1f}ms {index_ms:>8.1f}ms {scan_ms / index_ms:>7.1f}x")
+
+    await engine.dispose()
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--services", type=int, default=100_000)
+    parser.add_argument("--agents", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(_run(args.services, args.agents, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark SSE fan-out cost: per-subscriber serialization vs. shared frames.
+
+Publishes a batch of job events to N subscribers and measures the CPU time
+spent turning the buffered events into SSE bytes for every connection.
+
+Usage (from backend/, with DATABASE_URL set as for the app):
+    python -m benchmarks.bench_event_fanout
+    python -m benchmarks.bench_event_fanout --subscribers 1000 10000 --events 50
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+from sse_starlette.sse import ServerSentEvent
+
+from app.core.events import EventBus, Subscription, orjson
+
+
+def _job_payload(i: int) -> dict:
+    """Build a job_created payload shaped like the real one."""
+    return {
+        "job_id": str(uuid.uuid4()),
+        "client_id": str(uuid.uuid4()),
+        "worker_id": str(uuid.uuid4()),
+        "service_name": f"Benchmark service {i}",
+        "price_usd": "12.50",
+    }
+
+
+def _attach(bus: EventBus, subscribers: int) -> list:
+    """Register unfiltered subscriptions large enough to hold every event."""
+    subscriptions = []
+    for _ in range(subscribers):
+        subscription = Subscription(max_size=10_000, policy=bus.overflow_policy)
+        bus._add(subscription)
+        subscriptions.append(subscription)
+    return subscriptions
+
+
+async def _run(subscribers: int, events: int, per_subscriber: bool) -> float:
+    """Publish events and encode them for every subscriber; return seconds."""
+    bus = EventBus()
+    subscriptions = _attach(bus, subscribers)
+
+    start = time.process_time()
+    for i in range(events):
+        await bus.publish("job_created", _job_payload(i))
+
+    for subscription in subscriptions:
+        while subscription.depth:
+            event = await subscription.get()
+            if per_subscriber:
+                # Previous behaviour: every generator re-encodes the payload
+                frame = ServerSentEvent(
+                    id=str(event["id"]),
+                    event=event["type"],
+                    data=json.dumps(event["data"]),
+                ).encode()
+            else:
+                frame = event["frame"]
+            assert frame
+    return time.process_time() - start
+
+
+def main() -> None:
+    """Run the benchmark for each subscriber count and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--events", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"encoder: {'orjson' if orjson else 'json'}, events per run: {args.events}")
+    print(f"{'subscribers':>12} {'per-subscriber':>16} {'shared frame':>14} {'speedup':>8}")
+    for count in args.subscribers:
+        before = asyncio.run(_run(count, args.events, per_subscriber=True))
+        after = asyncio.run(_run(count, args.events, per_subscriber=False))
+        print(f"{count:>12} {before:>15.3f}s {after:>13.3f}s {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Load test POST /api/jobs (hire with AGNT balance).
+
+Runs the app in-process against a throwaway SQLite database, registers a
+client and a worker with a service, funds the client, then fires hires
+from concurrent callers. Reports hires per second and database commits
+per hire.
+
+Usage (from backend/, with DATABASE_URL set as for the app; set
+ENVIRONMENT=production to turn off SQL echo):
+    python -m benchmarks.bench_hire
+    python -m benchmarks.bench_hire --hires 2000 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from decimal import Decimal
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import Base, get_db
+from app.main import app
+from app.services.agent_service import update_balance
+
+
+async def _setup(client: AsyncClient, session_factory, hires: int) -> tuple:
+    """Register agents and a service; fund the client for every hire."""
+    response = await client.post("/api/agents", json={"name": "bench-client", "capabilities": []})
+    client_id, client_key = response.json()["agent_id"], response.json()["api_key"]
+    response = await client.post("/api/agents", json={"name": "bench-worker", "capabilities": []})
+    worker_key = response.json()["api_key"]
+
+    response = await client.post(
+        "/api/services",
+        headers={"X-Agent-Key": worker_key},
+        json={
+            "name": "Benchmark service",
+            "description": "Benchmark service",
+            "output_type": "text",
+            "min_price_agnt": "1",
+            "max_price_agnt": "1",
+        },
+    )
+    assert response.status_code == 201, response.text
+    service_id = response.json()["id"]
+
+    async with session_factory() as session:
+        await update_balance(session, client_id, Decimal(hires))
+
+    return client_key, service_id
+
+
+async def _run(hires: int, concurrency: int) -> None:
+    """Fire the hires and print throughput."""
+    path = os.path.join(tempfile.mkdtemp(), "bench_hire.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+
+    commits = 0
+
+    @event.listens_for(engine.sync_engine, "commit")
+    def _count_commit(conn):
+        nonlocal commits
+        commits += 1
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        client_key, service_id = await _setup(client, session_factory, hires)
+        queue = asyncio.Queue()
+        for i in range(hires):
+            queue.put_nowait(i)
+        failures = 0
+
+        async def worker():
+            nonlocal failures
+            while not queue.empty():
+                i = queue.get_nowait()
+                response = await client.post(
+                    "/api/jobs",
+                    headers={"X-Agent-Key": client_key},
+                    json={"service_id": service_id, "title": f"job {i}", "input_data": {"n": i}},
+                )
+                if response.status_code != 201:
+                    failures += 1
+
+        commits = 0
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+    print(f"hires: {hires} (failed {failures}) with concurrency {concurrency} ({path})")
+    print(f"throughput: {hires / elapsed:.1f} hires/s, {elapsed * 1000 / hires:.2f} ms/hire")
+    print(f"commits per hire: {commits / hires:.2f}")
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hires", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(_run(args.hires, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
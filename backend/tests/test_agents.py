@@ -135,3 +135,140 @@ async def test_list_agents(client: AsyncClient, client_agent, worker_agent):
     assert response.status_code == 200
     data = response.json()
     assert len(data) >= 2  # At least our two test agents
+
+
+@pytest.mark.asyncio
+async def test_auth_resolves_each_key_to_its_agent(client: AsyncClient, client_agent, worker_agent):
+    """Test that each API key authenticates as the agent that owns it."""
+    client_data, client_key = client_agent
+    worker_data, worker_key = worker_agent
+
+    response = await client.get("/api/agents/me", headers={"X-Agent-Key": client_key})
+    assert response.status_code == 200
+    assert response.json()["id"] == client_data["agent_id"]
+
+    response = await client.get("/api/agents/me", headers={"X-Agent-Key": worker_key})
+    assert response.status_code == 200
+    assert response.json()["id"] == worker_data["agent_id"]
+
+
+@pytest.mark.asyncio
+async def test_rotate_api_key_revokes_old_key(client: AsyncClient, client_agent):
+    """Test that rotating the API key revokes the previous key immediately."""
+    agent_data, old_key = client_agent
+
+    # Warm the principal cache with the old key
+    response = await client.get("/api/inbox", headers={"X-Agent-Key": old_key})
+    assert response.status_code == 200
+
+    response = await client.post("/api/agents/me/api-key", headers={"X-Agent-Key": old_key})
+    assert response.status_code == 200
+    new_key = response.json()["api_key"]
+    assert new_key != old_key
+
+    response = await client.get("/api/inbox", headers={"X-Agent-Key": old_key})
+    assert response.status_code == 401
+
+    response = await client.get("/api/inbox", headers={"X-Agent-Key": new_key})
+    assert response.status_code == 200
+
+
+def test_principal_cache_lru_and_ttl():
+    """Test principal cache eviction, expiry and counters."""
+    from app.core.auth_cache import AgentPrincipal, PrincipalCache
+
+    cache = PrincipalCache(max_entries=2, ttl_seconds=60)
+    for i in range(3):
+        cache.put(f"hash{i}", AgentPrincipal(id=f"agent{i}", name=f"A{i}", status="available"))
+
+    assert cache.get("hash0") is None  # evicted as least recently used
+    assert cache.get("hash2").id == "agent2"
+
+    cache.invalidate_agent("agent2")
+    assert cache.get("hash2") is None
+
+    expired = PrincipalCache(max_entries=2, ttl_seconds=0)
+    expired.put("h", AgentPrincipal(id="a", name="A", status="available"))
+    assert expired.get("h") is None
+
+    # A lookup that raced an invalidation is not cached
+    generation = cache.generation
+    cache.invalidate_agent("agent0")
+    cache.put("hash0", AgentPrincipal(id="agent0", name="A0", status="available"), generation)
+    assert cache.get("hash0") is None
+
+    # Rotations published by another worker evict through the event bus
+    cache.put("hash1", AgentPrincipal(id="agent1", name="A1", status="available"))
+    cache.on_event({"type": "job_created", "data": {"agent_id": "agent1"}})
+    assert cache.get("hash1") is not None
+    cache.on_event({"type": "agent_key_rotated", "data": {"agent_id": "agent1"}})
+    assert cache.get("hash1") is None
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["invalidations"] == 2
+    assert stats["hits"] == 2
+    assert stats["misses"] == 4
+    assert expired.stats()["expirations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_last_seen_writer_flushes_in_bulk(db, client_agent, worker_agent):
+    """Test that buffered last_seen_at values are written in one flush."""
+    from datetime import datetime
+    from sqlalchemy import select
+    from app.models.agent import Agent
+    from app.services.presence_service import LastSeenWriter
+    from tests.conftest import TestSessionLocal
+
+    client_data, _ = client_agent
+    worker_data, _ = worker_agent
+    seen_at = datetime(2030, 1, 1, 12, 0, 0)
+
+    writer = LastSeenWriter(
+        flush_interval_seconds=60,
+        max_buffer_entries=2,
+        session_factory=TestSessionLocal,
+    )
+    writer.record(client_data["agent_id"], seen_at)
+    writer.record(client_data["agent_id"], seen_at)  # coalesced
+    writer.record(worker_data["agent_id"], seen_at)
+    writer.record("unknown-agent", seen_at)  # buffer full, dropped
+
+    assert await writer.flush() == 2
+    assert writer.stats()["dropped"] == 1
+
+    db.expire_all()
+    result = await db.execute(select(Agent.last_seen_at))
+    assert all(value == seen_at for value in result.scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_list_agents_cursor_pagination(client: AsyncClient):
+    """Test walking the agent listing with X-Next-Cursor."""
+    for i in range(5):
+        await client.post("/api/agents", json={"name": f"PagedAgent{i}"})
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/api/agents", params=params)
+        assert response.status_code == 200
+        seen.extend(agent["name"] for agent in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert sorted(seen) == sorted(f"PagedAgent{i}" for i in range(5))
+    assert len(seen) == len(set(seen))
+
+    # Browser clients can only page if CORS exposes the cursor header
+    response = await client.get("/api/agents", params={"limit": 2}, headers={"Origin": "http://localhost:3000"})
+    assert "X-Next-Cursor" in response.headers["Access-Control-Expose-Headers"]
+
+    response = await client.get("/api/agents", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json()["detail"]["code"] == "INVALID_CURSOR"
@@ -0,0 +1,320 @@
+"""Tests for the event bus."""
+
+import asyncio
+import pytest
+
+from app.core.events import EventBus, EventBusBackend, EventFilter, OverflowPolicy, Subscription
+
+
+def _event(event_type: str, **data) -> dict:
+    return {"type": event_type, "data": data, "timestamp": "2026-01-01T00:00:00"}
+
+
+def test_drop_oldest_keeps_newest_events():
+    """Test that a full buffer drops its oldest event."""
+    subscription = Subscription(max_size=2, policy=OverflowPolicy.DROP_OLDEST)
+    for i in range(3):
+        subscription.offer(_event("job_created", job_id=str(i)))
+
+    assert subscription.depth == 2
+    assert subscription.dropped == 1
+    assert [e["data"]["job_id"] for e in subscription._buffer] == ["1", "2"]
+
+
+def test_disconnect_policy_closes_slow_subscriber():
+    """Test that overflowing under the disconnect policy closes the subscription."""
+    subscription = Subscription(max_size=1, policy=OverflowPolicy.DISCONNECT)
+    subscription.offer(_event("job_created", job_id="1"))
+    subscription.offer(_event("job_created", job_id="2"))
+
+    assert subscription.closed
+    assert subscription.depth == 0
+
+
+def test_coalesce_replaces_event_for_same_entity():
+    """Test that coalescing replaces a queued event about the same entity."""
+    subscription = Subscription(max_size=2, policy=OverflowPolicy.COALESCE)
+    subscription.offer(_event("agent_status_changed", agent_id="a", status="busy"))
+    subscription.offer(_event("job_created", job_id="1"))
+    subscription.offer(_event("agent_status_changed", agent_id="a", status="offline"))
+
+    events = list(subscription._buffer)
+    assert len(events) == 2
+    assert events[0]["type"] == "job_created"
+    assert events[1]["data"]["status"] == "offline"
+
+
+@pytest.mark.asyncio
+async def test_publish_does_not_block_on_stalled_subscriber():
+    """Test that publishing to a stalled subscriber stays bounded and non-blocking."""
+    bus = EventBus(buffer_size=4, overflow_policy=OverflowPolicy.DROP_OLDEST)
+    stream = bus.subscribe()
+    first = asyncio.create_task(stream.__anext__())
+    await asyncio.sleep(0)
+
+    # publish() never awaits a subscriber, so the consumer cannot run in between
+    for i in range(10):
+        await bus.publish("job_created", {"job_id": str(i)})
+
+    stats = bus.stats()
+    assert stats["subscribers"] == 1
+    assert stats["queue_depth_max"] == 4
+    assert stats["dropped"] == 6
+
+    event = await first
+    assert event["data"]["job_id"] == "6"
+
+    await stream.aclose()
+    assert bus.stats()["subscribers"] == 0
+
+
+class _LoopbackBroker:
+    """Stand-in for a shared broker: relays every event to every attached backend."""
+
+    def __init__(self):
+        self.backends = []
+
+    def backend(self) -> EventBusBackend:
+        broker = self
+
+        class _Backend(EventBusBackend):
+            async def publish(self, event):
+                for backend in broker.backends:
+                    backend._deliver(event)
+
+        backend = _Backend()
+        self.backends.append(backend)
+        return backend
+
+
+@pytest.mark.asyncio
+async def test_events_reach_subscribers_on_other_buses_through_backend():
+    """Test that a shared backend delivers events published by another process's bus."""
+    broker = _LoopbackBroker()
+    publisher = EventBus(backend=broker.backend())
+    listener = EventBus(backend=broker.backend())
+
+    stream = listener.subscribe()
+    received = asyncio.create_task(stream.__anext__())
+    await asyncio.sleep(0)
+
+    await publisher.publish("job_created", {"job_id": "42"})
+
+    event = await asyncio.wait_for(received, timeout=1)
+    assert event["type"] == "job_created"
+    assert event["data"]["job_id"] == "42"
+    assert publisher.stats()["published"] == 1
+    assert listener.stats()["delivered"] == 1
+
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_internal_events_reach_listeners_but_not_streams():
+    """Test that worker coordination events never reach SSE subscribers."""
+    bus = EventBus()
+    everything = Subscription(8, OverflowPolicy.DROP_OLDEST)
+    agent = Subscription(8, OverflowPolicy.DROP_OLDEST, EventFilter(agent_id="a1"))
+    bus._add(everything)
+    bus._add(agent)
+    seen = []
+    bus.add_listener(seen.append)
+
+    await bus.publish("agent_key_rotated", {"agent_id": "a1"})
+
+    assert [event["type"] for event in seen] == ["agent_key_rotated"]
+    assert everything.depth == agent.depth == 0
+    assert bus.last_id == 0
+    assert bus.replay_since(f"{bus.epoch}-0") == []
+
+
+@pytest.mark.asyncio
+async def test_filtered_subscriptions_only_receive_matching_events():
+    """Test that agent, job and type filters are applied before buffering."""
+    bus = EventBus()
+    worker = Subscription(8, OverflowPolicy.DROP_OLDEST, EventFilter(agent_id="w1"))
+    job = Subscription(8, OverflowPolicy.DROP_OLDEST, EventFilter(job_id="j2"))
+    typed = Subscription(8, OverflowPolicy.DROP_OLDEST, EventFilter(types=frozenset({"service_created"})))
+    everything = Subscription(8, OverflowPolicy.DROP_OLDEST)
+    for subscription in (worker, job, typed, everything):
+        bus._add(subscription)
+
+    await bus.publish("job_created", {"job_id": "j1", "client_id": "c1", "worker_id": "w1"})
+    await bus.publish("job_created", {"job_id": "j2", "client_id": "c1", "worker_id": "w2"})
+    await bus.publish("service_created", {"service_id": "s1", "agent_id": "w2"})
+
+    assert [e["data"]["job_id"] for e in worker._buffer] == ["j1"]
+    assert [e["data"]["job_id"] for e in job._buffer] == ["j2"]
+    assert [e["type"] for e in typed._buffer] == ["service_created"]
+    assert everything.depth == 3
+
+    bus._remove(job)
+    assert ("job", "j2") not in bus._index
+    assert bus.stats()["filtered_subscribers"] == 2
+
+
+@pytest.mark.asyncio
+async def test_resume_replays_missed_events_then_resets_when_evicted():
+    """Test that Last-Event-ID resumption replays the gap or signals a reset."""
+    bus = EventBus(replay_size=3)
+    for i in range(5):
+        await bus.publish("job_created", {"job_id": str(i)})
+
+    assert bus.last_id == 5
+
+    stream = bus.subscribe(last_event_id=f"{bus.epoch}-3")
+    replayed = [await stream.__anext__(), await stream.__anext__()]
+    assert [e["id"] for e in replayed] == [f"{bus.epoch}-4", f"{bus.epoch}-5"]
+
+    live = asyncio.create_task(stream.__anext__())
+    await asyncio.sleep(0)
+    await bus.publish("job_created", {"job_id": "5"})
+    assert (await live)["id"] == f"{bus.epoch}-6"
+    await stream.aclose()
+
+    # Event 1 has been evicted, so resuming after it cannot be served
+    stream = bus.subscribe(last_event_id=f"{bus.epoch}-1")
+    reset = await stream.__anext__()
+    assert reset["type"] == "stream_reset"
+    assert reset["data"]["oldest_available_id"] == f"{bus.epoch}-4"
+    await stream.aclose()
+
+    # Ids from another process (or a restart) and bare sequences never replay
+    other = EventBus()
+    for last_event_id in (f"{other.epoch}-5", "5", "garbage"):
+        assert bus.replay_since(last_event_id) is None
+        stream = bus.subscribe(last_event_id=last_event_id)
+        assert (await stream.__anext__())["type"] == "stream_reset"
+        await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_event_is_rendered_once_and_shared_by_subscribers():
+    """Test that every subscriber receives the same pre-rendered SSE frame."""
+    bus = EventBus()
+    first = Subscription(8, OverflowPolicy.DROP_OLDEST)
+    second = Subscription(8, OverflowPolicy.DROP_OLDEST)
+    bus._add(first)
+    bus._add(second)
+
+    await bus.publish("job_created", {"job_id": "j1"})
+
+    frame = first._buffer[0]["frame"]
+    assert frame is second._buffer[0]["frame"]
+    assert frame.startswith(f"id: {bus.epoch}-1\r\nevent: job_created\r\ndata: {{".encode())
+    assert b'"job_id":"j1"' in frame.replace(b" ", b"")
+    assert frame.endswith(b"\r\n\r\n")
+
+
+@pytest.mark.asyncio
+async def test_platform_stats_follow_lifecycle_events(db, client_agent):
+    """Test that /api/stats counters load once and then track events."""
+    from app.services.stats_service import PlatformStats
+
+    platform = PlatformStats(reconcile_interval_seconds=60)
+    stats = await platform.get(db)
+    assert stats["total_agents"] == 1
+    assert stats["active_agents"] == 1
+    assert stats["reconciled_at"] is not None
+
+    platform.on_event(_event("agent_status_changed", status="busy", previous_status="available"))
+    platform.on_event(_event("job_created", job_id="j1"))
+    platform.on_event(_event("job_created", job_id="j2"))
+    platform.on_event(_event("job_completed", job_id="j1", price_usd="12.50"))
+
+    stats = await platform.get(db)
+    assert stats["active_agents"] == 0
+    assert stats["active_jobs"] == 1
+    assert stats["completed_jobs_24h"] == 1
+    assert stats["total_volume_usd"] == 12.5
+    assert stats["volume_24h_usd"] == 12.5
+    assert platform.reconciliations == 1
+
+
+@pytest.mark.asyncio
+async def test_collaboration_graph_versions_and_deltas(db, client_agent):
+    """Test that the graph tracks events and serves deltas by version."""
+    from app.services.graph_service import CollaborationGraph
+
+    graph = CollaborationGraph(reconcile_interval_seconds=60)
+    await graph.ensure_loaded(db)
+    client_id = client_agent[0]["agent_id"]
+    assert [node["id"] for node in graph.snapshot()["nodes"]] == [client_id]
+    loaded_version = graph.version_token
+
+    graph.on_event(_event("agent_registered", agent_id="w1", name="Worker"))
+    graph.on_event(_event("job_completed", client_id=client_id, worker_id="w1", price_usd="10"))
+    graph.on_event(_event("job_completed", client_id=client_id, worker_id="w1", price_usd="2.5"))
+
+    delta = graph.delta(loaded_version)
+    assert delta["version"] == graph.version_token
+    assert delta["reset"] is False
+    assert {node["id"] for node in delta["nodes"]} == {client_id, "w1"}
+    assert delta["edges"] == [
+        {"source": client_id, "target": "w1", "jobs_count": 2, "total_value": 12.5}
+    ]
+    assert graph.delta(graph.version_token)["nodes"] == []
+
+    # Reconciling drops what the database does not have and bumps only that
+    version = graph.version_token
+    await graph.reconcile(db)
+    delta = graph.delta(version)
+    assert delta["removed_nodes"] == ["w1"]
+    assert delta["removed_edges"] == [{"source": client_id, "target": "w1"}]
+    assert [node["jobs"] for node in delta["nodes"]] == [0]
+    assert graph.delta(graph.version_token) == {
+        "version": graph.version_token,
+        "since_version": graph.version_token,
+        "reset": False,
+        "nodes": [], "edges": [], "removed_nodes": [], "removed_edges": [],
+    }
+
+    # Tokens from another process, a later version or garbage get the full graph
+    other = CollaborationGraph(reconcile_interval_seconds=60)
+    ahead = f"{graph.epoch}-{graph.version + 1}"
+    for token in (other.version_token, ahead, "7"):
+        reset = graph.delta(token)
+        assert reset["reset"] is True
+        assert reset["since_version"] == token
+        assert reset["nodes"] == graph.snapshot()["nodes"]
+    assert other.etag != CollaborationGraph(reconcile_interval_seconds=60).etag
+
+
+@pytest.mark.asyncio
+async def test_collaboration_graph_queries(db):
+    """Test neighbourhood, partner and centrality queries on the graph."""
+    from app.services.graph_service import CollaborationGraph
+
+    graph = CollaborationGraph(reconcile_interval_seconds=60)
+    await graph.ensure_loaded(db)
+    for agent_id in ("a", "b", "c", "d"):
+        graph.on_event(_event("agent_registered", agent_id=agent_id, name=agent_id.upper()))
+    for client_id, worker_id, price in [("a", "b", "5"), ("a", "c", "20"), ("c", "b", "1"), ("b", "a", "3"), ("c", "d", "1")]:
+        graph.on_event(_event("job_completed", client_id=client_id, worker_id=worker_id, price_usd=price))
+
+    one_hop = graph.neighbourhood("a", hops=1, max_nodes=100)
+    assert {node["id"]: node["distance"] for node in one_hop["nodes"]} == {"a": 0, "b": 1, "c": 1}
+    assert len(one_hop["edges"]) == 4
+    assert {node["id"] for node in graph.neighbourhood("a", hops=2, max_nodes=100)["nodes"]} == {"a", "b", "c", "d"}
+    assert graph.neighbourhood("a", hops=2, max_nodes=2)["truncated"] is True
+
+    partners = graph.top_partners("a", k=2)
+    assert [p["agent_id"] for p in partners] == ["c", "b"]
+    assert partners[1] == {
+        "agent_id": "b", "name": "B", "jobs_count": 2, "total_value": 8.0,
+        "jobs_hired": 1, "jobs_worked": 1,
+    }
+
+    ranking = await graph.centrality("pagerank", limit=4)
+    assert ranking["version"] == graph.version_token
+    assert [agent["agent_id"] for agent in ranking["agents"]][:2] == ["a", "b"]
+    assert sum(agent["score"] for agent in ranking["agents"]) == pytest.approx(1.0, abs=1e-4)
+    degree = await graph.centrality("degree", limit=1)
+    assert degree["agents"][0] == {"agent_id": "c", "name": "C", "score": 1.0}
+
+    # Cached until the graph changes
+    await graph.refresh_analytics()
+    assert graph.analytics_runs == 1
+    graph.on_event(_event("job_completed", client_id="d", worker_id="a", price_usd="1"))
+    await graph.refresh_analytics()
+    assert graph.analytics_runs == 2
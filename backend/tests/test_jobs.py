@@ -290,3 +290,163 @@ async def test_request_revision(
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "revision_requested"
+
+
+@pytest.mark.asyncio
+async def test_job_tree_aggregates_subtree(
+    client: AsyncClient,
+    db,
+    client_agent,
+    worker_agent
+):
+    """Test the recursive job tree: nesting, aggregates, depth limit and cycles."""
+    from decimal import Decimal
+
+    from app.models.job import Job
+
+    client_data, client_key = client_agent
+    worker_data, worker_key = worker_agent
+    response = await client.post(
+        "/api/services",
+        headers={"X-Agent-Key": worker_key},
+        json={
+            "name": "Tree Service",
+            "description": "A test service",
+            "output_type": "text",
+            "min_price_agnt": "10",
+            "max_price_agnt": "20",
+        }
+    )
+    service_id = response.json()["id"]
+
+    def make_job(job_id, parent_id, price, job_status="pending"):
+        return Job(
+            id=job_id,
+            service_id=service_id,
+            client_agent_id=client_data["agent_id"],
+            worker_agent_id=worker_data["agent_id"],
+            parent_job_id=parent_id,
+            title=job_id,
+            input_data={},
+            price_agnt=Decimal(price),
+            final_price_agreed=Decimal(price),
+            status=job_status,
+        )
+
+    # root -> a -> a1 -> a1x, root -> b
+    db.add_all([
+        make_job("root", None, "10"),
+        make_job("a", "root", "5", "completed"),
+        make_job("b", "root", "3"),
+        make_job("a1", "a", "2", "completed"),
+        make_job("a1x", "a1", "1"),
+    ])
+    await db.commit()
+
+    response = await client.get("/api/jobs/root/tree?depth=2", headers={"X-Agent-Key": client_key})
+    assert response.status_code == 200, response.text
+    data = response.json()
+    root = data["root"]
+    assert [child["job"]["id"] for child in root["children"]] == ["a", "b"]
+    a = root["children"][0]
+    assert [child["job"]["id"] for child in a["children"]] == ["a1"]
+    assert a["children"][0]["children"] == []  # a1x is below depth 2
+    assert a["subtree"]["job_count"] == 2
+    assert Decimal(a["subtree"]["total_price_agnt"]) == Decimal("7")
+    assert data["summary"]["status_counts"] == {"pending": 2, "completed": 2}
+    assert Decimal(data["summary"]["total_price_agnt"]) == Decimal("20")
+    assert data["truncated"] is False
+
+    # Truncated trees still report the full summary
+    response = await client.get("/api/jobs/root/tree?depth=3&max_nodes=2", headers={"X-Agent-Key": client_key})
+    data = response.json()
+    assert data["truncated"] is True
+    assert data["summary"]["job_count"] == 5
+    assert data["root"]["subtree"]["job_count"] == 2
+
+    # A parent cycle does not revisit the root
+    root_job = await db.get(Job, "root")
+    root_job.parent_job_id = "a1x"
+    await db.commit()
+    response = await client.get("/api/jobs/root/tree?depth=10", headers={"X-Agent-Key": client_key})
+    data = response.json()
+    assert data["summary"]["job_count"] == 5
+    assert data["parent"]["id"] == "a1x"
+
+    response = await client.get("/api/jobs/missing/tree", headers={"X-Agent-Key": client_key})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_next_job_long_poll_claims_on_creation(
+    client: AsyncClient,
+    db,
+    client_agent,
+    worker_agent
+):
+    """Test that /api/jobs/next waits for a job, is woken on creation and claims it once."""
+    import asyncio
+
+    from app.schemas.job import JobCreate
+    from app.services.job_queue_service import worker_job_queue
+    from app.services.job_service import create_job
+    from tests.conftest import TestSessionLocal
+
+    client_data, client_key = client_agent
+    worker_data, worker_key = worker_agent
+    response = await client.post(
+        "/api/services",
+        headers={"X-Agent-Key": worker_key},
+        json={
+            "name": "Queue Service",
+            "description": "A test service",
+            "output_type": "text",
+            "min_price_agnt": "10",
+            "max_price_agnt": "20",
+        }
+    )
+    service_id = response.json()["id"]
+
+    response = await client.get("/api/jobs/next?wait=0", headers={"X-Agent-Key": worker_key})
+    assert response.status_code == 204
+
+    await worker_job_queue.start()
+    try:
+        async with TestSessionLocal() as waiter_db, TestSessionLocal() as other_db, TestSessionLocal() as hire_db:
+            waiting = asyncio.create_task(worker_job_queue.claim(waiter_db, worker_data["agent_id"], 10))
+            await asyncio.sleep(0.1)
+            assert not waiting.done()
+            assert worker_job_queue.stats()["waiting"] == 1
+
+            job = await create_job(hire_db, client_data["agent_id"], JobCreate(service_id=service_id))
+
+            # Woken by job_created well before the 5s re-check
+            claimed = await asyncio.wait_for(waiting, 2)
+            assert claimed.id == job.id
+            assert claimed.status == "in_progress"
+            assert await worker_job_queue.claim(other_db, worker_data["agent_id"], 0) is None
+    finally:
+        await worker_job_queue.stop()
+
+    response = await client.get(f"/api/jobs/{job.id}", headers={"X-Agent-Key": worker_key})
+    assert response.json()["status"] == "in_progress"
+    assert response.json()["started_at"] is not None
+
+
+@pytest.mark.asyncio
+async def test_reputation_update_stays_numeric(db, worker_agent):
+    """Test that the reputation UPDATE compiles without a float cast and averages correctly."""
+    from decimal import Decimal
+    from sqlalchemy import update
+    from sqlalchemy.dialects import postgresql
+    from app.models.agent import Agent
+    from app.services.reputation_service import reputation_expression, update_reputation
+
+    # Postgres has no round(double precision, integer)
+    statement = update(Agent).values(reputation_score=reputation_expression(4))
+    assert "DOUBLE PRECISION" not in str(statement.compile(dialect=postgresql.dialect()))
+
+    worker_id = worker_agent[0]["agent_id"]
+    await db.execute(update(Agent).where(Agent.id == worker_id).values(jobs_completed=1, reputation_score=Decimal("4")))
+    await db.commit()
+    assert Decimal(str(await update_reputation(db, worker_id, 5))) == Decimal("4.5")
@@ -1,7 +1,10 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from decimal import Decimal
 from app.services.agent_service import search_agents
+from app.services.marketplace_service import create_service, search_services, update_service
+from app.schemas.service import ServiceCreate, ServiceUpdate
+from app.services.chain_client import ChainClient
 from app.services.chain_service import ChainService
 
 @pytest.mark.asyncio
@@ -20,24 +23,84 @@ async def test_search_agents_multi_term(db, client_agent):
     results = await search_agents(db, query_text="Test Zebra")
     assert len(results) == 0
 
-def test_chain_service_verification_logic():
+@pytest.mark.asyncio
+async def test_search_services_ranked_and_kept_in_sync(db, worker_agent):
+    agent_data, _ = worker_agent
+
+    def service(name, description):
+        return ServiceCreate(
+            name=name,
+            description=description,
+            output_type="text",
+            min_price_agnt=Decimal("1"),
+            max_price_agnt=Decimal("2"),
+        )
+
+    weak = await create_service(db, agent_data["agent_id"], service("Copy editing", "Also does translation"))
+    strong = await create_service(db, agent_data["agent_id"], service("Translation", "Translation between any languages"))
+    await create_service(db, agent_data["agent_id"], service("Logo design", "Vector logos"))
+
+    # Prefix match, best match first
+    results = await search_services(db, search_text="transl")
+    assert [s.id for s in results] == [strong.id, weak.id]
+
+    # Updates are reflected in the index
+    await update_service(db, weak.id, agent_data["agent_id"], ServiceUpdate(description="Proofreading"))
+    results = await search_services(db, search_text="translation")
+    assert [s.id for s in results] == [strong.id]
+
+    # The index is keyed by id, so renumbered rowids (e.g. after VACUUM) don't desync it
+    from sqlalchemy import text
+    await db.execute(text("UPDATE services SET rowid = rowid + 1000"))
+    await db.commit()
+    results = await search_services(db, search_text="translation")
+    assert [s.id for s in results] == [strong.id]
+
+@pytest.mark.asyncio
+async def test_search_services_by_capabilities_any_and_all(db, worker_agent):
+    agent_data, _ = worker_agent
+
+    async def service(name, capabilities):
+        return await create_service(db, agent_data["agent_id"], ServiceCreate(
+            name=name,
+            description=name,
+            output_type="text",
+            min_price_agnt=Decimal("1"),
+            max_price_agnt=Decimal("2"),
+            capabilities_required=capabilities,
+        ))
+
+    both = await service("Docs", ["Writing", "coding"])
+    writing = await service("Blog", ["writing"])
+    await service("Logo", ["design"])
+
+    results = await search_services(db, capabilities=["writing", "coding"])
+    assert {s.id for s in results} == {both.id, writing.id}
+
+    results = await search_services(db, capabilities=["writing", "coding"], capability_match="all")
+    assert [s.id for s in results] == [both.id]
+
+@pytest.mark.asyncio
+async def test_chain_service_verification_logic():
     # Mock Web3
     mock_web3 = MagicMock()
     
-    # Service instance with mocked web3
-    service = ChainService()
-    service.web3 = mock_web3
+    # Service instance with its own client around the mocked web3
+    client = ChainClient("http://localhost:8545", timeout_seconds=5, max_concurrency=2)
+    client.web3 = mock_web3
+    mock_web3.provider.cache_async_session = AsyncMock()
+    service = ChainService(client=client)
     
     # Mock receipt
     mock_receipt = {'status': 1}
-    mock_web3.eth.get_transaction_receipt.return_value = mock_receipt
+    mock_web3.eth.get_transaction_receipt = AsyncMock(return_value=mock_receipt)
     
     # Mock Contract
     mock_contract = MagicMock()
     mock_web3.eth.contract.return_value = mock_contract
     
     # Mock Decimals
-    mock_contract.functions.decimals.return_value.call.return_value = 6
+    mock_contract.functions.decimals.return_value.call = AsyncMock(return_value=6)
     
     # Mock Events
     # event['args']['to'] = recipient
@@ -56,7 +119,7 @@ def test_chain_service_verification_logic():
     mock_contract.events.Transfer.return_value.process_receipt.return_value = [mock_event]
     
     # Test valid
-    is_valid = service.verify_transaction(
+    is_valid = await service.verify_transaction(
         tx_hash="0xabc",
         expected_amount=amount,
         recipient_address=recipient
@@ -64,7 +127,7 @@ def test_chain_service_verification_logic():
     assert is_valid is True
     
     # Test invalid recipient
-    is_valid = service.verify_transaction(
+    is_valid = await service.verify_transaction(
         tx_hash="0xabc",
         expected_amount=amount,
         recipient_address="0x9999999999999999999999999999999999999999"
@@ -72,9 +135,371 @@ def test_chain_service_verification_logic():
     assert is_valid is False
 
     # Test invalid amount
-    is_valid = service.verify_transaction(
+    is_valid = await service.verify_transaction(
         tx_hash="0xabc",
         expected_amount=Decimal("20.0"),
         recipient_address=recipient
     )
     assert is_valid is False
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_chain_client_caps_concurrency_and_times_out():
+    import asyncio
+
+    client = ChainClient("http://localhost:8545", timeout_seconds=0.2, max_concurrency=2)
+    active = 0
+    peak = 0
+
+    async def slow_rpc(value):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        return value
+
+    results = await asyncio.gather(*(client.call(slow_rpc, i) for i in range(6)))
+    assert results == list(range(6))
+    assert peak == 2
+
+    with pytest.raises(asyncio.TimeoutError):
+        await client.call(asyncio.sleep, 1)
+    assert client.stats()["timeouts"] == 1
+    assert client.stats()["in_flight"] == 0
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_chain_client_reuses_pooled_connections():
+    from aiohttp import web
+
+    async def rpc(request):
+        body = await request.json()
+        return web.json_response({"jsonrpc": "2.0", "id": body["id"], "result": "0x10"})
+
+    app = web.Application()
+    app.router.add_post("/", rpc)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    client = ChainClient(
+        f"http://127.0.0.1:{port}/", timeout_seconds=5, max_concurrency=4,
+        method_timeouts={"eth_blockNumber": 2},
+    )
+    try:
+        for _ in range(5):
+            assert await client.call(client.web3.eth.get_block_number, method="eth_blockNumber") == 16
+        transport = client.stats()["transport"]
+        assert transport["requests"] == 5
+        assert transport["connections_created"] == 1
+        assert transport["connections_reused"] == 4
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+def test_rpc_transport_recreates_session_on_new_loop():
+    """Test that the pooled session is reused on its own loop and replaced on another."""
+    import asyncio
+    from app.services.chain_client import RpcTransport
+
+    transport = RpcTransport(pool_size=2, keepalive_seconds=5, request_timeout_seconds=5)
+
+    async def twice():
+        first, created = await transport.session()
+        again, created_again = await transport.session()
+        assert again is first and (created, created_again) == (True, False)
+        return first
+
+    old = asyncio.run(twice())
+    new = asyncio.run(twice())
+    assert new is not old
+    asyncio.run(transport.close())
+
+
+@pytest.mark.asyncio
+async def test_chain_client_caches_receipts_and_decimals():
+    from app.services.chain_client import ChainDataCache
+
+    mock_web3 = MagicMock()
+    mock_web3.provider.cache_async_session = AsyncMock()
+    client = ChainClient("http://localhost:8545", timeout_seconds=5, max_concurrency=2)
+    client.web3 = mock_web3
+    service = ChainService(client=client)
+
+    recipient = "0x1234567890123456789012345678901234567890"
+    mock_web3.eth.get_transaction_receipt = AsyncMock(return_value={'status': 1, 'blockNumber': 100})
+    mock_web3.eth.get_block_number = AsyncMock(return_value=100 + client.receipt_cache_confirmations - 1)
+    mock_contract = MagicMock()
+    mock_web3.eth.contract.return_value = mock_contract
+    decimals_call = AsyncMock(return_value=6)
+    mock_contract.functions.decimals.return_value.call = decimals_call
+    mock_contract.events.Transfer.return_value.process_receipt.return_value = [
+        {'args': {'to': recipient, 'value': 1_000_000}},
+        {'args': {'to': recipient, 'value': 2_000_000}},
+    ]
+
+    # Verify, then re-read the receipt for metadata, as verify_and_credit_payment does
+    assert await service.verify_transaction("0xABC", Decimal("2"), recipient) is True
+    assert (await client.get_transaction_receipt("0xabc"))['blockNumber'] == 100
+    assert await service.verify_transaction("0xabc", Decimal("2"), recipient) is True
+
+    assert mock_web3.eth.get_transaction_receipt.await_count == 1
+    assert decimals_call.await_count == 1
+    assert client.stats()["receipt_cache"]["hits"] == 2
+
+    # Receipts not yet final can still be reorged out and are re-fetched
+    mock_web3.eth.get_transaction_receipt = AsyncMock(return_value={'status': 1, 'blockNumber': 105})
+    await client.get_transaction_receipt("0xdef")
+    await client.get_transaction_receipt("0xdef")
+    assert mock_web3.eth.get_transaction_receipt.await_count == 2
+    assert client.receipts.get("0xdef") is None
+
+    cache = ChainDataCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, key)
+    assert cache.get("a") is None and cache.get("c") == "c"
+    assert cache.stats()["evictions"] == 1
+    await client.close()
+
+
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+
+
+def _usdc_receipt(tx_hash, value, block_number=100):
+    """Raw JSON-RPC receipt of a USDC transfer of value (6 decimals) to the platform wallet."""
+    from app.config import settings
+
+    word = lambda hex_value: "0x" + hex_value[2:].rjust(64, "0")
+    sender = "0x" + "ab" * 20
+    return {
+        "transactionHash": tx_hash, "transactionIndex": "0x0", "blockHash": "0x" + "11" * 32,
+        "blockNumber": hex(block_number), "from": sender, "to": settings.USDC_ADDRESS.lower(),
+        "cumulativeGasUsed": "0x5208", "gasUsed": "0x5208", "effectiveGasPrice": "0x1",
+        "contractAddress": None, "status": "0x1", "type": "0x2", "logsBloom": "0x" + "00" * 256,
+        "logs": [{
+            "address": settings.USDC_ADDRESS.lower(),
+            "topics": [TRANSFER_TOPIC, word(sender), word(settings.PLATFORM_WALLET_ADDRESS.lower())],
+            "data": word(hex(value)), "blockNumber": hex(block_number), "blockHash": "0x" + "11" * 32,
+            "transactionHash": tx_hash, "transactionIndex": "0x0", "logIndex": "0x0", "removed": False,
+        }],
+    }
+
+
+class _FakeChain:
+    """Local JSON-RPC endpoint serving receipts, a block head and USDC decimals."""
+
+    def __init__(self):
+        self.receipts = {}
+        self.head = 100
+        self.batches = []
+        self.head_requests = 0
+
+    def answer(self, body):
+        if body["method"] == "eth_getTransactionReceipt":
+            result = self.receipts.get(body["params"][0])
+        elif body["method"] == "eth_blockNumber":
+            self.head_requests += 1
+            result = hex(self.head)
+        else:
+            result = "0x" + "6".rjust(64, "0")
+        return {"jsonrpc": "2.0", "id": body["id"], "result": result}
+
+    async def __aenter__(self):
+        from aiohttp import web
+
+        async def rpc(request):
+            body = await request.json()
+            if isinstance(body, list):
+                self.batches.append(len(body))
+                return web.json_response([self.answer(item) for item in body])
+            return web.json_response(self.answer(body))
+
+        app = web.Application()
+        app.router.add_post("/", rpc)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.client = ChainClient(f"http://127.0.0.1:{port}/", timeout_seconds=5, max_concurrency=4)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.close()
+        await self.runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_verify_payment_batch(client, client_agent, monkeypatch):
+    from app.services.chain_service import chain_service
+
+    _, api_key = client_agent
+    paid, underpaid, unknown = ("0x" + c * 64 for c in "123")
+
+    async with _FakeChain() as chain:
+        monkeypatch.setattr(chain_service, "client", chain.client)
+        chain.receipts = {paid: _usdc_receipt(paid, 10_000_000), underpaid: _usdc_receipt(underpaid, 5_000_000)}
+
+        response = await client.post(
+            "/api/payments/verify-batch",
+            json={"items": [
+                {"tx_hash": paid, "amount": "10"},
+                {"tx_hash": underpaid, "amount": "10"},
+                {"tx_hash": unknown, "amount": "10"},
+                {"tx_hash": paid[2:].upper(), "amount": "10"},
+            ]},
+            headers={"X-Agent-Key": api_key},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert chain.batches == [3]
+        assert (data["succeeded"], data["failed"]) == (1, 3)
+        results = data["results"]
+        assert results[0]["success"] and Decimal(results[0]["new_balance"]) == Decimal("10")
+        # Unmined transactions are parked for the confirmation tracker
+        assert [r["error"]["code"] for r in results[1:]] == [
+            "VERIFICATION_FAILED", "CONFIRMATION_PENDING", "DUPLICATE_TX_HASH"
+        ]
+        assert results[1]["transaction_id"] is not None
+
+        # Replays are rejected; a failed hash can be retried once it pays enough
+        chain.receipts[underpaid] = _usdc_receipt(underpaid, 10_000_000)
+        chain.client.receipts.clear()
+        response = await client.post(
+            "/api/payments/verify-batch",
+            json={"items": [{"tx_hash": paid, "amount": "10"}, {"tx_hash": underpaid, "amount": "10"}]},
+            headers={"X-Agent-Key": api_key},
+        )
+        results = response.json()["results"]
+        assert results[0]["error"]["code"] == "ALREADY_CREDITED"
+        assert results[1]["success"] and Decimal(results[1]["new_balance"]) == Decimal("20")
+
+        response = await client.post(
+            "/api/payments/verify-batch",
+            json={"items": []},
+            headers={"X-Agent-Key": api_key},
+        )
+        assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_confirmation_tracker_enforces_min_confirmations(client, client_agent, monkeypatch):
+    from app.config import settings
+    from app.core.events import event_bus
+    from app.services.chain_service import chain_service
+    from app.services.confirmation_service import ConfirmationTracker
+    from app.services.ledger_service import get_balance
+    from tests.conftest import TestSessionLocal
+
+    agent_data, api_key = client_agent
+    headers = {"X-Agent-Key": api_key}
+    mined, unmined, deposit_hash = ("0x" + c * 64 for c in "456")
+    monkeypatch.setattr(settings, "MIN_CONFIRMATIONS", 3)
+    tracker = ConfirmationTracker(
+        poll_interval_seconds=0, timeout_seconds=300, batch_size=10, session_factory=TestSessionLocal
+    )
+    events = []
+    listener = lambda event: events.append((event["type"], event["data"]))
+    event_bus.add_listener(listener)
+
+    try:
+        async with _FakeChain() as chain:
+            monkeypatch.setattr(chain_service, "client", chain.client)
+            chain.receipts = {mined: _usdc_receipt(mined, 10_000_000, block_number=100)}
+            chain.head = 101  # 2 confirmations
+
+            for tx_hash in (mined, unmined):
+                response = await client.post(
+                    "/api/payments/verify", json={"tx_hash": tx_hash, "amount": "10"}, headers=headers
+                )
+                assert response.status_code == 202
+                assert response.json()["status"] == "pending"
+            response = await client.post(
+                "/api/deposits/verify", json={"tx_hash": deposit_hash, "expected_agnt_amount": "1"}, headers=headers
+            )
+            assert response.status_code == 202
+            assert response.json()["deposit"]["status"] == "pending"
+
+            # Resubmitting a parked hash does not fail it
+            response = await client.post(
+                "/api/payments/verify", json={"tx_hash": mined, "amount": "10"}, headers=headers
+            )
+            assert response.status_code == 202
+
+            # One batch for every pending hash; shallow receipts are never cached
+            assert await tracker.check() == 3
+            assert chain.batches == [3]
+            # Same head: no receipt requests
+            assert await tracker.check() == 3
+            assert chain.batches == [3]
+
+            chain.head = 102
+            assert await tracker.check() == 2
+            assert tracker.stats()["credited"] == 1
+            async with TestSessionLocal() as session:
+                assert await get_balance(session, agent_data["agent_id"]) == Decimal("10")
+
+            tracker.timeout_seconds = 0
+            chain.head = 103
+            assert await tracker.check() == 0
+            assert tracker.stats()["expired"] == 2
+            assert await tracker.check() == 0
+            assert len(chain.batches) == 3
+    finally:
+        event_bus.remove_listener(listener)
+
+    outcomes = {(event_type, data["tx_hash"]) for event_type, data in events}
+    assert {
+        ("payment_pending", mined), ("payment_pending", unmined), ("deposit_pending", deposit_hash),
+        ("payment_credited", mined), ("payment_failed", unmined), ("deposit_failed", deposit_hash),
+    } <= outcomes
+    assert all(data["agent_id"] == agent_data["agent_id"] for _, data in events if "tx_hash" in data)
+
+
+@pytest.mark.asyncio
+async def test_confirmation_tracker_rechecks_reorged_receipts(client, client_agent, monkeypatch):
+    from sqlalchemy import select
+    from web3._utils.method_formatters import receipt_formatter
+    from app.config import settings
+    from app.models.payment_transaction import PaymentTransaction
+    from app.services.chain_service import chain_service
+    from app.services.confirmation_service import ConfirmationTracker
+    from tests.conftest import TestSessionLocal
+
+    _, api_key = client_agent
+    tx_hash = "0x" + "7" * 64
+    monkeypatch.setattr(settings, "MIN_CONFIRMATIONS", 3)
+    tracker = ConfirmationTracker(
+        poll_interval_seconds=0, timeout_seconds=300, batch_size=10, session_factory=TestSessionLocal
+    )
+
+    async with _FakeChain() as chain:
+        monkeypatch.setattr(chain_service, "client", chain.client)
+        chain.receipts = {tx_hash: _usdc_receipt(tx_hash, 10_000_000, block_number=100)}
+        chain.head = 101
+        response = await client.post(
+            "/api/payments/verify", json={"tx_hash": tx_hash, "amount": "10"}, headers={"X-Agent-Key": api_key}
+        )
+        assert response.status_code == 202
+
+        # Reorged out of block 100 and re-mined in 103; a stale cached copy must not count
+        chain.client.receipts.put(tx_hash, receipt_formatter(chain.receipts[tx_hash]))
+        chain.receipts[tx_hash] = _usdc_receipt(tx_hash, 10_000_000, block_number=103)
+        chain.head = 104
+        assert await tracker.check() == 1
+        assert tracker.stats()["credited"] == 0
+
+        chain.head = 105
+        assert await tracker.check() == 0
+        assert tracker.stats()["credited"] == 1
+        async with TestSessionLocal() as session:
+            payment = (await session.execute(
+                select(PaymentTransaction).where(PaymentTransaction.tx_hash == tx_hash)
+            )).scalar_one()
+            assert payment.block_number == 103